@@ -5,7 +5,19 @@ from config import Config
 import os
 
 # ============ IMPORT UTILS ============
-from utils.database import mysql, test_connection, init_db
+from utils.database import mysql, test_connection, init_db, PoolTimeout
+from utils.query_stats import init_query_stats
+from utils.logger import init_logging, get_logger
+from utils.metrics import init_metrics
+from utils.jobs import init_jobs, register_periodic_job
+from utils.notification_hub import init_hub
+from utils.retention import scheduled_purge, purge_status
+from utils.reconcile import reconcile_enrollment_counts
+from utils.catalog_cache import catalog
+from utils.idempotency import store as idempotency_store
+from models.notification import Notification
+from models.notification_job import NotificationJob
+from models.section_counter import SectionCounter
 
 # ============ IMPORT BLUEPRINTS ============
 
@@ -59,6 +71,10 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # ============ LOGGING ============
+    # Structured, level-gated, written by a background QueueListener
+    init_logging(app)
+    
     # ============ CORS CONFIGURATION ============
     # Allow all origins for API routes (development only)
     # This is the key fix for your CORS errors
@@ -71,9 +87,52 @@ def create_app(config_class=Config):
     # Initialize MySQL
     init_db(app)
     
+    # Per-request SQL timing (Server-Timing header, slow-query log)
+    init_query_stats(app)
+    
+    # Request counts/latency, pool gauges and upload bytes at /metrics
+    init_metrics(app, mysql.pool_stats)
+    
     # Initialize app (creates folders, etc.)
     config_class.init_app(app)
     
+    # ============ BACKGROUND JOBS ============
+    register_periodic_job(
+        'notification-counters',
+        app.config.get('NOTIFICATION_COUNTER_RECONCILE_SECONDS'),
+        Notification.reconcile_unread_counters
+    )
+    register_periodic_job(
+        'notification-purge',
+        app.config.get('NOTIFICATION_PURGE_INTERVAL_SECONDS'),
+        scheduled_purge
+    )
+    register_periodic_job(
+        'enrollment-counts',
+        app.config.get('ENROLLMENT_RECONCILE_SECONDS'),
+        reconcile_enrollment_counts
+    )
+    register_periodic_job(
+        'section-counters-roll',
+        app.config.get('SECTION_COUNTERS_ROLL_SECONDS'),
+        SectionCounter.roll_meetings
+    )
+    register_periodic_job(
+        'idempotency-purge',
+        app.config.get('IDEMPOTENCY_PURGE_SECONDS'),
+        idempotency_store.purge
+    )
+    # Fan-out queue workers (each polls notification_jobs and drains it)
+    for worker in range(app.config.get('NOTIFICATION_FANOUT_WORKERS', 0)):
+        register_periodic_job(
+            f'notification-fanout-{worker}',
+            app.config.get('NOTIFICATION_FANOUT_POLL_SECONDS'),
+            NotificationJob.run_pending
+        )
+    # Live notification streams (cross-worker relay when NOTIFICATION_RELAY = 'db')
+    init_hub(app)
+    init_jobs(app)
+    
     # ============ REGISTER BLUEPRINTS ============
     
     # Auth Blueprints (No auth required)
@@ -219,7 +278,9 @@ def create_app(config_class=Config):
             'database': {
                 'connected': db_status,
                 'message': db_message,
-                'stats': db_stats
+                'stats': db_stats,
+                'pool': mysql.pool_stats(),
+                'notification_purge': purge_status()
             },
             'blueprints': {
                 'count': len(app.blueprints),
@@ -274,6 +335,14 @@ def create_app(config_class=Config):
             'status_code': 413
         }), 413
     
+    @app.errorhandler(PoolTimeout)
+    def database_busy(error):
+        return jsonify({
+            'error': 'Service busy',
+            'message': 'All database connections are in use, please retry shortly',
+            'status_code': 503
+        }), 503
+    
     # ============ JWT ERROR HANDLERS ============
     
     @jwt.unauthorized_loader
@@ -318,11 +387,17 @@ def create_app(config_class=Config):
     
     # ============ REQUEST HANDLERS ============
     
+    request_log = get_logger('requests')
+    
     @app.before_request
     def before_request():
-        if app.debug:
+        if request_log.enabled():
             from flask import request
-            print(f"📥 {request.method} {request.path}")
+            request_log.debug('request', method=request.method, path=request.path)
+    
+    # Load the public catalog responses now (forked workers inherit them)
+    if app.config.get('CATALOG_WARM_ON_START', True):
+        catalog.warm(app)
     
     return app
 
@@ -0,0 +1,104 @@
+"""Compare per-row vs set-based notification fan-out.
+
+Seeds a throwaway course/section with N approved students, times the old
+one-INSERT-per-student loop against Notification.send_to_class, then deletes
+everything it created. Run against a development database only:
+
+    python bench_notification_fanout.py [50 500 5000]
+"""
+import sys
+import time
+import uuid
+
+from app import app
+from utils.database import mysql
+from models.notification import Notification
+
+SIZES = [int(n) for n in sys.argv[1:]] or [50, 500, 5000]
+
+
+def seed(cursor, size, tag):
+    """Create a course -> subject -> section with `size` approved students"""
+    cursor.execute("""
+        INSERT INTO courses (name, code, description)
+        VALUES (%s, %s, 'fan-out benchmark')
+    """, (f'Bench {tag}', f'B{tag[:8]}'))
+    course_id = cursor.lastrowid
+    cursor.execute("""
+        INSERT INTO subjects (course_id, code, name)
+        VALUES (%s, %s, 'Bench Subject')
+    """, (course_id, f'BS{tag[:6]}'))
+    subject_id = cursor.lastrowid
+    cursor.execute("""
+        INSERT INTO sections (subject_id, name, academic_year, semester, capacity)
+        VALUES (%s, 'Z', 'bench', 'bench', %s)
+    """, (subject_id, size))
+    section_id = cursor.lastrowid
+
+    cursor.executemany("""
+        INSERT INTO users (email, password, name, role, email_verified)
+        VALUES (%s, 'x', 'Bench Student', 'student', TRUE)
+    """, [(f'bench-{tag}-{i}@bench.invalid',) for i in range(size)])
+    cursor.execute("SELECT id FROM users WHERE email LIKE %s", (f'bench-{tag}-%',))
+    student_ids = [row['id'] for row in cursor.fetchall()]
+
+    cursor.executemany("""
+        INSERT INTO enrollments (student_id, section_id, status)
+        VALUES (%s, %s, 'approved')
+    """, [(sid, section_id) for sid in student_ids])
+    mysql.connection.commit()
+    return course_id, section_id
+
+
+def old_fan_out(section_id):
+    """The previous implementation: SELECT the roster, then one INSERT per student"""
+    cursor = mysql.connection.cursor()
+    cursor.execute("""
+        SELECT u.id FROM enrollments e
+        JOIN users u ON e.student_id = u.id
+        WHERE e.section_id = %s AND e.status = 'approved'
+    """, (section_id,))
+    sent = 0
+    for student in cursor.fetchall():
+        cursor.execute("""
+            INSERT INTO notifications (user_id, type, title, message, link,
+                                       sender_id, class_id, priority, created_at)
+            VALUES (%s, 'class_announcement', 'bench', 'bench', NULL, NULL, %s, 'normal', NOW())
+        """, (student['id'], section_id))
+        sent += 1
+    mysql.connection.commit()
+    cursor.close()
+    return sent
+
+
+def cleanup(cursor, course_id, tag):
+    # Users cascade to enrollments and notifications; courses cascade to sections
+    cursor.execute("DELETE FROM users WHERE email LIKE %s", (f'bench-{tag}-%',))
+    cursor.execute("DELETE FROM courses WHERE id = %s", (course_id,))
+    mysql.connection.commit()
+
+
+with app.app_context():
+    print("=" * 60)
+    print("📊 NOTIFICATION FAN-OUT BENCHMARK")
+    print("=" * 60)
+    print(f"{'recipients':>10} {'per-row (ms)':>14} {'set-based (ms)':>15} {'speedup':>8}")
+
+    for size in SIZES:
+        tag = uuid.uuid4().hex[:12]
+        cursor = mysql.connection.cursor()
+        course_id, section_id = seed(cursor, size, tag)
+        try:
+            started = time.perf_counter()
+            old_sent = old_fan_out(section_id)
+            old_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            new_sent = Notification.send_to_class(section_id, None, 'bench', 'bench')
+            new_ms = (time.perf_counter() - started) * 1000
+
+            assert old_sent == new_sent == size, (old_sent, new_sent, size)
+            print(f"{size:>10} {old_ms:>14.1f} {new_ms:>15.1f} {old_ms / max(new_ms, 0.001):>7.1f}x")
+        finally:
+            cleanup(cursor, course_id, tag)
+            cursor.close()
@@ -19,6 +19,7 @@ class Config:
     JWT_TOKEN_LOCATION = ['headers']
     JWT_HEADER_NAME = 'Authorization'
     JWT_HEADER_TYPE = 'Bearer'
+    ROLE_SYNC_INTERVAL = int(os.getenv('ROLE_SYNC_INTERVAL', 5))  # seconds between role-revocation refreshes
     
     # ============ MYSQL DATABASE CONFIGURATION ============
     MYSQL_HOST = os.getenv('MYSQL_HOST', 'localhost')
@@ -28,6 +29,17 @@ class Config:
     MYSQL_PORT = int(os.getenv('MYSQL_PORT', 3306))
     MYSQL_CURSORCLASS = 'DictCursor'
     MYSQL_CHARSET = 'utf8mb4'
+    MYSQL_POOL_MIN_SIZE = int(os.getenv('MYSQL_POOL_MIN_SIZE', 2))
+    MYSQL_POOL_MAX_SIZE = int(os.getenv('MYSQL_POOL_MAX_SIZE', 10))
+    MYSQL_POOL_TIMEOUT = float(os.getenv('MYSQL_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+    MYSQL_POOL_IDLE_TIMEOUT = float(os.getenv('MYSQL_POOL_IDLE_TIMEOUT', 300))  # close idle connections above min size
+    MYSQL_POOL_PING_INTERVAL = float(os.getenv('MYSQL_POOL_PING_INTERVAL', 30))  # ping connections idle longer than this
+    
+    # ============ SQL INSTRUMENTATION ============
+    SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'True').lower() in ('true', '1', 't')
+    SQL_SLOW_QUERY_MS = float(os.getenv('SQL_SLOW_QUERY_MS', 200))
+    SQL_SLOW_QUERY_LOG = os.getenv('SQL_SLOW_QUERY_LOG', 'slow_queries.log')
+    SQL_REPEAT_THRESHOLD = int(os.getenv('SQL_REPEAT_THRESHOLD', 10))  # flag N+1 shapes run more often than this
     
     # ============ FILE UPLOAD CONFIGURATION ============
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
@@ -106,11 +118,87 @@ class Config:
     ENABLE_FILE_UPLOADS = os.getenv('ENABLE_FILE_UPLOADS', 'True').lower() in ('true', '1', 't')
     ENABLE_NOTIFICATIONS = os.getenv('ENABLE_NOTIFICATIONS', 'True').lower() in ('true', '1', 't')
     
+    # ============ BACKGROUND JOBS ============
+    BACKGROUND_JOBS_ENABLED = os.getenv('BACKGROUND_JOBS_ENABLED', 'True').lower() in ('true', '1', 't')
+    NOTIFICATION_COUNTER_RECONCILE_SECONDS = int(os.getenv('NOTIFICATION_COUNTER_RECONCILE_SECONDS', 300))  # 0 disables
+    NOTIFICATION_PURGE_INTERVAL_SECONDS = int(os.getenv('NOTIFICATION_PURGE_INTERVAL_SECONDS', 3600))  # 0 disables
+    ENROLLMENT_RECONCILE_SECONDS = int(os.getenv('ENROLLMENT_RECONCILE_SECONDS', 300))  # 0 disables
+    ENROLLMENT_RECONCILE_FULL_EVERY = int(os.getenv('ENROLLMENT_RECONCILE_FULL_EVERY', 12))  # every Nth run checks all sections
+    ENROLLMENT_RECONCILE_BATCH_SIZE = int(os.getenv('ENROLLMENT_RECONCILE_BATCH_SIZE', 500))  # sections per grouped query
+    SECTION_COUNTERS_ROLL_SECONDS = int(os.getenv('SECTION_COUNTERS_ROLL_SECONDS', 600))  # recount upcoming meetings after midnight
+    
+    # ============ NOTIFICATION FAN-OUT QUEUE ============
+    NOTIFICATION_FANOUT_WORKERS = int(os.getenv('NOTIFICATION_FANOUT_WORKERS', 2))  # per process; 0 sends inline
+    NOTIFICATION_FANOUT_POLL_SECONDS = float(os.getenv('NOTIFICATION_FANOUT_POLL_SECONDS', 1))
+    NOTIFICATION_FANOUT_BATCH_SIZE = int(os.getenv('NOTIFICATION_FANOUT_BATCH_SIZE', 500))
+    NOTIFICATION_FANOUT_LEASE_SECONDS = int(os.getenv('NOTIFICATION_FANOUT_LEASE_SECONDS', 60))
+    NOTIFICATION_FANOUT_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_FANOUT_MAX_ATTEMPTS', 5))
+    
+    # ============ NOTIFICATION RETENTION ============
+    NOTIFICATION_RETENTION_READ_DAYS = int(os.getenv('NOTIFICATION_RETENTION_READ_DAYS', 90))  # 0 keeps read rows
+    NOTIFICATION_ARCHIVE_READ = os.getenv('NOTIFICATION_ARCHIVE_READ', 'True').lower() in ('true', '1', 't')  # False deletes them
+    NOTIFICATION_PURGE_CHUNK_SIZE = int(os.getenv('NOTIFICATION_PURGE_CHUNK_SIZE', 5000))  # ids per transaction
+    NOTIFICATION_PURGE_PAUSE_MS = int(os.getenv('NOTIFICATION_PURGE_PAUSE_MS', 20))  # sleep between chunks
+    
+    # ============ SECTION SEARCH ============
+    SECTION_SEARCH_REFRESH_SECONDS = int(os.getenv('SECTION_SEARCH_REFRESH_SECONDS', 5))  # catalog change check per process
+    
+    # ============ CATALOG CACHE ============
+    # Courses/subjects/available sections are cached per catalog version (bumped by admin writes)
+    CATALOG_WARM_ON_START = os.getenv('CATALOG_WARM_ON_START', 'True').lower() in ('true', '1', 't')
+    CATALOG_VERSION_CHECK_SECONDS = float(os.getenv('CATALOG_VERSION_CHECK_SECONDS', 2))  # cross-worker invalidation lag
+    CATALOG_CACHE_MAX_AGE_SECONDS = int(os.getenv('CATALOG_CACHE_MAX_AGE_SECONDS', 300))
+    CATALOG_CACHE_MAX_ENTRIES = int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', 1000))  # per process, LRU
+    CATALOG_SEATS_TTL_SECONDS = float(os.getenv('CATALOG_SEATS_TTL_SECONDS', 1))  # seat counts overlaid on cached sections
+    
+    # ============ SCHEDULE CONFLICTS ============
+    # Per-term room/teacher/section/student interval index, reused while `schedules` is unchanged
+    SCHEDULE_INDEX_CHECK_SECONDS = float(os.getenv('SCHEDULE_INDEX_CHECK_SECONDS', 1))  # cross-worker invalidation lag
+    SCHEDULE_INDEX_MAX_AGE_SECONDS = int(os.getenv('SCHEDULE_INDEX_MAX_AGE_SECONDS', 60))  # bounds staleness of teachers/enrollments
+    SCHEDULE_IMPORT_MAX_ROWS = int(os.getenv('SCHEDULE_IMPORT_MAX_ROWS', 5000))  # per bulk request / CSV
+    
+    # ============ TIMETABLE GENERATOR ============
+    TIMETABLE_RESTARTS = int(os.getenv('TIMETABLE_RESTARTS', 4))  # independent randomized runs; the best one is kept
+    TIMETABLE_WORKERS = int(os.getenv('TIMETABLE_WORKERS', min(4, os.cpu_count() or 1)))  # processes; 1 runs inline
+    TIMETABLE_TIME_LIMIT_SECONDS = float(os.getenv('TIMETABLE_TIME_LIMIT_SECONDS', 5))  # whole request, shared by all restarts
+    TIMETABLE_MAX_REPAIR_STEPS = int(os.getenv('TIMETABLE_MAX_REPAIR_STEPS', 50000))
+    TIMETABLE_MEETINGS_PER_WEEK = int(os.getenv('TIMETABLE_MEETINGS_PER_WEEK', 2))
+    TIMETABLE_DEFAULT_DAYS = os.getenv('TIMETABLE_DEFAULT_DAYS', 'Monday,Tuesday,Wednesday,Thursday,Friday').split(',')
+    TIMETABLE_DEFAULT_TIMES = os.getenv(
+        'TIMETABLE_DEFAULT_TIMES', '08:00-09:30,09:45-11:15,11:30-13:00,14:00-15:30,15:45-17:15'
+    ).split(',')
+    
+    # ============ ROSTER IMPORT ============
+    ROSTER_IMPORT_MAX_ROWS = int(os.getenv('ROSTER_IMPORT_MAX_ROWS', 10000))  # per CSV
+    
+    # ============ IDEMPOTENCY KEYS ============
+    # Retried enrollment requests / submissions with the same Idempotency-Key get the stored response
+    IDEMPOTENCY_ENABLED = os.getenv('IDEMPOTENCY_ENABLED', 'True').lower() in ('true', '1', 't')
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 86400))
+    IDEMPOTENCY_LEASE_SECONDS = int(os.getenv('IDEMPOTENCY_LEASE_SECONDS', 60))  # a claim left pending longer is taken over
+    IDEMPOTENCY_PURGE_SECONDS = int(os.getenv('IDEMPOTENCY_PURGE_SECONDS', 3600))  # 0 disables
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', 30))  # duplicate waits this long for the first
+    
+    # ============ LIVE NOTIFICATIONS (SSE) ============
+    # Every open stream holds a worker thread: serve with threaded workers (see gunicorn.conf.py), never sync ones
+    NOTIFICATION_STREAM_HEARTBEAT = int(os.getenv('NOTIFICATION_STREAM_HEARTBEAT', 25))  # seconds between keepalives
+    NOTIFICATION_STREAM_MAX_PER_WORKER = int(os.getenv('NOTIFICATION_STREAM_MAX_PER_WORKER', 30))  # keep below GUNICORN_THREADS; 503 above
+    NOTIFICATION_STREAM_TICKET_SECONDS = int(os.getenv('NOTIFICATION_STREAM_TICKET_SECONDS', 60))  # lifetime of a stream ticket
+    NOTIFICATION_RELAY = os.getenv('NOTIFICATION_RELAY') or None  # 'db' to fan out across worker processes
+    NOTIFICATION_RELAY_POLL_SECONDS = float(os.getenv('NOTIFICATION_RELAY_POLL_SECONDS', 1))
+    
     # ============ LOGGING ============
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'app.log')
     LOG_MAX_BYTES = 10 * 1024 * 1024  # 10MB
     LOG_BACKUP_COUNT = 5
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # 'json' for one object per line
+    
+    # ============ METRICS ============
+    # Prometheus text format at /metrics; set PROMETHEUS_MULTIPROC_DIR when running several workers
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() in ('true', '1', 't')
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None  # scrapers send Authorization: Bearer <token>
+    METRICS_ALLOWED_IPS = tuple(ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip())
 
     @staticmethod
     def init_app(app):
@@ -146,17 +234,7 @@ class ProductionConfig(Config):
     @staticmethod
     def init_app(app):
         Config.init_app(app)
-        import logging
-        from logging.handlers import RotatingFileHandler
-        
-        file_handler = RotatingFileHandler(
-            Config.LOG_FILE,
-            maxBytes=Config.LOG_MAX_BYTES,
-            backupCount=Config.LOG_BACKUP_COUNT
-        )
-        file_handler.setLevel(logging.INFO)
-        app.logger.addHandler(file_handler)
-        print("✅ Production logging initialized")
+        # LOG_FILE output is set up by utils.logger.init_logging (queued, non-blocking)
 
 
 class TestingConfig(Config):
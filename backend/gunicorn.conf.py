@@ -0,0 +1,38 @@
+"""Gunicorn settings, picked up automatically when gunicorn runs from backend/.
+
+/api/notifications/stream keeps one response open per browser tab. With sync
+workers every open tab would hold a whole worker and the 30s worker timeout
+would cut streams off, so threaded workers are used: each open stream holds one
+thread, and the worker's heartbeat does not depend on requests finishing.
+NOTIFICATION_STREAM_MAX_PER_WORKER (default 30) caps open streams per worker
+below `threads`, answering 503 above it, so API requests always find a thread.
+
+For many concurrent streams run an async worker instead, where an idle stream
+costs a greenlet rather than a thread:
+
+    GUNICORN_WORKER_CLASS=gevent NOTIFICATION_STREAM_MAX_PER_WORKER=2000 gunicorn app:app
+
+Every worker keeps its own SSE subscribers, so with more than one worker set
+NOTIFICATION_RELAY=db to deliver events published in another process.
+
+With PROMETHEUS_MULTIPROC_DIR set, metric files of workers that exit are
+marked dead so /metrics stops adding their live gauges.
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+# Open streams plus ordinary requests per worker (gthread)
+threads = int(os.getenv('GUNICORN_THREADS', 50))
+# Concurrent connections per worker (gevent / eventlet)
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 2500))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
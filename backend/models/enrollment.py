@@ -1,117 +1,404 @@
 from utils.database import mysql
+from utils.logger import get_logger
 from datetime import datetime, date
+import MySQLdb
+
+log = get_logger('enrollments')
+
+DUPLICATE_ENTRY = 1062
+
+
+class SectionUnavailable(Exception):
+    """The section does not exist or is not open for enrollment"""
+
+
+class AlreadyEnrolled(Exception):
+    """The student already has an enrollment row for the section"""
+
+    def __init__(self, status):
+        super().__init__(f"Already {status}")
+        self.status = status
+
 
 class Enrollment:
     """Enrollment Model - Manages student enrollments in sections"""
     
     @staticmethod
     def create(student_id, section_id):
-        """Create a new enrollment request"""
+        """Create a new enrollment request, or join the section's waitlist if it is full.
+        
+        A section is full when approved plus pending requests fill its capacity,
+        so new requests queue behind the waitlist instead of overtaking it.
+        Returns (enrollment_id, status) where status is 'pending' or 'waitlisted'
+        ('approved' if the request was promoted straight off the waitlist).
+        Raises SectionUnavailable or AlreadyEnrolled; the unique
+        (student_id, section_id) key catches duplicates without a lookup.
+        """
         cursor = mysql.connection.cursor()
         try:
-            # Check if section has available seats
             cursor.execute("""
-                SELECT capacity, enrolled_count FROM sections 
+                SELECT capacity, enrolled_count,
+                    (SELECT COUNT(*) FROM enrollments
+                     WHERE section_id = s.id AND status = 'pending') as pending
+                FROM sections s
                 WHERE id = %s AND is_active = TRUE
             """, (section_id,))
             section = cursor.fetchone()
             
             if not section:
-                cursor.close()
-                raise Exception("Section not found")
-            
-            if section['enrolled_count'] >= section['capacity']:
-                cursor.close()
-                raise Exception("Section is full")
+                raise SectionUnavailable(section_id)
             
-            # Check if already enrolled
-            cursor.execute("""
-                SELECT id FROM enrollments 
-                WHERE student_id = %s AND section_id = %s
-            """, (student_id, section_id))
+            taken = section['enrolled_count'] + section['pending']
+            status = 'waitlisted' if taken >= section['capacity'] else 'pending'
             
-            if cursor.fetchone():
-                cursor.close()
-                raise Exception("Already enrolled or pending")
+            try:
+                cursor.execute("""
+                    INSERT INTO enrollments (student_id, section_id, status, enrollment_date)
+                    VALUES (%s, %s, %s, %s)
+                """, (student_id, section_id, status, date.today()))
+            except MySQLdb.IntegrityError as e:
+                if e.args[0] != DUPLICATE_ENTRY:
+                    raise
+                mysql.connection.rollback()
+                cursor.execute("""
+                    SELECT status FROM enrollments 
+                    WHERE student_id = %s AND section_id = %s
+                """, (student_id, section_id))
+                existing = cursor.fetchone()
+                raise AlreadyEnrolled(existing['status'] if existing else 'enrolled')
+            enrollment_id = cursor.lastrowid
             
-            # Create enrollment
-            cursor.execute("""
-                INSERT INTO enrollments (student_id, section_id, status, enrollment_date)
-                VALUES (%s, %s, 'pending', %s)
-            """, (student_id, section_id, date.today()))
+            # A seat may have been released since the check above
+            promoted = Enrollment.promote_waitlist(cursor, section_id) if status == 'waitlisted' else []
             
             mysql.connection.commit()
-            enrollment_id = cursor.lastrowid
             cursor.close()
-            return enrollment_id
+            Enrollment.notify_promoted(promoted, section_id)
+            if student_id in promoted:
+                status = 'approved'
+            return enrollment_id, status
         except Exception as e:
             mysql.connection.rollback()
             cursor.close()
             raise e
 
     @staticmethod
-    def approve(enrollment_id, approved_by):
-        """Approve a pending enrollment"""
+    def reserve_seats(cursor, section_id, seats=1):
+        """Take seats in a section only if they are free; runs in the caller's transaction.
+        
+        The capacity check and the increment are one statement, so concurrent
+        approvals cannot push enrolled_count past capacity.
+        """
+        cursor.execute("""
+            UPDATE sections 
+            SET enrolled_count = enrolled_count + %s 
+            WHERE id = %s AND enrolled_count + %s <= capacity
+        """, (seats, section_id, seats))
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def _owned_enrollments(teacher_id):
+        """FROM/WHERE fragment limiting enrollments to a teacher's sections when teacher_id is given"""
+        if teacher_id is None:
+            return "FROM enrollments e WHERE 1=1", []
+        return """
+            FROM enrollments e
+            JOIN teacher_assignments ta ON ta.section_id = e.section_id AND ta.teacher_id = %s
+            WHERE 1=1
+        """, [teacher_id]
+
+    @staticmethod
+    def approve(enrollment_id, approved_by, teacher_id=None):
+        """Approve a pending enrollment if its section still has a free seat.
+        
+        Returns 'approved', 'not_found', 'not_pending' or 'full'. With teacher_id,
+        only enrollments in that teacher's sections are found.
+        """
         cursor = mysql.connection.cursor()
         try:
-            # Get enrollment details
-            cursor.execute("""
-                SELECT e.*, s.capacity, s.enrolled_count 
-                FROM enrollments e
-                JOIN sections s ON e.section_id = s.id
-                WHERE e.id = %s
-            """, (enrollment_id,))
+            source, params = Enrollment._owned_enrollments(teacher_id)
+            cursor.execute(f"""
+                SELECT e.id, e.section_id, e.status
+                {source} AND e.id = %s
+                FOR UPDATE
+            """, params + [enrollment_id])
             enrollment = cursor.fetchone()
             
             if not enrollment:
-                cursor.close()
-                raise Exception("Enrollment not found")
+                result = 'not_found'
+            elif enrollment['status'] != 'pending':
+                result = 'not_pending'
+            elif not Enrollment.reserve_seats(cursor, enrollment['section_id']):
+                result = 'full'
+            else:
+                cursor.execute("""
+                    UPDATE enrollments 
+                    SET status = 'approved', approved_by = %s, approved_date = %s
+                    WHERE id = %s
+                """, (approved_by, date.today(), enrollment_id))
+                result = 'approved'
             
-            if enrollment['status'] != 'pending':
-                cursor.close()
-                raise Exception("Enrollment is not pending")
+            if result == 'approved':
+                mysql.connection.commit()
+            else:
+                mysql.connection.rollback()
+            cursor.close()
+            return result
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+
+    @staticmethod
+    def parse_ids(values):
+        """Enrollment ids from a request body (ints or digit strings), or None if any is invalid"""
+        if not isinstance(values, list):
+            return None
+        ids = []
+        for value in values:
+            if isinstance(value, bool):
+                return None
+            if isinstance(value, str) and value.strip().isdigit():
+                value = int(value)
+            if not isinstance(value, int) or value <= 0:
+                return None
+            ids.append(value)
+        return ids
+
+    @staticmethod
+    def bulk_approve(enrollment_ids, approved_by, teacher_id=None):
+        """Approve many enrollments, one transaction per section.
+        
+        Within a section, requests are served first-come (created_at, then id)
+        until the free seats run out. Returns the ids grouped by outcome:
+        approved, full (lost the race for a seat), not_pending and not_found.
+        """
+        ids = list(dict.fromkeys(int(i) for i in enrollment_ids))
+        result = {'approved': [], 'full': [], 'not_pending': [], 'not_found': []}
+        if not ids:
+            return result
+        
+        cursor = mysql.connection.cursor()
+        try:
+            source, params = Enrollment._owned_enrollments(teacher_id)
+            placeholders = ', '.join(['%s'] * len(ids))
+            cursor.execute(f"""
+                SELECT e.id, e.section_id
+                {source} AND e.id IN ({placeholders})
+                ORDER BY e.section_id
+            """, params + ids)
+            by_section = {}
+            for row in cursor.fetchall():
+                by_section.setdefault(row['section_id'], []).append(row['id'])
+            
+            found = {i for section_ids in by_section.values() for i in section_ids}
+            result['not_found'] = [i for i in ids if i not in found]
             
-            if enrollment['enrolled_count'] >= enrollment['capacity']:
+            # Sections in id order, enrollment rows before the section row (same
+            # lock order as approve), so concurrent approvals cannot deadlock
+            for section_id, section_ids in by_section.items():
+                placeholders = ', '.join(['%s'] * len(section_ids))
+                cursor.execute(f"""
+                    SELECT id, status FROM enrollments
+                    WHERE id IN ({placeholders})
+                    ORDER BY created_at, id
+                    FOR UPDATE
+                """, section_ids)
+                rows = cursor.fetchall()
+                pending = [row['id'] for row in rows if row['status'] == 'pending']
+                result['not_pending'] += [row['id'] for row in rows if row['status'] != 'pending']
+                
+                cursor.execute("""
+                    SELECT GREATEST(capacity - enrolled_count, 0) as free
+                    FROM sections WHERE id = %s
+                    FOR UPDATE
+                """, (section_id,))
+                section = cursor.fetchone()
+                free = section['free'] if section else 0
+                winners, losers = pending[:free], pending[free:]
+                
+                if winners and Enrollment.reserve_seats(cursor, section_id, len(winners)):
+                    placeholders = ', '.join(['%s'] * len(winners))
+                    cursor.execute(f"""
+                        UPDATE enrollments 
+                        SET status = 'approved', approved_by = %s, approved_date = %s
+                        WHERE id IN ({placeholders})
+                    """, [approved_by, date.today()] + winners)
+                    mysql.connection.commit()
+                    result['approved'] += winners
+                else:
+                    mysql.connection.rollback()
+                    losers = pending
+                result['full'] += losers
+            
+            cursor.close()
+            return result
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+
+    @staticmethod
+    def import_roster(section_id, rows, approved_by, dry_run=False):
+        """Enroll a roster of students (approved) in one transaction.
+        
+        `rows` is a list of (row_number, value) where value is an email or a
+        student number. All values are resolved with one query, capacity is
+        checked once for the whole roster, and the enrollments are written with
+        one executemany; existing pending/waitlisted/dropped/rejected rows for
+        the section are approved in place. Nothing is written if the roster
+        does not fit. Returns {'rows', 'summary', 'free_seats', 'imported', 'error'}.
+        """
+        report = []
+        wanted = {}
+        for row_number, value in rows:
+            value = (value or '').strip()
+            key = value.lower()
+            if not value:
+                continue
+            if key in wanted:
+                report.append({'row': row_number, 'value': value, 'status': 'duplicate'})
+                continue
+            wanted[key] = row_number
+            report.append({'row': row_number, 'value': value, 'status': None})
+        
+        result = {'rows': report, 'summary': {}, 'free_seats': 0, 'imported': 0, 'error': None}
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("SELECT id FROM sections WHERE id = %s AND is_active = TRUE", (section_id,))
+            if not cursor.fetchone():
                 cursor.close()
-                raise Exception("Section is full")
+                result['error'] = 'section_not_found'
+                return result
             
-            # Update enrollment status
-            cursor.execute("""
-                UPDATE enrollments 
-                SET status = 'approved', approved_by = %s, approved_date = %s
-                WHERE id = %s
-            """, (approved_by, date.today(), enrollment_id))
+            emails = [v for v in wanted if '@' in v]
+            numbers = [v for v in wanted if '@' not in v]
+            resolved = {}
+            # One round trip; each branch of the UNION uses its own unique index
+            lookups, params = [], []
+            if emails:
+                lookups.append(f"""
+                    SELECT LOWER(u.email) as value, u.id
+                    FROM users u
+                    WHERE u.role = 'student' AND u.email IN ({', '.join(['%s'] * len(emails))})
+                """)
+                params += emails
+            if numbers:
+                lookups.append(f"""
+                    SELECT LOWER(sp.student_id) as value, u.id
+                    FROM student_profiles sp
+                    JOIN users u ON sp.user_id = u.id
+                    WHERE u.role = 'student' AND sp.student_id IN ({', '.join(['%s'] * len(numbers))})
+                """)
+                params += numbers
+            if lookups:
+                cursor.execute(" UNION ALL ".join(lookups), params)
+                resolved = {row['value']: row['id'] for row in cursor.fetchall()}
+            
+            student_ids = list(dict.fromkeys(resolved.values()))
+            existing = {}
+            if student_ids:
+                # Enrollment rows before the section row, as in bulk_approve
+                cursor.execute(f"""
+                    SELECT student_id, status FROM enrollments
+                    WHERE section_id = %s AND student_id IN ({', '.join(['%s'] * len(student_ids))})
+                    ORDER BY id
+                    FOR UPDATE
+                """, [section_id] + student_ids)
+                existing = {row['student_id']: row['status'] for row in cursor.fetchall()}
+            
+            to_enroll = []
+            for entry in report:
+                if entry['status']:
+                    continue
+                student_id = resolved.get(entry['value'].lower())
+                if student_id is None:
+                    entry['status'] = 'not_found'
+                elif existing.get(student_id) == 'approved' or student_id in to_enroll:
+                    entry['status'] = 'already_enrolled'
+                else:
+                    entry['status'] = 'enrolled'
+                    entry['student_id'] = student_id
+                    to_enroll.append(student_id)
             
-            # Increment section enrolled count
             cursor.execute("""
-                UPDATE sections 
-                SET enrolled_count = enrolled_count + 1 
-                WHERE id = %s
-            """, (enrollment['section_id'],))
+                SELECT GREATEST(capacity - enrolled_count, 0) as free
+                FROM sections WHERE id = %s
+                FOR UPDATE
+            """, (section_id,))
+            result['free_seats'] = cursor.fetchone()['free']
             
-            mysql.connection.commit()
+            if len(to_enroll) > result['free_seats']:
+                result['error'] = 'over_capacity'
+                for entry in report:
+                    if entry['status'] == 'enrolled':
+                        entry['status'] = 'over_capacity'
+            elif to_enroll and not dry_run:
+                today = date.today()
+                cursor.executemany("""
+                    INSERT INTO enrollments (student_id, section_id, status, enrollment_date, approved_by, approved_date)
+                    VALUES (%s, %s, 'approved', %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        status = 'approved', approved_by = VALUES(approved_by), approved_date = VALUES(approved_date)
+                """, [(student_id, section_id, today, approved_by, today) for student_id in to_enroll])
+                if not Enrollment.reserve_seats(cursor, section_id, len(to_enroll)):
+                    raise Exception("Section capacity changed during import")
+                result['imported'] = len(to_enroll)
+            
+            if result['error'] or dry_run:
+                mysql.connection.rollback()
+            else:
+                mysql.connection.commit()
             cursor.close()
-            return True
+            
+            for entry in report:
+                result['summary'][entry['status']] = result['summary'].get(entry['status'], 0) + 1
+            return result
         except Exception as e:
             mysql.connection.rollback()
             cursor.close()
             raise e
 
+    @staticmethod
+    def bulk_approve_summary(result):
+        """API body for a bulk_approve result; `full_ids` lost the race for a seat"""
+        return {
+            'message': f"Approved {len(result['approved'])} enrollments",
+            'success_count': len(result['approved']),
+            'approved_ids': result['approved'],
+            'failed_ids': result['full'] + result['not_pending'] + result['not_found'],
+            'full_ids': result['full'],
+            'not_pending_ids': result['not_pending'],
+            'not_found_ids': result['not_found']
+        }
+
     @staticmethod
     def reject(enrollment_id, approved_by):
-        """Reject a pending enrollment"""
+        """Reject a pending enrollment; the seat it held goes to the waitlist"""
         cursor = mysql.connection.cursor()
         try:
+            cursor.execute("""
+                SELECT section_id FROM enrollments
+                WHERE id = %s AND status = 'pending'
+                FOR UPDATE
+            """, (enrollment_id,))
+            enrollment = cursor.fetchone()
+            if not enrollment:
+                mysql.connection.rollback()
+                cursor.close()
+                return False
+            
             cursor.execute("""
                 UPDATE enrollments 
                 SET status = 'rejected', approved_by = %s, approved_date = %s
-                WHERE id = %s AND status = 'pending'
+                WHERE id = %s
             """, (approved_by, date.today(), enrollment_id))
+            promoted = Enrollment.promote_waitlist(cursor, enrollment['section_id'])
             
             mysql.connection.commit()
-            affected = cursor.rowcount
             cursor.close()
-            return affected > 0
+            Enrollment.notify_promoted(promoted, enrollment['section_id'])
+            return True
         except Exception as e:
             mysql.connection.rollback()
             cursor.close()
@@ -119,12 +406,15 @@ class Enrollment:
 
     @staticmethod
     def drop(enrollment_id, student_id):
-        """Drop an approved enrollment"""
+        """Drop an enrollment; a released seat goes to the head of the waitlist"""
         cursor = mysql.connection.cursor()
         try:
             # Get section_id before deleting
-            cursor.execute("SELECT section_id FROM enrollments WHERE id = %s AND student_id = %s", 
-                         (enrollment_id, student_id))
+            cursor.execute("""
+                SELECT section_id, status FROM enrollments
+                WHERE id = %s AND student_id = %s
+                FOR UPDATE
+            """, (enrollment_id, student_id))
             enrollment = cursor.fetchone()
             
             if not enrollment:
@@ -138,21 +428,163 @@ class Enrollment:
                 WHERE id = %s
             """, (enrollment_id,))
             
-            # Decrement section enrolled count
-            cursor.execute("""
-                UPDATE sections 
-                SET enrolled_count = enrolled_count - 1 
-                WHERE id = %s AND enrolled_count > 0
-            """, (enrollment['section_id'],))
+            promoted = []
+            if enrollment['status'] == 'approved':
+                promoted = Enrollment.release_seat(cursor, enrollment['section_id'])
+            elif enrollment['status'] == 'pending':
+                promoted = Enrollment.promote_waitlist(cursor, enrollment['section_id'])
             
             mysql.connection.commit()
             cursor.close()
+            Enrollment.notify_promoted(promoted, enrollment['section_id'])
             return True
         except Exception as e:
             mysql.connection.rollback()
             cursor.close()
             raise e
 
+    # ============ WAITLIST ============
+
+    @staticmethod
+    def release_seat(cursor, section_id):
+        """Give back one seat and promote from the waitlist; runs in the caller's transaction"""
+        return Enrollment.promote_waitlist(cursor, section_id, release=True)
+
+    @staticmethod
+    def promote_waitlist(cursor, section_id, release=False):
+        """Approve the oldest waitlisted requests into whatever seats are free.
+        
+        Pending requests came first, so they count as holding seats: only
+        seats beyond approved plus pending go to the waitlist. Call it after
+        any change that frees one (a seat released, a pending request
+        rejected, dropped or deleted).
+        
+        Runs in the caller's transaction. Locks follow the order approve and
+        bulk_approve use, enrollment rows before the section row: the pending
+        requests (shared) and the waitlist head first, sized from an unlocked
+        read of the section, then the section (with `release`, after giving
+        one seat back). Returns the promoted student ids (notify them with
+        notify_promoted after committing).
+        """
+        cursor.execute("""
+            SELECT COUNT(*) as pending FROM enrollments
+            WHERE section_id = %s AND status = 'pending'
+            LOCK IN SHARE MODE
+        """, (section_id,))
+        pending = cursor.fetchone()['pending']
+        
+        cursor.execute("""
+            SELECT capacity - enrolled_count as free
+            FROM sections WHERE id = %s
+        """, (section_id,))
+        section = cursor.fetchone()
+        if not section:
+            return []
+        
+        head = []
+        wanted = section['free'] + (1 if release else 0) - pending
+        if wanted > 0:
+            cursor.execute("""
+                SELECT id, student_id FROM enrollments
+                WHERE section_id = %s AND status = 'waitlisted'
+                ORDER BY created_at, id
+                LIMIT %s
+                FOR UPDATE
+            """, (section_id, wanted))
+            head = cursor.fetchall()
+        
+        if release:
+            cursor.execute("""
+                UPDATE sections 
+                SET enrolled_count = enrolled_count - 1 
+                WHERE id = %s AND enrolled_count > 0
+            """, (section_id,))
+        if not head:
+            return []
+        
+        # Seats taken since the unlocked read shrink the batch; the rest stay queued
+        cursor.execute("""
+            SELECT GREATEST(capacity - enrolled_count - %s, 0) as free
+            FROM sections WHERE id = %s
+            FOR UPDATE
+        """, (pending, section_id))
+        head = head[:cursor.fetchone()['free']]
+        if not head or not Enrollment.reserve_seats(cursor, section_id, len(head)):
+            return []
+        
+        placeholders = ', '.join(['%s'] * len(head))
+        cursor.execute(f"""
+            UPDATE enrollments 
+            SET status = 'approved', approved_date = %s
+            WHERE id IN ({placeholders})
+        """, [date.today()] + [row['id'] for row in head])
+        return [row['student_id'] for row in head]
+
+    @staticmethod
+    def notify_promoted(student_ids, section_id):
+        """Tell promoted students they got a seat (one bulk insert)"""
+        if not student_ids:
+            return
+        from models.notification import Notification
+        try:
+            Notification.create_bulk(
+                student_ids,
+                'student_enrolled',
+                'You are off the waitlist',
+                'A seat opened up and your enrollment has been approved.',
+                link='/student/sections',
+                class_id=section_id
+            )
+        except Exception:
+            # The promotion is committed; a lost notice must not undo it
+            log.exception('enrollments.waitlist_notify.failed', section_id=section_id, count=len(student_ids))
+
+    @staticmethod
+    def waitlist_position(enrollment_id):
+        """1-based place in the section's waitlist, or None if not waitlisted"""
+        cursor = mysql.connection.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) + 1 as position
+            FROM enrollments me
+            JOIN enrollments w ON w.section_id = me.section_id AND w.status = 'waitlisted'
+                AND (w.created_at < me.created_at OR (w.created_at = me.created_at AND w.id < me.id))
+            WHERE me.id = %s AND me.status = 'waitlisted'
+        """, (enrollment_id,))
+        row = cursor.fetchone()
+        cursor.execute("SELECT status FROM enrollments WHERE id = %s", (enrollment_id,))
+        current = cursor.fetchone()
+        cursor.close()
+        if not current or current['status'] != 'waitlisted':
+            return None
+        return row['position']
+
+    @staticmethod
+    def get_waitlist_by_student(student_id):
+        """A student's waitlisted requests with their current positions"""
+        cursor = mysql.connection.cursor()
+        cursor.execute("""
+            SELECT 
+                me.id as enrollment_id,
+                me.section_id,
+                me.created_at,
+                s.name as section_name,
+                sub.code as subject_code,
+                sub.name as subject_name,
+                (
+                    SELECT COUNT(*) + 1 FROM enrollments w
+                    WHERE w.section_id = me.section_id AND w.status = 'waitlisted'
+                    AND (w.created_at < me.created_at OR (w.created_at = me.created_at AND w.id < me.id))
+                ) as position
+            FROM enrollments me
+            JOIN sections s ON me.section_id = s.id
+            JOIN subjects sub ON s.subject_id = sub.id
+            WHERE me.student_id = %s AND me.status = 'waitlisted'
+            ORDER BY me.created_at
+        """, (student_id,))
+        waitlist = cursor.fetchall()
+        cursor.close()
+        return waitlist
+
     @staticmethod
     def get_by_student(student_id, status=None):
         """Get all enrollments for a student"""
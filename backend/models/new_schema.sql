@@ -300,4 +300,255 @@ CREATE INDEX idx_enrollments_section ON enrollments(section_id, status);
 CREATE INDEX idx_teacher_assignments_teacher ON teacher_assignments(teacher_id);
 CREATE INDEX idx_schedules_section ON schedules(section_id);
 CREATE INDEX idx_zoom_section ON zoom_meetings(section_id);
-CREATE INDEX idx_attendance_section_date ON attendance(section_id, date);
\ No newline at end of file
+CREATE INDEX idx_attendance_section_date ON attendance(section_id, date);
+-- ==========================================
+-- 13. USER ROLE VERSIONS (token revocation)
+-- ==========================================
+
+-- Bumped when a user's role changes or the account is deleted. Access tokens
+-- issued before changed_at are rejected. No FK so rows survive user deletion.
+CREATE TABLE IF NOT EXISTS user_role_versions (
+    user_id INT PRIMARY KEY,
+    version INT NOT NULL DEFAULT 1,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_role_versions_changed (changed_at)
+);
+
+-- ==========================================
+-- 14. BROADCAST NOTIFICATIONS
+-- ==========================================
+
+-- System announcements are stored once per audience instead of once per user
+CREATE TABLE IF NOT EXISTS notification_broadcasts (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    audience ENUM('all', 'student', 'teacher', 'admin') NOT NULL,
+    type VARCHAR(50) NOT NULL DEFAULT 'system_announcement',
+    title VARCHAR(200) NOT NULL,
+    message TEXT NOT NULL,
+    link VARCHAR(255),
+    sender_id INT,
+    priority ENUM('low', 'normal', 'high') DEFAULT 'normal',
+    expires_at DATETIME NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (sender_id) REFERENCES users(id) ON DELETE SET NULL,
+    INDEX idx_broadcasts_audience_created (audience, created_at)
+);
+
+-- Sparse per-user state: a row exists only once a user has read or dismissed a broadcast
+CREATE TABLE IF NOT EXISTS broadcast_receipts (
+    user_id INT NOT NULL,
+    broadcast_id INT NOT NULL,
+    read_at TIMESTAMP NULL,
+    dismissed_at TIMESTAMP NULL,
+    PRIMARY KEY (user_id, broadcast_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (broadcast_id) REFERENCES notification_broadcasts(id) ON DELETE CASCADE
+);
+
+-- ==========================================
+-- 15. NOTIFICATION UNREAD COUNTERS
+-- ==========================================
+
+-- Maintained by every notification write path and reconciled by a background job.
+-- `version` changes on every update and backs the unread-count ETag.
+CREATE TABLE IF NOT EXISTS notification_counters (
+    user_id INT PRIMARY KEY,
+    unread INT NOT NULL DEFAULT 0,
+    version INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Backfill every existing user, so write paths that seed a missing row with
+-- their own delta never start from zero for a user with older unread rows
+INSERT INTO notification_counters (user_id, unread, version)
+SELECT
+    u.id,
+    (SELECT COUNT(*) FROM notifications n
+     WHERE n.user_id = u.id AND n.is_read = FALSE
+     AND (n.expires_at IS NULL OR n.expires_at > NOW())),
+    1
+FROM users u
+ON DUPLICATE KEY UPDATE user_id = user_id;
+
+-- ==========================================
+-- 16. NOTIFICATION EVENTS (SSE RELAY)
+-- ==========================================
+
+-- Only used when NOTIFICATION_RELAY = 'db': every worker polls rows newer than the
+-- last id it saw and pushes them to its own open streams. Purged after an hour.
+CREATE TABLE IF NOT EXISTS notification_events (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    event VARCHAR(50) NOT NULL,
+    payload TEXT NOT NULL,
+    user_ids TEXT NULL,
+    audience ENUM('all', 'student', 'teacher', 'admin') NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_notification_events_created (created_at)
+);
+
+-- ==========================================
+-- 17. NOTIFICATION FEED KEYSET INDEXES
+-- ==========================================
+
+-- The feed is ordered by (priority, created_at, id) and paged with a cursor over
+-- those columns; a stored rank lets both branches walk an index instead of sorting
+ALTER TABLE notifications
+ADD COLUMN priority_rank TINYINT AS (FIELD(priority, 'low', 'normal', 'high')) STORED;
+
+ALTER TABLE notification_broadcasts
+ADD COLUMN priority_rank TINYINT AS (FIELD(priority, 'low', 'normal', 'high')) STORED;
+
+CREATE INDEX idx_notifications_feed ON notifications(user_id, priority_rank, created_at, id);
+CREATE INDEX idx_broadcasts_feed ON notification_broadcasts(audience, priority_rank, created_at, id);
+
+-- ==========================================
+-- 18. NOTIFICATION ARCHIVE (RETENTION)
+-- ==========================================
+
+-- Read notifications older than NOTIFICATION_RETENTION_READ_DAYS are moved here by the
+-- purge job (python purge_notifications.py). Not read by the application.
+CREATE TABLE IF NOT EXISTS notifications_archive (
+    id INT PRIMARY KEY,
+    user_id INT NOT NULL,
+    type VARCHAR(50) NOT NULL,
+    title VARCHAR(200) NOT NULL,
+    message TEXT NOT NULL,
+    link VARCHAR(255),
+    is_read BOOLEAN,
+    sender_id INT,
+    class_id INT,
+    priority VARCHAR(10),
+    created_at TIMESTAMP NULL,
+    expires_at DATETIME NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_notifications_archive_user (user_id, created_at)
+);
+
+-- ==========================================
+-- 19. NOTIFICATION FAN-OUT JOBS
+-- ==========================================
+
+-- Queued class/teacher sends. Workers claim a job with a lease and deliver it in
+-- student-id order; `last_user_id` is committed with each batch so a job resumes
+-- after a crash, and (job_id, user_id) keeps a replayed batch from duplicating.
+CREATE TABLE IF NOT EXISTS notification_jobs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    kind ENUM('class', 'teacher') NOT NULL,
+    target_id INT NOT NULL,
+    sender_id INT,
+    payload TEXT NOT NULL,
+    status ENUM('queued', 'running', 'done', 'failed') DEFAULT 'queued',
+    total INT DEFAULT 0,
+    delivered INT DEFAULT 0,
+    last_user_id INT NOT NULL DEFAULT 0,
+    attempts INT DEFAULT 0,
+    locked_by VARCHAR(100) NULL,
+    locked_until DATETIME NULL,
+    error VARCHAR(500) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME NULL,
+    finished_at DATETIME NULL,
+    FOREIGN KEY (sender_id) REFERENCES users(id) ON DELETE SET NULL,
+    INDEX idx_notification_jobs_status (status, id),
+    INDEX idx_notification_jobs_locked_by (locked_by)
+);
+
+ALTER TABLE notifications
+ADD COLUMN job_id INT NULL,
+ADD UNIQUE KEY uq_notifications_job_user (job_id, user_id);
+
+-- ==========================================
+-- 20. ENROLLMENT WAITLIST
+-- ==========================================
+
+-- Requests for a full section are stored as 'waitlisted'. When a seat is
+-- released the oldest waitlisted rows (created_at, id) are approved straight
+-- into the free seats; the index serves both that head-of-queue read and
+-- the position count.
+ALTER TABLE enrollments
+MODIFY status ENUM('pending', 'approved', 'rejected', 'dropped', 'waitlisted') DEFAULT 'pending';
+
+CREATE INDEX idx_enrollments_waitlist ON enrollments(section_id, status, created_at, id);
+
+-- ==========================================
+-- 21. ENROLLED_COUNT RECONCILIATION
+-- ==========================================
+
+-- The incremental reconciliation pass looks up sections whose row or
+-- enrollments changed since its previous run.
+CREATE INDEX idx_sections_updated_at ON sections(updated_at);
+CREATE INDEX idx_enrollments_updated_at ON enrollments(updated_at);
+
+-- ==========================================
+-- 22. CATALOG VERSION
+-- ==========================================
+
+-- Single row bumped by admin writes to courses, subjects, sections and teacher
+-- assignments; workers poll it to invalidate their cached catalog responses.
+CREATE TABLE IF NOT EXISTS catalog_versions (
+    id TINYINT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+INSERT IGNORE INTO catalog_versions (id, version) VALUES (1, 0);
+
+-- ==========================================
+-- 23. SECTION COUNTERS
+-- ==========================================
+
+-- Per-section counts for the teacher section listing, kept in step by the
+-- assignment, material and zoom write paths (student counts are
+-- sections.enrolled_count). `meetings_as_of` is the day upcoming_meetings was
+-- last recounted; a periodic job recounts rows from earlier days.
+-- Rebuild with: python rebuild_section_counters.py
+CREATE TABLE IF NOT EXISTS section_counters (
+    section_id INT PRIMARY KEY,
+    assignment_count INT NOT NULL DEFAULT 0,
+    material_count INT NOT NULL DEFAULT 0,
+    upcoming_meetings INT NOT NULL DEFAULT 0,
+    meetings_as_of DATE NOT NULL,
+    FOREIGN KEY (section_id) REFERENCES sections(id) ON DELETE CASCADE,
+    INDEX idx_section_counters_meetings_as_of (meetings_as_of)
+);
+
+INSERT INTO section_counters (section_id, assignment_count, material_count, upcoming_meetings, meetings_as_of)
+SELECT
+    s.id,
+    (SELECT COUNT(*) FROM assignments a WHERE a.section_id = s.id),
+    (SELECT COUNT(*) FROM materials m WHERE m.section_id = s.id),
+    (SELECT COUNT(*) FROM zoom_meetings zm WHERE zm.section_id = s.id AND zm.meeting_date >= CURDATE()),
+    CURDATE()
+FROM sections s
+ON DUPLICATE KEY UPDATE section_id = section_id;
+
+-- ==========================================
+-- 24. SCHEDULE CONFLICT INDEX
+-- ==========================================
+
+-- The conflict engine loads one term (academic_year, semester) at a time and
+-- revalidates its cache with COUNT/MAX(id)/MAX(updated_at) over schedules.
+CREATE INDEX idx_sections_term ON sections(academic_year, semester);
+CREATE INDEX idx_schedules_updated_at ON schedules(updated_at);
+
+-- ==========================================
+-- 25. IDEMPOTENCY KEYS
+-- ==========================================
+
+-- Stored responses for requests sent with an Idempotency-Key, shared by every
+-- worker. `key_hash` is sha256(user, endpoint, key). A request claims its row
+-- ('pending', locked_by = its token, lease in locked_until) before running and
+-- stores the response when done; duplicates wait for that and replay it.
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key_hash CHAR(64) PRIMARY KEY,
+    fingerprint CHAR(64) NOT NULL,
+    state ENUM('pending', 'done') NOT NULL DEFAULT 'pending',
+    status_code SMALLINT NULL,
+    body MEDIUMBLOB NULL,
+    mimetype VARCHAR(100) NULL,
+    locked_by CHAR(32) NOT NULL,
+    locked_until DATETIME NULL,
+    expires_at DATETIME NOT NULL,
+    INDEX idx_idempotency_keys_expires_at (expires_at)
+);
@@ -1,9 +1,183 @@
 from utils.database import mysql
+from utils.notification_hub import hub
+from utils.jobs import single_runner
+from utils.logger import get_logger
+from collections import OrderedDict
 from datetime import datetime
+import base64
+import json
+import threading
+import time
+
+# Broadcasts visible to user `me`: addressed to everyone or to their role, and sent
+# after the account was created (matching who would have received a per-user row)
+VISIBLE_BROADCASTS = """
+    FROM notification_broadcasts b
+    JOIN users me ON me.id = %s
+        AND (b.audience = 'all' OR b.audience = me.role)
+        AND b.created_at >= me.created_at
+    LEFT JOIN broadcast_receipts r ON r.broadcast_id = b.id AND r.user_id = me.id
+"""
+
+# Tie-break between the two feed sources on equal (priority, created_at);
+# matches ORDER BY source DESC ('notification' > 'broadcast')
+FEED_SOURCE_RANK = {'notification': 1, 'broadcast': 0}
+
+# Per-user unread counter upserts; `version` changes on every change so it can back an ETag
+COUNTER_DELTA = """
+    ON DUPLICATE KEY UPDATE unread = GREATEST(unread + {delta}, 0), version = version + 1
+"""
+COUNTER_RESET = """
+    INSERT INTO notification_counters (user_id, unread, version)
+    VALUES (%s, 0, 1)
+    ON DUPLICATE KEY UPDATE unread = 0, version = version + 1
+"""
+
+# Per-user stats rollups, cached per process and keyed by the unread version
+_stats_cache = OrderedDict()
+_stats_cache_lock = threading.Lock()
+STATS_CACHE_SIZE = 5000
+
+# Newest broadcast id, cached per process: (value, fetched_at)
+_latest_broadcast = {'id': 0, 'fetched_at': None}
+_latest_broadcast_lock = threading.Lock()
+
+log = get_logger('notifications')
 
 class Notification:
     """Notification Model - Handles all notification operations"""
     
+    AUDIENCES = ['all', 'student', 'teacher', 'admin']
+    
+    # ============ LIVE EVENTS ============
+    
+    @staticmethod
+    def _publish(event, data, user_ids=None, audience=None):
+        """Push an event to open streams; never fails the write that triggered it"""
+        try:
+            hub.publish(event, data, user_ids=user_ids, audience=audience)
+        except Exception as e:
+            log.warning('notifications.publish_failed', event_name=event, error=str(e))
+    
+    @staticmethod
+    def _event(notification_type, title, message, link, priority, **extra):
+        return dict(extra, type=notification_type, title=title, message=message,
+                    link=link, priority=priority, unread_delta=1)
+    
+    # ============ UNREAD COUNTERS ============
+    
+    @staticmethod
+    def _bump_counter(cursor, user_id, delta):
+        """Adjust a user's unread counter inside the caller's transaction (delta 0 only bumps the version).
+
+        Called after the write, so a missing row is seeded from the
+        notifications table, which already reflects it.
+        """
+        cursor.execute("""
+            UPDATE notification_counters
+            SET unread = GREATEST(unread + %s, 0), version = version + 1
+            WHERE user_id = %s
+        """, (delta, user_id))
+        if cursor.rowcount == 0:
+            cursor.execute("""
+                INSERT INTO notification_counters (user_id, unread, version)
+                SELECT %s, COUNT(*), 1 FROM notifications
+                WHERE user_id = %s AND is_read = FALSE
+                AND (expires_at IS NULL OR expires_at > NOW())
+                ON DUPLICATE KEY UPDATE version = version + 1
+            """, (user_id, user_id))
+    
+    @staticmethod
+    def _seed_counter(cursor, user_id):
+        """Create a missing counter row from the notifications table and return its value"""
+        cursor.execute("""
+            INSERT INTO notification_counters (user_id, unread, version)
+            SELECT %s, COUNT(*), 1 FROM notifications
+            WHERE user_id = %s AND is_read = FALSE
+            AND (expires_at IS NULL OR expires_at > NOW())
+            ON DUPLICATE KEY UPDATE unread = VALUES(unread)
+        """, (user_id, user_id))
+        mysql.connection.commit()
+        cursor.execute("SELECT unread FROM notification_counters WHERE user_id = %s", (user_id,))
+        row = cursor.fetchone()
+        return row['unread'] if row else 0
+    
+    @staticmethod
+    def latest_broadcast_id(max_age=5):
+        """Newest broadcast id, re-read from the DB at most every `max_age` seconds per process"""
+        now = time.monotonic()
+        fetched_at = _latest_broadcast['fetched_at']
+        if fetched_at is not None and now - fetched_at < max_age:
+            return _latest_broadcast['id']
+        with _latest_broadcast_lock:
+            cursor = mysql.connection.cursor()
+            cursor.execute("SELECT COALESCE(MAX(id), 0) as id FROM notification_broadcasts")
+            row = cursor.fetchone()
+            cursor.close()
+            _latest_broadcast['id'] = row['id'] if row else 0
+            _latest_broadcast['fetched_at'] = now
+        return _latest_broadcast['id']
+    
+    @staticmethod
+    def get_unread_version(user_id, bucket_seconds=300):
+        """Cheap change marker for a user's unread badge.
+
+        Combines the counter version, the newest broadcast id and a coarse time
+        bucket, so expiries that no write path sees still refresh the badge.
+        """
+        cursor = mysql.connection.cursor()
+        cursor.execute("SELECT version FROM notification_counters WHERE user_id = %s", (user_id,))
+        row = cursor.fetchone()
+        cursor.close()
+        version = row['version'] if row else 0
+        bucket = int(time.time() // bucket_seconds)
+        return f"{version}.{Notification.latest_broadcast_id()}.{bucket}"
+    
+    @staticmethod
+    def reconcile_unread_counters(chunk_size=1000):
+        """Recompute counters from the notifications table in user-id chunks; returns rows corrected.
+
+        Runs in one worker process at a time; returns None when another holds the lock.
+        """
+        with single_runner('notification-counters') as acquired:
+            if not acquired:
+                return None
+            cursor = mysql.connection.cursor()
+            try:
+                cursor.execute("SELECT COALESCE(MAX(id), 0) as max_id FROM users")
+                max_id = cursor.fetchone()['max_id']
+                corrected = 0
+                
+                for low in range(0, max_id + 1, chunk_size):
+                    high = low + chunk_size - 1
+                    # `version` is assigned first so it still sees the old `unread`
+                    cursor.execute("""
+                        INSERT INTO notification_counters (user_id, unread, version)
+                        SELECT u.id, COALESCE(t.cnt, 0), 1
+                        FROM users u
+                        LEFT JOIN (
+                            SELECT user_id, COUNT(*) as cnt
+                            FROM notifications
+                            WHERE user_id BETWEEN %s AND %s AND is_read = FALSE
+                            AND (expires_at IS NULL OR expires_at > NOW())
+                            GROUP BY user_id
+                        ) t ON t.user_id = u.id
+                        WHERE u.id BETWEEN %s AND %s
+                        ON DUPLICATE KEY UPDATE
+                            version = version + (unread <> VALUES(unread)),
+                            unread = VALUES(unread)
+                    """, (low, high, low, high))
+                    mysql.connection.commit()
+                    # rowcount: 1 per new row, 2 per changed row, 0 per unchanged row
+                    corrected += cursor.rowcount // 2
+                
+                cursor.close()
+                return corrected
+            except Exception as e:
+                mysql.connection.rollback()
+                cursor.close()
+                raise e
+    
     # ============ CREATE OPERATIONS ============
     
     @staticmethod
@@ -15,16 +189,22 @@ class Notification:
                 INSERT INTO notifications (user_id, type, title, message, link, sender_id, class_id, priority, created_at)
                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
             """, (user_id, notification_type, title, message, link, sender_id, class_id, priority))
+            notification_id = cursor.lastrowid
             
+            Notification._bump_counter(cursor, user_id, 1)
             mysql.connection.commit()
-            notification_id = cursor.lastrowid
             cursor.close()
             
-            print(f"✅ Notification created for user {user_id}: {title}")
+            Notification._publish('notification', Notification._event(
+                notification_type, title, message, link, priority,
+                id=notification_id, class_id=class_id
+            ), user_ids=[user_id])
+            
+            log.debug('notifications.created', user_id=user_id, notification_id=notification_id)
             return notification_id
             
         except Exception as e:
-            print(f"❌ Error creating notification: {e}")
+            log.exception('notifications.create_failed', user_id=user_id)
             mysql.connection.rollback()
             cursor.close()
             raise e
@@ -42,272 +222,413 @@ class Notification:
                 INSERT INTO notifications (user_id, type, title, message, link, sender_id, class_id, priority, created_at)
                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
             """, values)
+            affected = cursor.rowcount
+            
+            cursor.executemany("""
+                INSERT INTO notification_counters (user_id, unread, version)
+                VALUES (%s, 1, 1)
+            """ + COUNTER_DELTA.format(delta=1), [(user_id,) for user_id in user_ids])
             
             mysql.connection.commit()
-            affected = cursor.rowcount
             cursor.close()
             
-            print(f"✅ Created {affected} notifications")
+            Notification._publish('notification', Notification._event(
+                notification_type, title, message, link, priority, class_id=class_id
+            ), user_ids=user_ids)
+            
+            log.debug('notifications.created_bulk', count=affected)
             return affected
             
         except Exception as e:
-            print(f"❌ Error creating bulk notifications: {e}")
+            log.exception('notifications.create_bulk_failed')
             mysql.connection.rollback()
             cursor.close()
             raise e
     
     @staticmethod
     def send_to_class(class_id, sender_id, title, message, notification_type='class_announcement', link=None, priority='normal'):
-        """Send notification to all students in a class/section"""
+        """Send notification to all students in a class/section (one INSERT ... SELECT)"""
         cursor = mysql.connection.cursor()
         try:
-            print(f"\n{'📌'*60}")
-            print(f"📌 SEND_TO_CLASS CALLED - Section ID: {class_id}")
-            print(f"{'📌'*60}")
-            print(f"   ├─ sender_id: {sender_id}")
-            print(f"   ├─ title: {title}")
-            print(f"   ├─ message: {message[:50]}..." if len(message) > 50 else f"   ├─ message: {message}")
-            print(f"   ├─ type: {notification_type}")
-            print(f"   └─ priority: {priority}")
-            
-            # Check if section exists
-            cursor.execute("SELECT id, name FROM sections WHERE id = %s", (class_id,))
-            section = cursor.fetchone()
-            if not section:
-                print(f"   ❌ Section {class_id} NOT FOUND!")
-                cursor.close()
-                return 0
-            print(f"   ✅ Section found: {section['name']} (ID: {section['id']})")
+            cursor.execute("""
+                INSERT INTO notifications (
+                    user_id, type, title, message, link,
+                    sender_id, class_id, priority, created_at
+                )
+                SELECT e.student_id, %s, %s, %s, %s, %s, e.section_id, %s, NOW()
+                FROM enrollments e
+                WHERE e.section_id = %s AND e.status = 'approved'
+            """, (notification_type, title, message, link, sender_id, priority, class_id))
+            sent = cursor.rowcount
             
-            # Get all enrolled students
-            print(f"   🔍 Querying for students in section {class_id}...")
             cursor.execute("""
-                SELECT u.id, u.email, u.name
+                INSERT INTO notification_counters (user_id, unread, version)
+                SELECT e.student_id, 1, 1
                 FROM enrollments e
-                JOIN users u ON e.student_id = u.id
                 WHERE e.section_id = %s AND e.status = 'approved'
-            """, (class_id,))
-            
-            students = cursor.fetchall()
-            print(f"   📊 Found {len(students)} students:")
-            if students:
-                for i, s in enumerate(students):
-                    print(f"      {i+1}. ID: {s['id']}, Email: {s['email']}, Name: {s['name']}")
-            else:
-                print(f"      ⚠️ No students found in section {class_id}")
-                cursor.close()
-                return 0
+            """ + COUNTER_DELTA.format(delta=1), (class_id,))
             
-            # Create notifications
-            print(f"   📨 Creating notifications...")
-            success_count = 0
-            for student in students:
-                try:
-                    cursor.execute("""
-                        INSERT INTO notifications (
-                            user_id, type, title, message, link, 
-                            sender_id, class_id, priority, created_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
-                    """, (
-                        student['id'],
-                        notification_type,
-                        title,
-                        message,
-                        link,
-                        sender_id,
-                        class_id,
-                        priority
-                    ))
-                    print(f"      ✅ Created for {student['email']}")
-                    success_count += 1
-                except Exception as e:
-                    print(f"      ❌ Failed for {student['email']}: {e}")
+            # Recipient ids are only needed when someone is listening
+            recipients = None
+            if hub.wants_events():
+                cursor.execute("""
+                    SELECT student_id FROM enrollments
+                    WHERE section_id = %s AND status = 'approved'
+                """, (class_id,))
+                recipients = [row['student_id'] for row in cursor.fetchall()]
             
             mysql.connection.commit()
-            print(f"   {'✅'*40}")
-            print(f"   ✅ SUCCESS: {success_count}/{len(students)} notifications created")
-            print(f"   {'✅'*40}\n")
             cursor.close()
-            return success_count
+            
+            if recipients:
+                Notification._publish('notification', Notification._event(
+                    notification_type, title, message, link, priority, class_id=class_id
+                ), user_ids=recipients)
+            
+            log.info('notifications.sent_to_class', class_id=class_id, recipients=sent)
+            return sent
             
         except Exception as e:
-            print(f"   ❌ ERROR in send_to_class: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception('notifications.send_to_class_failed', class_id=class_id)
             mysql.connection.rollback()
             cursor.close()
             raise e
     
     @staticmethod
     def send_to_teacher_classes(teacher_user_id, sender_id, title, message, notification_type='teacher_announcement', link=None, priority='normal'):
-        """Send notification to all students in all classes taught by a teacher"""
+        """Send notification to all students taught by a teacher, once per student"""
         cursor = mysql.connection.cursor()
         try:
-            print(f"\n{'🔥'*60}")
-            print(f"🔥 SEND_TO_TEACHER_CLASSES STARTED")
-            print(f"{'🔥'*60}")
-            print(f"   ├─ teacher_user_id: {teacher_user_id}")
-            print(f"   ├─ sender_id: {sender_id}")
-            print(f"   ├─ title: {title}")
-            print(f"   ├─ message: {message[:50]}..." if len(message) > 50 else f"   ├─ message: {message}")
-            print(f"   ├─ type: {notification_type}")
-            print(f"   └─ priority: {priority}")
-            
-            # Get all sections taught by teacher
-            print(f"   🔍 Querying sections for teacher {teacher_user_id}...")
+            # Students in several of the teacher's sections get a single row,
+            # linked to the lowest section id they share with the teacher
             cursor.execute("""
-                SELECT s.id, s.name 
-                FROM sections s
-                JOIN teacher_assignments ta ON s.id = ta.section_id
-                WHERE ta.teacher_id = %s
-            """, (teacher_user_id,))
-            
-            sections = cursor.fetchall()
-            print(f"   📊 Found {len(sections)} sections for teacher {teacher_user_id}:")
-            if sections:
-                for i, s in enumerate(sections):
-                    print(f"      {i+1}. Section ID: {s['id']}, Name: {s['name']}")
-            else:
-                print(f"      ⚠️ No sections found for this teacher!")
-                cursor.close()
-                return 0
-            
-            total_sent = 0
-            for section in sections:
-                print(f"\n   {'─'*50}")
-                print(f"   ▶ Processing section {section['id']} ({section['name']})...")
-                sent = Notification.send_to_class(
-                    section['id'], 
-                    sender_id, 
-                    title, 
-                    message, 
-                    notification_type, 
-                    link, 
-                    priority
+                INSERT INTO notifications (
+                    user_id, type, title, message, link,
+                    sender_id, class_id, priority, created_at
                 )
-                print(f"   ◀ Section {section['id']} returned {sent} notifications")
-                total_sent += sent
+                SELECT e.student_id, %s, %s, %s, %s, %s, MIN(e.section_id), %s, NOW()
+                FROM teacher_assignments ta
+                JOIN enrollments e ON e.section_id = ta.section_id AND e.status = 'approved'
+                WHERE ta.teacher_id = %s
+                GROUP BY e.student_id
+            """, (notification_type, title, message, link, sender_id, priority, teacher_user_id))
+            sent = cursor.rowcount
             
-            print(f"\n   {'🎉'*50}")
-            print(f"   🎉 TOTAL: {total_sent} notifications sent across all sections")
-            print(f"   {'🎉'*50}\n")
+            cursor.execute("""
+                INSERT INTO notification_counters (user_id, unread, version)
+                SELECT DISTINCT e.student_id, 1, 1
+                FROM teacher_assignments ta
+                JOIN enrollments e ON e.section_id = ta.section_id AND e.status = 'approved'
+                WHERE ta.teacher_id = %s
+            """ + COUNTER_DELTA.format(delta=1), (teacher_user_id,))
+            
+            recipients = None
+            if hub.wants_events():
+                cursor.execute("""
+                    SELECT DISTINCT e.student_id
+                    FROM teacher_assignments ta
+                    JOIN enrollments e ON e.section_id = ta.section_id AND e.status = 'approved'
+                    WHERE ta.teacher_id = %s
+                """, (teacher_user_id,))
+                recipients = [row['student_id'] for row in cursor.fetchall()]
+            
+            mysql.connection.commit()
             cursor.close()
-            return total_sent
+            
+            if recipients:
+                Notification._publish('notification', Notification._event(
+                    notification_type, title, message, link, priority
+                ), user_ids=recipients)
+            
+            log.info('notifications.sent_to_teacher_classes', teacher_id=teacher_user_id, recipients=sent)
+            return sent
             
         except Exception as e:
-            print(f"   ❌ ERROR in send_to_teacher_classes: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception('notifications.send_to_teacher_classes_failed', teacher_id=teacher_user_id)
+            mysql.connection.rollback()
             cursor.close()
             raise e
     
     @staticmethod
-    def send_to_all_students(sender_id, title, message, notification_type='system_announcement', link=None, priority='normal'):
-        """Send notification to all students in the system (Admin only)"""
+    def broadcast(audience, sender_id, title, message, notification_type='system_announcement', link=None, priority='normal', expires_at=None):
+        """Store one announcement for a whole audience ('all', 'student', 'teacher', 'admin')"""
+        if audience not in Notification.AUDIENCES:
+            raise ValueError(f"Invalid audience. Must be one of: {', '.join(Notification.AUDIENCES)}")
+        
         cursor = mysql.connection.cursor()
         try:
-            print(f"\n{'🌍'*60}")
-            print(f"🌍 SEND_TO_ALL_STUDENTS")
-            print(f"{'🌍'*60}")
-            print(f"   sender_id: {sender_id}")
-            print(f"   title: {title}")
-            
-            cursor.execute("SELECT u.id, u.email FROM users u WHERE u.role = 'student'")
-            students = cursor.fetchall()
-            print(f"   📊 Found {len(students)} students in system")
-            
-            if not students:
-                return 0
-            
-            values = []
-            for student in students:
-                values.append((
-                    student['id'],
-                    notification_type,
-                    title,
-                    message,
-                    link,
-                    sender_id,
-                    None,
-                    priority
-                ))
-            
-            cursor.executemany("""
-                INSERT INTO notifications (user_id, type, title, message, link, sender_id, class_id, priority, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
-            """, values)
+            cursor.execute("""
+                INSERT INTO notification_broadcasts (
+                    audience, type, title, message, link, sender_id, priority, expires_at, created_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+            """, (audience, notification_type, title, message, link, sender_id, priority, expires_at))
             
             mysql.connection.commit()
-            affected = cursor.rowcount
+            broadcast_id = cursor.lastrowid
             cursor.close()
             
-            print(f"   ✅ Created {affected} notifications")
-            return affected
+            _latest_broadcast['id'] = max(_latest_broadcast['id'], broadcast_id)
+            
+            Notification._publish('notification', Notification._event(
+                notification_type, title, message, link, priority, id=f"b{broadcast_id}"
+            ), audience=audience)
+            
+            log.info('notifications.broadcast', broadcast_id=broadcast_id, audience=audience)
+            return broadcast_id
             
         except Exception as e:
             mysql.connection.rollback()
             cursor.close()
             raise e
     
+    @staticmethod
+    def count_audience(audience):
+        """Number of users a broadcast to `audience` reaches"""
+        cursor = mysql.connection.cursor()
+        if audience == 'all':
+            cursor.execute("SELECT COUNT(*) as count FROM users")
+        else:
+            cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = %s", (audience,))
+        result = cursor.fetchone()
+        cursor.close()
+        return result['count'] if result else 0
+    
+    @staticmethod
+    def send_to_all_students(sender_id, title, message, notification_type='system_announcement', link=None, priority='normal'):
+        """Send notification to all students in the system (Admin only)"""
+        Notification.broadcast('student', sender_id, title, message, notification_type, link, priority)
+        return Notification.count_audience('student')
+    
     # ============ READ OPERATIONS ============
     
     @staticmethod
-    def get_by_user(user_id, limit=50, offset=0, unread_only=False, include_expired=False):
-        """Get notifications for a user"""
-        cursor = mysql.connection.cursor()
+    def parse_id(raw_id):
+        """Split a feed id into (source, id): '42' -> ('notification', 42), 'b7' -> ('broadcast', 7)"""
+        raw_id = str(raw_id)
+        if raw_id.startswith('b') and raw_id[1:].isdigit():
+            return 'broadcast', int(raw_id[1:])
+        if raw_id.isdigit():
+            return 'notification', int(raw_id)
+        return None, None
+    
+    @staticmethod
+    def split_ids(raw_ids):
+        """Partition feed ids into personal notification ids and broadcast ids"""
+        personal, broadcasts = [], []
+        for raw_id in raw_ids:
+            source, item_id = Notification.parse_id(raw_id)
+            if source == 'notification':
+                personal.append(item_id)
+            elif source == 'broadcast':
+                broadcasts.append(item_id)
+        return personal, broadcasts
+    
+    @staticmethod
+    def encode_cursor(row):
+        """Opaque position of a feed row: (priority rank, created_at, source, id)"""
+        key = [
+            int(row['priority_rank']),
+            row['created_at'].strftime('%Y-%m-%d %H:%M:%S'),
+            FEED_SOURCE_RANK[row['source']],
+            int(row['id'])
+        ]
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(token):
+        """Inverse of encode_cursor; raises ValueError for anything malformed"""
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            rank, created_at, source_rank, item_id = json.loads(base64.urlsafe_b64decode(padded))
+            datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')
+            return int(rank), created_at, int(source_rank), int(item_id)
+        except Exception:
+            raise ValueError('Invalid cursor')
+    
+    @staticmethod
+    def _after_cursor(alias, source, position):
+        """Keyset predicate selecting one branch's rows that sort after `position`.
         
-        print(f"\n🔍 Getting notifications for user {user_id}, limit={limit}, unread_only={unread_only}")
+        Within a branch the source is constant, so the tie on created_at resolves
+        either to every row, no row, or rows with a lower id.
+        """
+        rank, created_at, source_rank, item_id = position
+        branch_rank = FEED_SOURCE_RANK[source]
+        if branch_rank < source_rank:
+            same_rank = f"{alias}.created_at <= %s"
+            params = [created_at]
+        elif branch_rank > source_rank:
+            same_rank = f"{alias}.created_at < %s"
+            params = [created_at]
+        else:
+            same_rank = f"({alias}.created_at < %s OR ({alias}.created_at = %s AND {alias}.id < %s))"
+            params = [created_at, created_at, item_id]
+        sql = f" AND ({alias}.priority_rank < %s OR ({alias}.priority_rank = %s AND {same_rank}))"
+        return sql, [rank, rank] + params
+    
+    @staticmethod
+    def get_by_user(user_id, limit=50, cursor_token=None, unread_only=False, include_expired=False):
+        """Get one page of a user's feed, with broadcasts for their role merged in.
         
-        query = """
-            SELECT n.*, 
-                   u.name as sender_name,
-                   c.name as class_name
+        Pages are addressed by an opaque cursor rather than OFFSET, so every page
+        is an index range scan of `limit` rows no matter how deep it is.
+        Returns (notifications, next_cursor); next_cursor is None on the last page.
+        """
+        position = Notification.decode_cursor(cursor_token) if cursor_token else None
+        
+        personal = """
+            SELECT n.id, 'notification' as source, n.user_id, n.type, n.title, n.message,
+                   n.link, n.is_read, n.sender_id, n.class_id, n.priority,
+                   n.created_at, n.expires_at, n.priority_rank
             FROM notifications n
-            LEFT JOIN users u ON n.sender_id = u.id
-            LEFT JOIN classes c ON n.class_id = c.id
             WHERE n.user_id = %s
         """
-        params = [user_id]
+        broadcast = f"""
+            SELECT b.id, 'broadcast' as source, me.id as user_id, b.type, b.title, b.message,
+                   b.link, (r.user_id IS NOT NULL) as is_read, b.sender_id, NULL as class_id, b.priority,
+                   b.created_at, b.expires_at, b.priority_rank
+            {VISIBLE_BROADCASTS}
+            WHERE r.dismissed_at IS NULL
+        """
+        personal_params, broadcast_params = [user_id], [user_id]
         
         if not include_expired:
-            query += " AND (n.expires_at IS NULL OR n.expires_at > NOW())"
+            personal += " AND (n.expires_at IS NULL OR n.expires_at > NOW())"
+            broadcast += " AND (b.expires_at IS NULL OR b.expires_at > NOW())"
         
         if unread_only:
-            query += " AND n.is_read = FALSE"
+            personal += " AND n.is_read = FALSE"
+            broadcast += " AND r.user_id IS NULL"
         
-        query += " ORDER BY n.priority DESC, n.created_at DESC LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
+        if position:
+            sql, params = Notification._after_cursor('n', 'notification', position)
+            personal += sql
+            personal_params += params
+            sql, params = Notification._after_cursor('b', 'broadcast', position)
+            broadcast += sql
+            broadcast_params += params
         
-        cursor.execute(query, params)
-        notifications = cursor.fetchall()
+        # Each branch reads at most limit + 1 rows off its index; the extra row
+        # only tells us whether another page exists
+        fetch = limit + 1
+        branch_order = " ORDER BY {alias}.priority_rank DESC, {alias}.created_at DESC, {alias}.id DESC LIMIT %s"
+        query = f"""
+            SELECT f.*, u.name as sender_name, c.name as class_name
+            FROM (
+                ({personal}{branch_order.format(alias='n')})
+                UNION ALL
+                ({broadcast}{branch_order.format(alias='b')})
+            ) f
+            LEFT JOIN users u ON f.sender_id = u.id
+            LEFT JOIN classes c ON f.class_id = c.id
+            ORDER BY f.priority_rank DESC, f.created_at DESC, f.source DESC, f.id DESC
+            LIMIT %s
+        """
+        cursor = mysql.connection.cursor()
+        cursor.execute(query, personal_params + [fetch] + broadcast_params + [fetch, fetch])
+        notifications = list(cursor.fetchall())
+        cursor.close()
         
-        print(f"📊 Found {len(notifications)} notifications for user {user_id}")
-        for i, n in enumerate(notifications):
-            print(f"   {i+1}. ID: {n['id']}, Title: {n['title']}, Read: {n['is_read']}")
+        next_cursor = None
+        if len(notifications) > limit:
+            notifications = notifications[:limit]
+            next_cursor = Notification.encode_cursor(notifications[-1])
         
-        cursor.close()
-        return notifications
+        for n in notifications:
+            n.pop('priority_rank', None)
+            if n['source'] == 'broadcast':
+                n['id'] = f"b{n['id']}"
+        
+        return notifications, next_cursor
     
     @staticmethod
     def get_unread_count(user_id):
-        """Get count of unread notifications"""
+        """Get count of unread notifications (maintained counter plus unread broadcasts)"""
         cursor = mysql.connection.cursor()
         try:
-            cursor.execute("""
-                SELECT COUNT(*) as count FROM notifications 
-                WHERE user_id = %s AND is_read = FALSE
-                AND (expires_at IS NULL OR expires_at > NOW())
-            """, (user_id,))
+            cursor.execute(f"""
+                SELECT
+                    (SELECT unread FROM notification_counters WHERE user_id = %s) as personal,
+                    (SELECT COUNT(*) {VISIBLE_BROADCASTS}
+                     WHERE r.user_id IS NULL
+                     AND (b.expires_at IS NULL OR b.expires_at > NOW())) as broadcasts
+            """, (user_id, user_id))
             
             result = cursor.fetchone()
-            count = result['count'] if result else 0
+            personal = result['personal'] if result else None
+            if personal is None:
+                personal = Notification._seed_counter(cursor, user_id)
+            broadcasts = result['broadcasts'] if result else 0
             cursor.close()
-            return count
+            return int(personal) + int(broadcasts)
         except Exception as e:
-            print(f"❌ Error in get_unread_count: {e}")
+            log.exception('notifications.unread_count_failed', user_id=user_id)
             cursor.close()
             return 0
     
+    @staticmethod
+    def get_stats(user_id):
+        """Totals, unread, per-type counts and a 7-day histogram for a user's feed.
+        
+        One grouped pass over the user's notifications and visible broadcasts
+        yields all four. The result is cached against get_unread_version, which
+        every write path bumps, so repeat loads cost a single PK lookup.
+        """
+        version = Notification.get_unread_version(user_id)
+        with _stats_cache_lock:
+            cached = _stats_cache.get(user_id)
+            if cached and cached[0] == version:
+                _stats_cache.move_to_end(user_id)
+                return cached[1]
+        
+        cursor = mysql.connection.cursor()
+        cursor.execute(f"""
+            SELECT type, day, SUM(cnt) as cnt, SUM(unread) as unread
+            FROM (
+                SELECT n.type,
+                       IF(n.created_at >= NOW() - INTERVAL 7 DAY, DATE(n.created_at), NULL) as day,
+                       COUNT(*) as cnt, SUM(n.is_read = FALSE) as unread
+                FROM notifications n
+                WHERE n.user_id = %s
+                GROUP BY n.type, day
+                UNION ALL
+                SELECT b.type,
+                       IF(b.created_at >= NOW() - INTERVAL 7 DAY, DATE(b.created_at), NULL) as day,
+                       COUNT(*) as cnt, SUM(r.user_id IS NULL) as unread
+                {VISIBLE_BROADCASTS}
+                WHERE r.dismissed_at IS NULL
+                GROUP BY b.type, day
+            ) t
+            GROUP BY type, day
+        """, (user_id, user_id))
+        rows = cursor.fetchall()
+        cursor.close()
+        
+        total = unread = 0
+        by_type, by_day = {}, {}
+        for row in rows:
+            count = int(row['cnt'])
+            total += count
+            unread += int(row['unread'] or 0)
+            by_type[row['type']] = by_type.get(row['type'], 0) + count
+            if row['day'] is not None:
+                by_day[row['day']] = by_day.get(row['day'], 0) + count
+        
+        stats = {
+            'total': total,
+            'unread': unread,
+            'read': total - unread,
+            'by_type': [{'type': t, 'count': c} for t, c in by_type.items()],
+            'recent_activity': [{'date': d, 'count': by_day[d]} for d in sorted(by_day, reverse=True)]
+        }
+        
+        with _stats_cache_lock:
+            _stats_cache[user_id] = (version, stats)
+            _stats_cache.move_to_end(user_id)
+            while len(_stats_cache) > STATS_CACHE_SIZE:
+                _stats_cache.popitem(last=False)
+        return stats
+    
     @staticmethod
     def get_by_class(class_id, limit=50):
         """Get notifications for a specific class (for teachers)"""
@@ -364,17 +685,71 @@ class Notification:
             cursor.execute("""
                 UPDATE notifications 
                 SET is_read = TRUE 
-                WHERE id = %s AND user_id = %s
+                WHERE id = %s AND user_id = %s AND is_read = FALSE
             """, (notification_id, user_id))
-            mysql.connection.commit()
             affected = cursor.rowcount
+            if affected:
+                Notification._bump_counter(cursor, user_id, -affected)
+            mysql.connection.commit()
             cursor.close()
+            if affected:
+                Notification._publish('unread', {'delta': -affected}, user_ids=[user_id])
             return affected > 0
         except Exception as e:
             mysql.connection.rollback()
             cursor.close()
             raise e
     
+    @staticmethod
+    def mark_many_as_read(notification_ids, user_id):
+        """Mark several of a user's notifications as read"""
+        if not notification_ids:
+            return 0
+        cursor = mysql.connection.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(notification_ids))
+            cursor.execute(f"""
+                UPDATE notifications 
+                SET is_read = TRUE 
+                WHERE id IN ({placeholders}) AND user_id = %s AND is_read = FALSE
+            """, list(notification_ids) + [user_id])
+            count = cursor.rowcount
+            if count:
+                Notification._bump_counter(cursor, user_id, -count)
+            mysql.connection.commit()
+            cursor.close()
+            if count:
+                Notification._publish('unread', {'delta': -count}, user_ids=[user_id])
+            return count
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+    
+    @staticmethod
+    def mark_broadcasts_read(broadcast_ids, user_id):
+        """Record read receipts for broadcasts (already-read ones are left alone)"""
+        if not broadcast_ids:
+            return 0
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.executemany("""
+                INSERT IGNORE INTO broadcast_receipts (user_id, broadcast_id, read_at)
+                VALUES (%s, %s, NOW())
+            """, [(user_id, broadcast_id) for broadcast_id in broadcast_ids])
+            affected = cursor.rowcount
+            if affected:
+                Notification._bump_counter(cursor, user_id, 0)
+            mysql.connection.commit()
+            cursor.close()
+            if affected:
+                Notification._publish('unread', {'delta': -affected}, user_ids=[user_id])
+            return affected
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+    
     @staticmethod
     def mark_all_as_read(user_id):
         """Mark all notifications as read"""
@@ -385,9 +760,20 @@ class Notification:
                 SET is_read = TRUE 
                 WHERE user_id = %s AND is_read = FALSE
             """, (user_id,))
-            mysql.connection.commit()
             count = cursor.rowcount
+            
+            cursor.execute(f"""
+                INSERT INTO broadcast_receipts (user_id, broadcast_id, read_at)
+                SELECT me.id, b.id, NOW()
+                {VISIBLE_BROADCASTS}
+                WHERE r.user_id IS NULL
+            """, (user_id,))
+            count += cursor.rowcount
+            
+            cursor.execute(COUNTER_RESET, (user_id,))
+            mysql.connection.commit()
             cursor.close()
+            Notification._publish('unread', {'unread_count': 0}, user_ids=[user_id])
             return count
         except Exception as e:
             mysql.connection.rollback()
@@ -402,13 +788,79 @@ class Notification:
         cursor = mysql.connection.cursor()
         try:
             cursor.execute("""
-                DELETE FROM notifications 
+                SELECT is_read FROM notifications
                 WHERE id = %s AND user_id = %s
+                FOR UPDATE
             """, (notification_id, user_id))
+            notification = cursor.fetchone()
+            
+            if not notification:
+                cursor.close()
+                return False
+            
+            cursor.execute("DELETE FROM notifications WHERE id = %s", (notification_id,))
+            if not notification['is_read']:
+                Notification._bump_counter(cursor, user_id, -1)
             mysql.connection.commit()
-            affected = cursor.rowcount
             cursor.close()
-            return affected > 0
+            if not notification['is_read']:
+                Notification._publish('unread', {'delta': -1}, user_ids=[user_id])
+            return True
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+    
+    @staticmethod
+    def delete_many(notification_ids, user_id):
+        """Delete several of a user's notifications"""
+        if not notification_ids:
+            return 0
+        cursor = mysql.connection.cursor()
+        try:
+            placeholders = ', '.join(['%s'] * len(notification_ids))
+            params = list(notification_ids) + [user_id]
+            cursor.execute(f"""
+                SELECT COUNT(*) as unread FROM notifications
+                WHERE id IN ({placeholders}) AND user_id = %s AND is_read = FALSE
+                FOR UPDATE
+            """, params)
+            unread = cursor.fetchone()['unread']
+            
+            cursor.execute(f"""
+                DELETE FROM notifications 
+                WHERE id IN ({placeholders}) AND user_id = %s
+            """, params)
+            count = cursor.rowcount
+            if unread:
+                Notification._bump_counter(cursor, user_id, -unread)
+            mysql.connection.commit()
+            cursor.close()
+            if unread:
+                Notification._publish('unread', {'delta': -unread}, user_ids=[user_id])
+            return count
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+    
+    @staticmethod
+    def dismiss_broadcasts(broadcast_ids, user_id):
+        """Hide broadcasts from one user's feed; the broadcast itself is kept"""
+        if not broadcast_ids:
+            return 0
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.executemany("""
+                INSERT INTO broadcast_receipts (user_id, broadcast_id, read_at, dismissed_at)
+                VALUES (%s, %s, NOW(), NOW())
+                ON DUPLICATE KEY UPDATE dismissed_at = COALESCE(dismissed_at, NOW())
+            """, [(user_id, broadcast_id) for broadcast_id in broadcast_ids])
+            Notification._bump_counter(cursor, user_id, 0)
+            mysql.connection.commit()
+            cursor.close()
+            Notification._publish('unread', {'refresh': True}, user_ids=[user_id])
+            return len(broadcast_ids)
         except Exception as e:
             mysql.connection.rollback()
             cursor.close()
@@ -416,18 +868,29 @@ class Notification:
     
     @staticmethod
     def clear_all(user_id):
-        """Delete all notifications for a user"""
+        """Delete all notifications for a user and dismiss their broadcasts"""
         cursor = mysql.connection.cursor()
         try:
             cursor.execute("""
                 DELETE FROM notifications 
                 WHERE user_id = %s
             """, (user_id,))
-            mysql.connection.commit()
             count = cursor.rowcount
+            
+            cursor.execute(f"""
+                INSERT INTO broadcast_receipts (user_id, broadcast_id, read_at, dismissed_at)
+                SELECT me.id, b.id, NOW(), NOW()
+                {VISIBLE_BROADCASTS}
+                WHERE r.dismissed_at IS NULL
+                ON DUPLICATE KEY UPDATE dismissed_at = NOW()
+            """, (user_id,))
+            
+            cursor.execute(COUNTER_RESET, (user_id,))
+            mysql.connection.commit()
             cursor.close()
+            Notification._publish('unread', {'unread_count': 0}, user_ids=[user_id])
             return count
         except Exception as e:
             mysql.connection.rollback()
             cursor.close()
-            raise e
\ No newline at end of file
+            raise e
@@ -0,0 +1,283 @@
+from flask import current_app
+from utils.database import mysql
+from models.notification import Notification, COUNTER_DELTA
+from utils.logger import get_logger
+import json
+import os
+import socket
+import threading
+import uuid
+
+log = get_logger('notifications.jobs')
+
+
+class NotificationJob:
+    """Queued notification fan-out, delivered in batches by background workers.
+
+    Jobs live in `notification_jobs`. A worker claims one with a lease, then
+    delivers recipients in student-id order. Each batch's notifications and the
+    job's `last_user_id` cursor are committed in the same transaction, so a
+    crashed worker's job is picked up after the lease expires and resumes exactly
+    where the last committed batch ended.
+    """
+
+    KINDS = ['class', 'teacher']
+
+    # Recipients after a cursor, in id order: (student_id, class_id)
+    RECIPIENTS = {
+        'class': """
+            SELECT e.student_id, e.section_id as class_id
+            FROM enrollments e
+            WHERE e.section_id = %s AND e.status = 'approved' AND e.student_id > %s
+            ORDER BY e.student_id
+            LIMIT %s
+        """,
+        'teacher': """
+            SELECT e.student_id, MIN(e.section_id) as class_id
+            FROM teacher_assignments ta
+            JOIN enrollments e ON e.section_id = ta.section_id AND e.status = 'approved'
+            WHERE ta.teacher_id = %s AND e.student_id > %s
+            GROUP BY e.student_id
+            ORDER BY e.student_id
+            LIMIT %s
+        """,
+    }
+
+    COUNT_RECIPIENTS = {
+        'class': """
+            SELECT COUNT(*) as total FROM enrollments
+            WHERE section_id = %s AND status = 'approved'
+        """,
+        'teacher': """
+            SELECT COUNT(DISTINCT e.student_id) as total
+            FROM teacher_assignments ta
+            JOIN enrollments e ON e.section_id = ta.section_id AND e.status = 'approved'
+            WHERE ta.teacher_id = %s
+        """,
+    }
+
+    # ============ ENQUEUE / STATUS ============
+
+    @staticmethod
+    def enqueue(kind, target_id, sender_id, title, message, notification_type, link=None, priority='normal'):
+        """Queue a fan-out and return (job_id, expected recipients)"""
+        if kind not in NotificationJob.KINDS:
+            raise ValueError(f"Invalid job kind. Must be one of: {', '.join(NotificationJob.KINDS)}")
+
+        payload = {
+            'title': title,
+            'message': message,
+            'type': notification_type,
+            'link': link,
+            'priority': priority,
+        }
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute(NotificationJob.COUNT_RECIPIENTS[kind], (target_id,))
+            total = cursor.fetchone()['total']
+            cursor.execute("""
+                INSERT INTO notification_jobs (kind, target_id, sender_id, payload, status, total, created_at)
+                VALUES (%s, %s, %s, %s, 'queued', %s, NOW())
+            """, (kind, target_id, sender_id, json.dumps(payload), total))
+            job_id = cursor.lastrowid
+            mysql.connection.commit()
+            cursor.close()
+            return job_id, total
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+
+    @staticmethod
+    def get(job_id):
+        """Job row with progress, or None"""
+        cursor = mysql.connection.cursor()
+        cursor.execute("""
+            SELECT id, kind, target_id, sender_id, status, total, delivered, attempts,
+                   error, created_at, started_at, finished_at
+            FROM notification_jobs
+            WHERE id = %s
+        """, (job_id,))
+        job = cursor.fetchone()
+        cursor.close()
+        if job:
+            job['progress'] = round(100 * job['delivered'] / job['total'], 1) if job['total'] else (
+                100.0 if job['status'] == 'done' else 0.0
+            )
+        return job
+
+    # ============ WORKER ============
+
+    @staticmethod
+    def _worker_token():
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}:{uuid.uuid4().hex[:8]}"
+
+    @staticmethod
+    def claim(lease_seconds, max_attempts):
+        """Take the oldest queued job, or a running one whose lease expired; returns (job, token)"""
+        token = NotificationJob._worker_token()
+        cursor = mysql.connection.cursor()
+        try:
+            # Idle polls stop at this indexed read instead of taking row locks with UPDATEs
+            cursor.execute("""
+                SELECT id FROM notification_jobs
+                WHERE status = 'queued' OR (status = 'running' AND locked_until < NOW())
+                LIMIT 1
+            """)
+            if not cursor.fetchone():
+                mysql.connection.commit()
+                cursor.close()
+                return None, None
+            # Jobs that keep crashing their worker are given up on
+            cursor.execute("""
+                UPDATE notification_jobs
+                SET status = 'failed', error = 'Too many attempts', finished_at = NOW()
+                WHERE status = 'running' AND locked_until < NOW() AND attempts >= %s
+            """, (max_attempts,))
+            cursor.execute("""
+                UPDATE notification_jobs
+                SET status = 'running', locked_by = %s,
+                    locked_until = NOW() + INTERVAL %s SECOND,
+                    attempts = attempts + 1,
+                    started_at = COALESCE(started_at, NOW())
+                WHERE status = 'queued' OR (status = 'running' AND locked_until < NOW())
+                ORDER BY id
+                LIMIT 1
+            """, (token, lease_seconds))
+            claimed = cursor.rowcount
+            mysql.connection.commit()
+            if not claimed:
+                cursor.close()
+                return None, None
+
+            cursor.execute("SELECT * FROM notification_jobs WHERE locked_by = %s", (token,))
+            job = cursor.fetchone()
+            cursor.close()
+            job['payload'] = json.loads(job['payload'])
+            return job, token
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+
+    @staticmethod
+    def deliver_batch(job, token, batch_size, lease_seconds):
+        """Deliver the next batch; returns the recipient ids, [] when finished, or None if the lease was lost"""
+        payload = job['payload']
+        cursor = mysql.connection.cursor()
+        try:
+            # Serializes with any other worker that believes it owns this job
+            cursor.execute("""
+                SELECT status, locked_by, last_user_id
+                FROM notification_jobs WHERE id = %s
+                FOR UPDATE
+            """, (job['id'],))
+            current = cursor.fetchone()
+            if current['status'] != 'running' or current['locked_by'] != token:
+                mysql.connection.rollback()
+                cursor.close()
+                return None
+
+            cursor.execute(
+                NotificationJob.RECIPIENTS[job['kind']],
+                (job['target_id'], current['last_user_id'], batch_size)
+            )
+            batch = cursor.fetchall()
+
+            if not batch:
+                cursor.execute("""
+                    UPDATE notification_jobs
+                    SET status = 'done', locked_by = NULL, locked_until = NULL, finished_at = NOW()
+                    WHERE id = %s
+                """, (job['id'],))
+                mysql.connection.commit()
+                cursor.close()
+                return []
+
+            # (job_id, user_id) is unique, so a replayed batch cannot double-deliver
+            cursor.executemany("""
+                INSERT IGNORE INTO notifications (
+                    user_id, type, title, message, link,
+                    sender_id, class_id, priority, job_id, created_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+            """, [
+                (row['student_id'], payload['type'], payload['title'], payload['message'], payload['link'],
+                 job['sender_id'], row['class_id'], payload['priority'], job['id'])
+                for row in batch
+            ])
+            delivered = cursor.rowcount
+
+            user_ids = [row['student_id'] for row in batch]
+            cursor.executemany("""
+                INSERT INTO notification_counters (user_id, unread, version)
+                VALUES (%s, 1, 1)
+            """ + COUNTER_DELTA.format(delta=1), [(user_id,) for user_id in user_ids])
+
+            cursor.execute("""
+                UPDATE notification_jobs
+                SET last_user_id = %s, delivered = delivered + %s,
+                    locked_until = NOW() + INTERVAL %s SECOND
+                WHERE id = %s
+            """, (user_ids[-1], delivered, lease_seconds, job['id']))
+            mysql.connection.commit()
+            cursor.close()
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+
+        Notification._publish('notification', Notification._event(
+            payload['type'], payload['title'], payload['message'], payload['link'], payload['priority']
+        ), user_ids=user_ids)
+        return user_ids
+
+    @staticmethod
+    def fail(job_id, token, error):
+        cursor = mysql.connection.cursor()
+        cursor.execute("""
+            UPDATE notification_jobs
+            SET status = 'failed', error = %s, locked_by = NULL, locked_until = NULL, finished_at = NOW()
+            WHERE id = %s AND locked_by = %s
+        """, (str(error)[:500], job_id, token))
+        mysql.connection.commit()
+        cursor.close()
+
+    @staticmethod
+    def process_next(batch_size=500, lease_seconds=60, max_attempts=5):
+        """Claim one job and run it to completion; returns the job id or None if the queue is empty"""
+        job, token = NotificationJob.claim(lease_seconds, max_attempts)
+        if job is None:
+            return None
+
+        try:
+            while True:
+                delivered = NotificationJob.deliver_batch(job, token, batch_size, lease_seconds)
+                if not delivered:
+                    # Finished ([]) or another worker took over (None)
+                    break
+        except Exception as e:
+            log.exception('notifications.job_failed', job_id=job['id'], attempt=job['attempts'])
+            try:
+                mysql.connection.rollback()
+                if job['attempts'] >= max_attempts:
+                    NotificationJob.fail(job['id'], token, e)
+            except Exception:
+                pass
+            # Otherwise the lease expires and the job resumes from its cursor
+        return job['id']
+
+    @staticmethod
+    def run_pending():
+        """Periodic worker entry point: drain the queue, one job at a time"""
+        config = current_app.config
+        while NotificationJob.process_next(
+            batch_size=config.get('NOTIFICATION_FANOUT_BATCH_SIZE', 500),
+            lease_seconds=config.get('NOTIFICATION_FANOUT_LEASE_SECONDS', 60),
+            max_attempts=config.get('NOTIFICATION_FANOUT_MAX_ATTEMPTS', 5)
+        ) is not None:
+            pass
+
+    @staticmethod
+    def is_enabled(config):
+        """Fan-out goes through the queue only when there are workers to drain it"""
+        return bool(config.get('NOTIFICATION_FANOUT_WORKERS')) and config.get('BACKGROUND_JOBS_ENABLED', True)
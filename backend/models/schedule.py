@@ -1,4 +1,5 @@
 from utils.database import mysql
+from utils import schedule_conflicts
 
 class Schedule:
     """Schedule Model - Manages class timetables"""
@@ -21,12 +22,109 @@ class Schedule:
             mysql.connection.commit()
             schedule_id = cursor.lastrowid
             cursor.close()
+            schedule_conflicts.invalidate()
             return schedule_id
         except Exception as e:
             mysql.connection.rollback()
             cursor.close()
             raise e
 
+    IMPORT_FIELDS = ('section_id', 'day', 'start_time', 'end_time', 'room')
+
+    @staticmethod
+    def bulk_create(rows, dry_run=False):
+        """Validate and insert many schedule entries in one transaction.
+        
+        `rows` is a list of (row_number, dict) with the IMPORT_FIELDS. The
+        sections are read (and locked) with one query, each term's schedules
+        are loaded once into a ScheduleIndex, and every row is checked against
+        the database and the rows before it in memory. Valid rows are inserted
+        with one executemany, which MySQLdb sends as a single multi-row INSERT.
+        Per-row status: created, invalid, section_not_found or conflict.
+        Returns {'rows', 'summary', 'created'}.
+        """
+        report = []
+        parsed = []
+        for row_number, item in rows:
+            entry = {'row': row_number, 'section_id': item.get('section_id'), 'status': None}
+            report.append(entry)
+            try:
+                missing = [f for f in ('section_id', 'day', 'start_time', 'end_time') if not str(item.get(f) or '').strip()]
+                if missing:
+                    raise ValueError(f"Missing {', '.join(missing)}")
+                section_id = int(item['section_id'])
+                day = str(item['day']).strip().capitalize()
+                if day not in Schedule.DAYS:
+                    raise ValueError(f"Invalid day: {item['day']}")
+                start = schedule_conflicts.to_minutes(item['start_time'])
+                end = schedule_conflicts.to_minutes(item['end_time'])
+                if end <= start:
+                    raise ValueError("End time must be after start time")
+            except (TypeError, ValueError) as e:
+                entry['status'] = 'invalid'
+                entry['error'] = str(e)
+                continue
+            room = (str(item.get('room') or '').strip() or None)
+            entry.update({'section_id': section_id, 'day': day,
+                          'start_time': schedule_conflicts.format_minutes(start),
+                          'end_time': schedule_conflicts.format_minutes(end), 'room': room})
+            parsed.append((entry, section_id, day, start, end, room))
+        
+        result = {'rows': report, 'summary': {}, 'created': 0}
+        cursor = mysql.connection.cursor()
+        try:
+            section_ids = sorted({section_id for _, section_id, *_ in parsed})
+            terms = {}
+            if section_ids:
+                # Locked so a section cannot be deleted between validation and insert
+                cursor.execute(f"""
+                    SELECT id, academic_year, semester FROM sections
+                    WHERE id IN ({', '.join(['%s'] * len(section_ids))})
+                    ORDER BY id
+                    FOR UPDATE
+                """, section_ids)
+                terms = {row['id']: (row['academic_year'], row['semester']) for row in cursor.fetchall()}
+            
+            indexes = {}
+            to_insert = []
+            for entry, section_id, day, start, end, room in parsed:
+                term = terms.get(section_id)
+                if term is None:
+                    entry['status'] = 'section_not_found'
+                    continue
+                if term not in indexes:
+                    indexes[term] = schedule_conflicts.index_for_term(*term, fresh=True)
+                index = indexes[term]
+                conflicts = index.conflicts(section_id, day, start, end, room)
+                if conflicts:
+                    entry['status'] = 'conflict'
+                    entry['conflicts'] = conflicts
+                    continue
+                # Later rows of the batch are checked against this one
+                index.add(section_id, day, start, end, room)
+                entry['status'] = 'created'
+                to_insert.append((section_id, day, entry['start_time'], entry['end_time'], room))
+            
+            if to_insert and not dry_run:
+                cursor.executemany("""
+                    INSERT INTO schedules (section_id, day, start_time, end_time, room)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, to_insert)
+                mysql.connection.commit()
+                result['created'] = len(to_insert)
+                schedule_conflicts.invalidate()
+            else:
+                mysql.connection.rollback()
+            cursor.close()
+            
+            for entry in report:
+                result['summary'][entry['status']] = result['summary'].get(entry['status'], 0) + 1
+            return result
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+
     @staticmethod
     def get_by_section(section_id):
         """Get schedule for a section"""
@@ -128,6 +226,7 @@ class Schedule:
                 values.append(schedule_id)
                 cursor.execute(query, tuple(values))
                 mysql.connection.commit()
+                schedule_conflicts.invalidate()
             
             cursor.close()
             return True
@@ -145,6 +244,7 @@ class Schedule:
             mysql.connection.commit()
             affected = cursor.rowcount
             cursor.close()
+            schedule_conflicts.invalidate()
             return affected > 0
         except Exception as e:
             mysql.connection.rollback()
@@ -152,25 +252,25 @@ class Schedule:
             raise e
 
     @staticmethod
-    def check_conflict(section_id, day, start_time, end_time, exclude_id=None):
-        """Check if there's a scheduling conflict"""
-        cursor = mysql.connection.cursor()
-        query = """
-            SELECT COUNT(*) as count FROM schedules 
-            WHERE section_id = %s AND day = %s 
-            AND (
-                (start_time <= %s AND end_time > %s) OR
-                (start_time < %s AND end_time >= %s) OR
-                (start_time >= %s AND end_time <= %s)
-            )
+    def find_conflicts(section_id, day, start_time, end_time, room=None, exclude_id=None):
+        """List every section, room, teacher and student clash the slot would cause.
+        
+        Checks against the term's cached ScheduleIndex (see utils/schedule_conflicts),
+        so a check is a few bisections instead of a query per conflict type.
         """
-        params = [section_id, day, start_time, start_time, end_time, end_time, start_time, end_time]
+        if day not in Schedule.DAYS:
+            raise ValueError(f"Invalid day. Must be one of: {', '.join(Schedule.DAYS)}")
+        start = schedule_conflicts.to_minutes(start_time)
+        end = schedule_conflicts.to_minutes(end_time)
+        if end <= start:
+            raise ValueError("End time must be after start time")
         
-        if exclude_id:
-            query += " AND id != %s"
-            params.append(exclude_id)
-            
-        cursor.execute(query, params)
-        result = cursor.fetchone()
-        cursor.close()
-        return result['count'] > 0
\ No newline at end of file
+        index = schedule_conflicts.index_for_section(section_id)
+        if index is None:
+            return []
+        return index.conflicts(section_id, day, start, end, room, exclude_id)
+
+    @staticmethod
+    def check_conflict(section_id, day, start_time, end_time, exclude_id=None, room=None):
+        """Check if there's a scheduling conflict"""
+        return bool(Schedule.find_conflicts(section_id, day, start_time, end_time, room, exclude_id))
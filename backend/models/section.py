@@ -172,6 +172,78 @@ class Section:
             cursor.close()
             raise e
 
+    @staticmethod
+    def reconcile_enrollment_counts(since=None, batch_size=500):
+        """Compare enrolled_count with the approved enrollments and repair drift.
+        
+        With `since` (a DB timestamp) only sections whose row or enrollments
+        changed after it are checked; otherwise every section is, in id windows
+        of `batch_size`. Each batch is one grouped COUNT and, if anything
+        drifted, one UPDATE that recomputes the count in the same statement.
+        Returns {'checked', 'drifted', 'seats'} where seats is the summed |drift|.
+        """
+        cursor = mysql.connection.cursor()
+        try:
+            if since is None:
+                cursor.execute("SELECT COALESCE(MIN(id), 0) as low, COALESCE(MAX(id), 0) as high FROM sections")
+                bounds = cursor.fetchone()
+                batches = [
+                    ("{} BETWEEN %s AND %s", [low, low + batch_size - 1])
+                    for low in range(bounds['low'], bounds['high'] + 1, batch_size)
+                ] if bounds['high'] else []
+            else:
+                cursor.execute("""
+                    SELECT id FROM sections WHERE updated_at >= %s
+                    UNION
+                    SELECT section_id FROM enrollments WHERE updated_at >= %s
+                """, (since, since))
+                touched = sorted(row['id'] for row in cursor.fetchall())
+                batches = []
+                for i in range(0, len(touched), batch_size):
+                    ids = touched[i:i + batch_size]
+                    batches.append(("{} IN (" + ', '.join(['%s'] * len(ids)) + ")", ids))
+            
+            stats = {'checked': 0, 'drifted': 0, 'seats': 0}
+            for condition, params in batches:
+                cursor.execute(f"""
+                    SELECT s.id, s.enrolled_count, COALESCE(e.approved, 0) as approved
+                    FROM sections s
+                    LEFT JOIN (
+                        SELECT section_id, COUNT(*) as approved
+                        FROM enrollments
+                        WHERE status = 'approved' AND {condition.format('section_id')}
+                        GROUP BY section_id
+                    ) e ON e.section_id = s.id
+                    WHERE {condition.format('s.id')}
+                """, params + params)
+                rows = cursor.fetchall()
+                stats['checked'] += len(rows)
+                drifted = [row for row in rows if row['enrolled_count'] != row['approved']]
+                if not drifted:
+                    continue
+                
+                ids = [row['id'] for row in drifted]
+                placeholders = ', '.join(['%s'] * len(ids))
+                # Recount inside the UPDATE so approvals since the SELECT are not undone
+                cursor.execute(f"""
+                    UPDATE sections s
+                    SET s.enrolled_count = (
+                        SELECT COUNT(*) FROM enrollments e
+                        WHERE e.section_id = s.id AND e.status = 'approved'
+                    )
+                    WHERE s.id IN ({placeholders})
+                """, ids)
+                mysql.connection.commit()
+                stats['drifted'] += len(drifted)
+                stats['seats'] += sum(abs(row['enrolled_count'] - row['approved']) for row in drifted)
+            
+            cursor.close()
+            return stats
+        except Exception as e:
+            mysql.connection.rollback()
+            cursor.close()
+            raise e
+    
     @staticmethod
     def delete(section_id):
         """Delete a section (only if no enrollments)"""
@@ -0,0 +1,138 @@
+from utils.database import mysql
+from utils.jobs import single_runner
+
+
+class SectionCounter:
+    """Section Counter Model - Pre-aggregated per-section counts for listings.
+    
+    Assignment, material and zoom write paths adjust `section_counters` in the
+    same transaction as their own write. Student counts are not duplicated here:
+    `sections.enrolled_count` already is that counter (see Enrollment.reserve_seats).
+    `upcoming_meetings` also shrinks as days pass, so roll_meetings() recounts it
+    once per day per section.
+    """
+    
+    COUNTS_SQL = """
+        SELECT
+            s.id,
+            (SELECT COUNT(*) FROM assignments a WHERE a.section_id = s.id),
+            (SELECT COUNT(*) FROM materials m WHERE m.section_id = s.id),
+            (SELECT COUNT(*) FROM zoom_meetings zm WHERE zm.section_id = s.id AND zm.meeting_date >= CURDATE()),
+            CURDATE()
+        FROM sections s
+    """
+    
+    @staticmethod
+    def _exists(cursor, section_id):
+        cursor.execute("SELECT section_id FROM section_counters WHERE section_id = %s", (section_id,))
+        return cursor.fetchone() is not None
+    
+    @staticmethod
+    def bump(cursor, section_id, assignments=0, materials=0):
+        """Adjust counts after a write; runs in the caller's transaction"""
+        if not section_id:
+            return
+        if not SectionCounter._exists(cursor, section_id):
+            # First write since the table was created: count from scratch (includes this write)
+            SectionCounter.rebuild(cursor, [section_id])
+            return
+        cursor.execute("""
+            UPDATE section_counters
+            SET assignment_count = GREATEST(assignment_count + %s, 0),
+                material_count = GREATEST(material_count + %s, 0)
+            WHERE section_id = %s
+        """, (assignments, materials, section_id))
+    
+    @staticmethod
+    def bump_meeting(cursor, section_id, meeting_date, delta):
+        """Count a meeting added (+1) or removed (-1) if it is today or later"""
+        if not section_id:
+            return
+        if not SectionCounter._exists(cursor, section_id):
+            SectionCounter.rebuild(cursor, [section_id])
+            return
+        cursor.execute("""
+            UPDATE section_counters
+            SET upcoming_meetings = GREATEST(upcoming_meetings + IF(%s >= CURDATE(), %s, 0), 0)
+            WHERE section_id = %s
+        """, (meeting_date, delta, section_id))
+    
+    @staticmethod
+    def rebuild(cursor=None, section_ids=None, chunk_size=1000):
+        """Recount from the source tables: the given sections, or every section in id chunks.
+        
+        With a cursor it runs in the caller's transaction; otherwise each chunk
+        commits on its own. Returns MySQL's affected-row total (1 per new row,
+        2 per corrected row, 0 per row that was already right).
+        """
+        if section_ids is not None and not section_ids:
+            return 0
+        own_cursor = cursor is None
+        if own_cursor:
+            cursor = mysql.connection.cursor()
+        try:
+            if section_ids is not None:
+                ids = list(section_ids)
+                windows = [(f"WHERE s.id IN ({', '.join(['%s'] * len(ids))})", ids)]
+            else:
+                cursor.execute("SELECT COALESCE(MAX(id), 0) as max_id FROM sections")
+                max_id = cursor.fetchone()['max_id']
+                windows = [
+                    ("WHERE s.id BETWEEN %s AND %s", [low, low + chunk_size - 1])
+                    for low in range(0, max_id + 1, chunk_size)
+                ]
+            
+            total = 0
+            for condition, params in windows:
+                cursor.execute(f"""
+                    INSERT INTO section_counters (
+                        section_id, assignment_count, material_count, upcoming_meetings, meetings_as_of
+                    )
+                    {SectionCounter.COUNTS_SQL} {condition}
+                    ON DUPLICATE KEY UPDATE
+                        assignment_count = VALUES(assignment_count),
+                        material_count = VALUES(material_count),
+                        upcoming_meetings = VALUES(upcoming_meetings),
+                        meetings_as_of = VALUES(meetings_as_of)
+                """, params)
+                total += cursor.rowcount
+                if own_cursor:
+                    mysql.connection.commit()
+            
+            if own_cursor:
+                cursor.close()
+            return total
+        except Exception as e:
+            if own_cursor:
+                mysql.connection.rollback()
+                cursor.close()
+            raise e
+    
+    @staticmethod
+    def roll_meetings():
+        """Recount upcoming meetings for sections last counted before today (periodic job).
+
+        Runs in one worker process at a time; returns None when another holds the lock.
+        """
+        with single_runner('section-counters-roll') as acquired:
+            if not acquired:
+                return None
+            cursor = mysql.connection.cursor()
+            try:
+                cursor.execute("""
+                    UPDATE section_counters sc
+                    SET upcoming_meetings = (
+                            SELECT COUNT(*) FROM zoom_meetings zm
+                            WHERE zm.section_id = sc.section_id AND zm.meeting_date >= CURDATE()
+                        ),
+                        meetings_as_of = CURDATE()
+                    WHERE sc.meetings_as_of < CURDATE()
+                """)
+                rolled = cursor.rowcount
+                mysql.connection.commit()
+                cursor.close()
+                return rolled
+            except Exception as e:
+                mysql.connection.rollback()
+                cursor.close()
+                raise e
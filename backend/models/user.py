@@ -1,4 +1,5 @@
 from utils.database import mysql
+from utils.role_versions import revoke_user_tokens
 from werkzeug.security import generate_password_hash, check_password_hash
 import random
 import string
@@ -295,6 +296,7 @@ class User:
         cursor = mysql.connection.cursor()
         try:
             cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+            revoke_user_tokens(user_id, cursor)
             mysql.connection.commit()
             cursor.close()
             return True
@@ -0,0 +1,51 @@
+"""Run the notification retention purge by hand.
+
+Deletes expired notifications and broadcasts, and archives (or deletes) read
+notifications older than the retention window, in small primary-key chunks:
+
+    python purge_notifications.py --dry-run
+    python purge_notifications.py --read-days 180 --chunk-size 2000
+    python purge_notifications.py --no-archive
+"""
+import argparse
+
+from app import app
+from utils.retention import purge_notifications
+
+parser = argparse.ArgumentParser(description='Purge expired and old read notifications')
+parser.add_argument('--dry-run', action='store_true', help='count matching rows without changing anything')
+parser.add_argument('--read-days', type=int, help='age in days after which read notifications go (0 keeps them)')
+parser.add_argument('--no-archive', action='store_true', help='delete old read notifications instead of archiving them')
+parser.add_argument('--chunk-size', type=int, help='primary-key ids per transaction')
+args = parser.parse_args()
+
+
+def show_progress(status):
+    print(
+        f"  … {status['position']}  expired={status['expired_notifications']} "
+        f"broadcasts={status['expired_broadcasts']} archived={status['read_archived']} "
+        f"deleted={status['read_deleted']}",
+        end='\r'
+    )
+
+
+with app.app_context():
+    print("=" * 60)
+    print("🧹 NOTIFICATION PURGE" + (" (DRY RUN)" if args.dry_run else ""))
+    print("=" * 60)
+
+    stats = purge_notifications(
+        dry_run=args.dry_run,
+        read_days=args.read_days,
+        archive_read=False if args.no_archive else None,
+        chunk_size=args.chunk_size,
+        on_progress=show_progress
+    )
+    print()
+
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"✅ {verb} {stats['expired_notifications']} expired notifications")
+    print(f"✅ {verb} {stats['expired_broadcasts']} expired broadcasts")
+    print(f"✅ {'Would archive' if args.dry_run else 'Archived'} {stats['read_archived']} read notifications")
+    print(f"✅ {verb} {stats['read_deleted']} read notifications")
+    print(f"⏱️  {stats['chunks']} chunks in {stats['duration_ms']}ms")
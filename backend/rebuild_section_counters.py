@@ -0,0 +1,32 @@
+"""Recompute the pre-aggregated section counters from scratch.
+
+Use after restoring a backup, bulk SQL edits, or anything else that wrote
+assignments, materials, meetings or enrollments around the application:
+
+    python rebuild_section_counters.py
+    python rebuild_section_counters.py --chunk-size 200
+"""
+import argparse
+import time
+
+from app import app
+from models.section import Section
+from models.section_counter import SectionCounter
+
+parser = argparse.ArgumentParser(description='Rebuild section_counters and enrolled_count')
+parser.add_argument('--chunk-size', type=int, default=1000, help='sections per transaction')
+args = parser.parse_args()
+
+with app.app_context():
+    print("=" * 60)
+    print("🔢 REBUILD SECTION COUNTERS")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    changed = SectionCounter.rebuild(chunk_size=args.chunk_size)
+    print(f"✅ Assignment, material and meeting counters recounted ({changed} rows written)")
+
+    # Student counts live in sections.enrolled_count
+    stats = Section.reconcile_enrollment_counts(batch_size=args.chunk_size)
+    print(f"✅ enrolled_count checked for {stats['checked']} sections, {stats['drifted']} repaired")
+    print(f"⏱️  {round((time.perf_counter() - started) * 1000, 1)}ms")
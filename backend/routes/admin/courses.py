@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from utils.database import mysql
 from utils.decorators import admin_required
+from utils.catalog_cache import catalog
 from models.course import Course
 from models.subject import Subject
 
@@ -139,6 +140,8 @@ def create_course():
             total_credits=data.get('total_credits', 120)
         )
         
+        catalog.bump()
+        
         return jsonify({
             'message': 'Course created successfully',
             'course_id': course_id
@@ -180,6 +183,8 @@ def update_course(course_id):
         print(f"📝 Updating course with fields: {list(data.keys())}")
         Course.update(course_id, **data)
         
+        catalog.bump()
+        
         return jsonify({'message': 'Course updated successfully'}), 200
         
     except Exception as e:
@@ -206,6 +211,8 @@ def delete_course(course_id):
         
         Course.delete(course_id)
         
+        catalog.bump()
+        
         return jsonify({'message': 'Course deleted successfully'}), 200
         
     except Exception as e:
@@ -231,6 +238,8 @@ def toggle_course_status(course_id):
         Course.update(course_id, is_active=is_active)
         
         status = 'activated' if is_active else 'deactivated'
+        catalog.bump()
+        
         return jsonify({'message': f'Course {status} successfully'}), 200
         
     except Exception as e:
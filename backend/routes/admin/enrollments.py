@@ -160,47 +160,15 @@ def approve_enrollment(enrollment_id):
     try:
         admin_id = get_jwt_identity()
         
-        cursor = mysql.connection.cursor()
+        result = Enrollment.approve(enrollment_id, admin_id)
         
-        # Get enrollment details
-        cursor.execute("""
-            SELECT e.*, s.capacity, s.enrolled_count 
-            FROM enrollments e
-            JOIN sections s ON e.section_id = s.id
-            WHERE e.id = %s
-        """, (enrollment_id,))
-        
-        enrollment = cursor.fetchone()
-        
-        if not enrollment:
-            cursor.close()
+        if result == 'not_found':
             return jsonify({'error': 'Enrollment not found'}), 404
-        
-        if enrollment['status'] != 'pending':
-            cursor.close()
+        if result == 'not_pending':
             return jsonify({'error': 'Enrollment is not pending'}), 400
-        
-        if enrollment['enrolled_count'] >= enrollment['capacity']:
-            cursor.close()
+        if result == 'full':
             return jsonify({'error': 'Section is full'}), 400
         
-        # Update enrollment status
-        cursor.execute("""
-            UPDATE enrollments 
-            SET status = 'approved', approved_by = %s, approved_date = CURDATE()
-            WHERE id = %s
-        """, (admin_id, enrollment_id))
-        
-        # Increment section enrolled count
-        cursor.execute("""
-            UPDATE sections 
-            SET enrolled_count = enrolled_count + 1 
-            WHERE id = %s
-        """, (enrollment['section_id'],))
-        
-        mysql.connection.commit()
-        cursor.close()
-        
         return jsonify({'message': 'Enrollment approved successfully'}), 200
         
     except Exception as e:
@@ -226,9 +194,12 @@ def reject_enrollment(enrollment_id):
         cursor.execute("""
             SELECT * FROM enrollments 
             WHERE id = %s AND status = 'pending'
+            FOR UPDATE
         """, (enrollment_id,))
         
-        if not cursor.fetchone():
+        enrollment = cursor.fetchone()
+        if not enrollment:
+            mysql.connection.rollback()
             cursor.close()
             return jsonify({'error': 'Enrollment not found or not pending'}), 404
         
@@ -239,8 +210,12 @@ def reject_enrollment(enrollment_id):
             WHERE id = %s
         """, (admin_id, enrollment_id))
         
+        # The seat this request held goes to the waitlist
+        promoted = Enrollment.promote_waitlist(cursor, enrollment['section_id'])
+        
         mysql.connection.commit()
         cursor.close()
+        Enrollment.notify_promoted(promoted, enrollment['section_id'])
         
         return jsonify({'message': 'Enrollment rejected'}), 200
         
@@ -261,56 +236,15 @@ def bulk_approve():
     try:
         admin_id = get_jwt_identity()
         data = request.get_json()
-        enrollment_ids = data.get('enrollment_ids', [])
+        enrollment_ids = Enrollment.parse_ids(data.get('enrollment_ids', []))
         
+        if enrollment_ids is None:
+            return jsonify({'error': 'enrollment_ids must be a list of enrollment IDs'}), 400
         if not enrollment_ids:
             return jsonify({'error': 'No enrollment IDs provided'}), 400
         
-        cursor = mysql.connection.cursor()
-        success_count = 0
-        failed_ids = []
-        
-        for enrollment_id in enrollment_ids:
-            try:
-                # Get enrollment details
-                cursor.execute("""
-                    SELECT e.*, s.capacity, s.enrolled_count 
-                    FROM enrollments e
-                    JOIN sections s ON e.section_id = s.id
-                    WHERE e.id = %s
-                """, (enrollment_id,))
-                
-                enrollment = cursor.fetchone()
-                
-                if not enrollment or enrollment['status'] != 'pending' or enrollment['enrolled_count'] >= enrollment['capacity']:
-                    failed_ids.append(enrollment_id)
-                    continue
-                
-                cursor.execute("""
-                    UPDATE enrollments 
-                    SET status = 'approved', approved_by = %s, approved_date = CURDATE()
-                    WHERE id = %s
-                """, (admin_id, enrollment_id))
-                
-                cursor.execute("""
-                    UPDATE sections 
-                    SET enrolled_count = enrolled_count + 1 
-                    WHERE id = %s
-                """, (enrollment['section_id'],))
-                
-                success_count += 1
-                
-            except Exception:
-                failed_ids.append(enrollment_id)
-        
-        mysql.connection.commit()
-        cursor.close()
-        
-        return jsonify({
-            'message': f'Approved {success_count} enrollments',
-            'success_count': success_count,
-            'failed_ids': failed_ids
-        }), 200
+        result = Enrollment.bulk_approve(enrollment_ids, admin_id)
+        return jsonify(Enrollment.bulk_approve_summary(result)), 200
         
     except Exception as e:
         print(f"Error bulk approving: {e}")
@@ -330,26 +264,26 @@ def delete_enrollment(enrollment_id):
         cursor = mysql.connection.cursor()
         
         # Get section_id before deleting
-        cursor.execute("SELECT section_id, status FROM enrollments WHERE id = %s", (enrollment_id,))
+        cursor.execute("SELECT section_id, status FROM enrollments WHERE id = %s FOR UPDATE", (enrollment_id,))
         enrollment = cursor.fetchone()
         
         if not enrollment:
             cursor.close()
             return jsonify({'error': 'Enrollment not found'}), 404
         
-        # If it was approved, decrement section count
-        if enrollment['status'] == 'approved':
-            cursor.execute("""
-                UPDATE sections 
-                SET enrolled_count = enrolled_count - 1 
-                WHERE id = %s AND enrolled_count > 0
-            """, (enrollment['section_id'],))
-        
         # Delete enrollment
         cursor.execute("DELETE FROM enrollments WHERE id = %s", (enrollment_id,))
         
+        # If it held a seat (approved) or a claim on one (pending), give it to the waitlist
+        promoted = []
+        if enrollment['status'] == 'approved':
+            promoted = Enrollment.release_seat(cursor, enrollment['section_id'])
+        elif enrollment['status'] == 'pending':
+            promoted = Enrollment.promote_waitlist(cursor, enrollment['section_id'])
+        
         mysql.connection.commit()
         cursor.close()
+        Enrollment.notify_promoted(promoted, enrollment['section_id'])
         
         return jsonify({'message': 'Enrollment deleted successfully'}), 200
         
@@ -1,12 +1,25 @@
-from flask import Blueprint, request, jsonify
+import csv
+import io
+
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
 from utils.database import mysql
 from utils.decorators import admin_required
+from utils import timetable
 from models.schedule import Schedule
 from models.section import Section
 
 admin_schedules_bp = Blueprint('admin_schedules', __name__)
 
+
+def _conflict_error(conflicts):
+    """400 listing what the slot clashes with (section, room, teacher or student)"""
+    return jsonify({
+        'error': 'Scheduling conflict detected',
+        'conflicts': conflicts
+    }), 400
+
+
 @admin_schedules_bp.route('/', methods=['GET'])
 @jwt_required()
 @admin_required
@@ -98,14 +111,19 @@ def create_schedule():
         if not section:
             return jsonify({'error': 'Section not found'}), 404
         
-        # Check for scheduling conflict
-        if Schedule.check_conflict(
-            data['section_id'],
-            data['day'],
-            data['start_time'],
-            data['end_time']
-        ):
-            return jsonify({'error': 'Scheduling conflict detected'}), 400
+        # Check for section, room, teacher and student conflicts
+        try:
+            conflicts = Schedule.find_conflicts(
+                data['section_id'],
+                data['day'],
+                data['start_time'],
+                data['end_time'],
+                room=data.get('room')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if conflicts:
+            return _conflict_error(conflicts)
         
         schedule_id = Schedule.create(
             section_id=data['section_id'],
@@ -125,61 +143,158 @@ def create_schedule():
         return jsonify({'error': str(e)}), 500
 
 
+def _parse_schedule_csv(text):
+    """(row_number, dict) pairs from a CSV with a section_id,day,start_time,end_time[,room] header"""
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        return []
+    reader.fieldnames = [name.strip().lower().replace(' ', '_') for name in reader.fieldnames]
+    missing = [f for f in ('section_id', 'day', 'start_time', 'end_time') if f not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"CSV header is missing: {', '.join(missing)}")
+    return [
+        (number, {field: row.get(field) for field in Schedule.IMPORT_FIELDS})
+        for number, row in enumerate(reader, start=2)
+        if any((value or '').strip() for value in row.values() if isinstance(value, str))
+    ]
+
+
 @admin_schedules_bp.route('/bulk', methods=['POST'])
 @jwt_required()
 @admin_required
 def bulk_create_schedules():
-    """Create multiple schedule entries at once"""
+    """Create many schedule entries: JSON {'schedules': [...]}, a multipart CSV `file` or a text/csv body"""
     try:
-        data = request.get_json()
-        schedules = data.get('schedules', [])
+        if request.is_json:
+            schedules = (request.get_json() or {}).get('schedules', [])
+            rows = [(idx + 1, item if isinstance(item, dict) else {}) for idx, item in enumerate(schedules)]
+        else:
+            upload = request.files.get('file')
+            raw = upload.read() if upload else request.get_data()
+            try:
+                rows = _parse_schedule_csv(raw.decode('utf-8-sig'))
+            except (UnicodeDecodeError, csv.Error, ValueError) as e:
+                return jsonify({'error': f'Could not read CSV: {e}'}), 400
         
-        if not schedules:
+        if not rows:
             return jsonify({'error': 'No schedules provided'}), 400
+        max_rows = current_app.config.get('SCHEDULE_IMPORT_MAX_ROWS', 5000)
+        if len(rows) > max_rows:
+            return jsonify({'error': f'At most {max_rows} rows can be imported at once'}), 400
         
-        created_ids = []
-        errors = []
-        
-        for idx, item in enumerate(schedules):
-            try:
-                required_fields = ['section_id', 'day', 'start_time', 'end_time']
-                if not all(field in item for field in required_fields):
-                    errors.append(f"Row {idx+1}: Missing required fields")
-                    continue
-                
-                # Check conflict
-                if Schedule.check_conflict(
-                    item['section_id'],
-                    item['day'],
-                    item['start_time'],
-                    item['end_time']
-                ):
-                    errors.append(f"Row {idx+1}: Scheduling conflict")
-                    continue
-                
-                schedule_id = Schedule.create(
-                    section_id=item['section_id'],
-                    day=item['day'],
-                    start_time=item['start_time'],
-                    end_time=item['end_time'],
-                    room=item.get('room')
-                )
-                created_ids.append(schedule_id)
-                
-            except Exception as e:
-                errors.append(f"Row {idx+1}: {str(e)}")
+        dry_run = request.args.get('dry_run', 'false').lower() in ('true', '1')
+        result = Schedule.bulk_create(rows, dry_run=dry_run)
         
         return jsonify({
-            'message': f'Created {len(created_ids)} schedule entries',
-            'created_ids': created_ids,
-            'errors': errors
-        }), 201
+            'message': f"Created {result['created']} schedule entries",
+            'dry_run': dry_run,
+            'created': result['created'],
+            'summary': result['summary'],
+            'rows': result['rows'],
+            'errors': [
+                f"Row {entry['row']}: {entry.get('error') or entry['status'].replace('_', ' ')}"
+                for entry in result['rows'] if entry['status'] != 'created'
+            ]
+        }), 200 if dry_run else 201
         
     except Exception as e:
         print(f"Error bulk creating schedules: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+def _rooms_error(rooms):
+    """Why `rooms` is not a list of {name: str, capacity: int >= 1 or null}, or None if it is"""
+    if not isinstance(rooms, list):
+        return 'rooms must be a list of {name, capacity}'
+    seen = set()
+    for idx, room in enumerate(rooms):
+        if not isinstance(room, dict):
+            return f'rooms[{idx}] must be an object with name and capacity'
+        name = room.get('name')
+        if not isinstance(name, str) or not name.strip():
+            return f'rooms[{idx}].name must be a non-empty string'
+        capacity = room.get('capacity')
+        if capacity is not None and (isinstance(capacity, bool) or not isinstance(capacity, int) or capacity < 1):
+            return f'rooms[{idx}].capacity must be a whole number of at least 1, or null'
+        key = ' '.join(name.split()).upper()
+        if key in seen:
+            return f'rooms[{idx}].name repeats an earlier room'
+        seen.add(key)
+    return None
+
+
+@admin_schedules_bp.route('/generate', methods=['POST'])
+@jwt_required()
+@admin_required
+def generate_timetable():
+    """Place every unscheduled section of a term and save the result through the bulk path.
+    
+    Body: academic_year, semester, rooms [{name, capacity}], and either slots
+    [{day, start_time, end_time}] or days/times ('HH:MM-HH:MM'); optional
+    meetings_per_week and restarts. ?dry_run=true returns the timetable unsaved.
+    """
+    try:
+        data = request.get_json() or {}
+        for field in ('academic_year', 'semester'):
+            if not data.get(field):
+                return jsonify({'error': f'Missing required field: {field}'}), 400
+        
+        config = current_app.config
+        try:
+            slots = timetable.parse_slots(
+                data.get('slots'),
+                data.get('days') or config['TIMETABLE_DEFAULT_DAYS'],
+                data.get('times') or config['TIMETABLE_DEFAULT_TIMES']
+            )
+            meetings_per_week = int(data.get('meetings_per_week') or config['TIMETABLE_MEETINGS_PER_WEEK'])
+            restarts = int(data['restarts']) if data.get('restarts') else None
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid slots or options: {e}'}), 400
+        if not slots or meetings_per_week < 1:
+            return jsonify({'error': 'At least one slot and one meeting per week are required'}), 400
+        rooms = data['rooms'] if data.get('rooms') is not None else []
+        rooms_error = _rooms_error(rooms)
+        if rooms_error:
+            return jsonify({'error': rooms_error}), 400
+        
+        problem = timetable.load_problem(data['academic_year'], data['semester'], rooms, slots, meetings_per_week)
+        if not problem['sections']:
+            return jsonify({'message': 'Every active section of the term already has a schedule'}), 200
+        
+        best = timetable.generate(problem, restarts=restarts)
+        dry_run = request.args.get('dry_run', 'false').lower() in ('true', '1')
+        result = Schedule.bulk_create(list(enumerate(best['rows'], start=1)), dry_run=dry_run)
+        
+        # Rows the import still refused (a concurrent edit) count as unplaced too
+        missing = dict(best['unplaced'])
+        for entry in result['rows']:
+            if entry['status'] != 'created':
+                missing[entry['section_id']] = missing.get(entry['section_id'], 0) + 1
+        names = {section['id']: section['name'] for section in problem['sections']}
+        no_room = set(best['no_room'])
+        
+        return jsonify({
+            'message': f"Scheduled {len(problem['sections']) - len(missing)} of {len(problem['sections'])} sections",
+            'dry_run': dry_run,
+            'created': result['created'],
+            'quality': timetable.quality(problem, best),
+            'unplaced': [
+                {
+                    'section_id': section_id,
+                    'section_name': names.get(section_id),
+                    'missing_meetings': count,
+                    'reason': 'no_room_fits' if section_id in no_room else 'no_free_slot'
+                }
+                for section_id, count in sorted(missing.items())
+            ],
+            'schedules': [entry for entry in result['rows'] if entry['status'] == 'created']
+        }), 200 if dry_run else 201
+        
+    except Exception as e:
+        print(f"Error generating timetable: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @admin_schedules_bp.route('/<int:schedule_id>', methods=['PUT'])
 @jwt_required()
 @admin_required
@@ -188,21 +303,27 @@ def update_schedule(schedule_id):
     try:
         data = request.get_json()
         
-        # Check for conflict if time/day changed
-        if 'day' in data or 'start_time' in data or 'end_time' in data:
+        # Check for conflict if time/day/room changed
+        if any(field in data for field in ('day', 'start_time', 'end_time', 'room')):
             cursor = mysql.connection.cursor()
-            cursor.execute("SELECT section_id, day, start_time, end_time FROM schedules WHERE id = %s", (schedule_id,))
+            cursor.execute("SELECT section_id, day, start_time, end_time, room FROM schedules WHERE id = %s", (schedule_id,))
             current = cursor.fetchone()
             cursor.close()
             
             if current:
-                section_id = current['section_id']
-                day = data.get('day', current['day'])
-                start_time = data.get('start_time', current['start_time'])
-                end_time = data.get('end_time', current['end_time'])
-                
-                if Schedule.check_conflict(section_id, day, start_time, end_time, schedule_id):
-                    return jsonify({'error': 'Scheduling conflict detected'}), 400
+                try:
+                    conflicts = Schedule.find_conflicts(
+                        current['section_id'],
+                        data.get('day', current['day']),
+                        data.get('start_time', current['start_time']),
+                        data.get('end_time', current['end_time']),
+                        room=data.get('room', current['room']),
+                        exclude_id=schedule_id
+                    )
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+                if conflicts:
+                    return _conflict_error(conflicts)
         
         Schedule.update(schedule_id, **data)
         
@@ -271,16 +392,22 @@ def check_conflict():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        has_conflict = Schedule.check_conflict(
-            data['section_id'],
-            data['day'],
-            data['start_time'],
-            data['end_time'],
-            data.get('exclude_id')
-        )
+        try:
+            conflicts = Schedule.find_conflicts(
+                data['section_id'],
+                data['day'],
+                data['start_time'],
+                data['end_time'],
+                room=data.get('room'),
+                exclude_id=data.get('exclude_id')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        has_conflict = bool(conflicts)
         
         return jsonify({
             'has_conflict': has_conflict,
+            'conflicts': conflicts,
             'message': 'Conflict detected' if has_conflict else 'No conflict'
         }), 200
         
@@ -1,10 +1,17 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
+import csv
+import io
+
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import admin_required
+from utils.catalog_cache import catalog
+from utils import schedule_conflicts
 from models.section import Section
+from models.enrollment import Enrollment
 from models.subject import Subject
 from models.teacher_assignment import TeacherAssignment
+from models.schedule import Schedule
 
 admin_sections_bp = Blueprint('admin_sections', __name__)
 
@@ -164,6 +171,8 @@ def create_section():
             room=data.get('room')
         )
         
+        catalog.bump()
+        
         return jsonify({
             'message': 'Section created successfully',
             'section_id': section_id
@@ -188,6 +197,10 @@ def update_section(section_id):
         
         Section.update(section_id, **data)
         
+        catalog.bump()
+        # The term or room may have changed; other workers notice on their next reload
+        schedule_conflicts.invalidate()
+        
         return jsonify({'message': 'Section updated successfully'}), 200
         
     except Exception as e:
@@ -219,6 +232,8 @@ def delete_section(section_id):
         
         Section.delete(section_id)
         
+        catalog.bump()
+        
         return jsonify({'message': 'Section deleted successfully'}), 200
         
     except Exception as e:
@@ -285,6 +300,83 @@ def get_section_enrollments(section_id):
         return jsonify({'error': str(e)}), 500
 
 
+ROSTER_COLUMNS = ('email', 'student_id', 'student_number', 'student number')
+
+
+def _parse_roster(text):
+    """(row_number, value) pairs from a roster CSV.
+    
+    A header naming an email or student number column selects that column;
+    otherwise the first column is used.
+    """
+    reader = csv.reader(io.StringIO(text))
+    rows = list(reader)
+    column = 0
+    start = 0
+    if rows:
+        header = [cell.strip().lower() for cell in rows[0]]
+        for name in ROSTER_COLUMNS:
+            if name in header:
+                column, start = header.index(name), 1
+                break
+    return [
+        (number + 1, row[column] if len(row) > column else '')
+        for number, row in enumerate(rows)
+        if number >= start and any(cell.strip() for cell in row)
+    ]
+
+
+@admin_sections_bp.route('/<int:section_id>/roster-import', methods=['POST'], strict_slashes=False)
+@jwt_required()
+@admin_required
+def import_roster(section_id):
+    """Enroll a CSV of student emails or student numbers (multipart `file` or a text/csv body)"""
+    try:
+        upload = request.files.get('file')
+        raw = upload.read() if upload else request.get_data()
+        if not raw:
+            return jsonify({'error': 'Upload a CSV file of student emails or student numbers'}), 400
+        
+        try:
+            rows = _parse_roster(raw.decode('utf-8-sig'))
+        except (UnicodeDecodeError, csv.Error) as e:
+            return jsonify({'error': f'Could not read CSV: {e}'}), 400
+        
+        max_rows = current_app.config.get('ROSTER_IMPORT_MAX_ROWS', 10000)
+        if not rows:
+            return jsonify({'error': 'The CSV has no rows'}), 400
+        if len(rows) > max_rows:
+            return jsonify({'error': f'At most {max_rows} rows can be imported at once'}), 400
+        
+        dry_run = request.args.get('dry_run', 'false').lower() in ('true', '1')
+        result = Enrollment.import_roster(section_id, rows, get_jwt_identity(), dry_run=dry_run)
+        
+        if result['error'] == 'section_not_found':
+            return jsonify({'error': 'Section not found'}), 404
+        
+        body = {
+            'section_id': section_id,
+            'dry_run': dry_run,
+            'imported': result['imported'],
+            'free_seats': result['free_seats'],
+            'summary': result['summary'],
+            'rows': result['rows']
+        }
+        if result['error'] == 'over_capacity':
+            body['error'] = (
+                f"Roster needs {result['summary'].get('over_capacity', 0)} seats "
+                f"but only {result['free_seats']} are free; nothing was imported"
+            )
+            return jsonify(body), 409
+        
+        body['message'] = f"Imported {result['imported']} students"
+        return jsonify(body), 200
+        
+    except Exception as e:
+        print(f"Error importing roster: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @admin_sections_bp.route('/stats', methods=['GET'], strict_slashes=False)
 @jwt_required()
 @admin_required
@@ -375,30 +467,23 @@ def add_schedule_entry(section_id):
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        cursor = mysql.connection.cursor()
-        
-        # Check for conflicts
-        cursor.execute("""
-            SELECT id FROM schedules 
-            WHERE section_id = %s AND day = %s 
-            AND (
-                (start_time <= %s AND end_time > %s) OR
-                (start_time < %s AND end_time >= %s)
+        # Same checks as the schedules API: section, room, teacher and student clashes
+        try:
+            conflicts = Schedule.find_conflicts(
+                section_id, data['day'], data['start_time'], data['end_time'], room=data.get('room')
             )
-        """, (section_id, data['day'], data['start_time'], data['start_time'], data['end_time'], data['end_time']))
-        
-        if cursor.fetchone():
-            cursor.close()
-            return jsonify({'error': 'Schedule conflict detected'}), 400
-        
-        cursor.execute("""
-            INSERT INTO schedules (section_id, day, start_time, end_time, room)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (section_id, data['day'], data['start_time'], data['end_time'], data.get('room')))
-        
-        mysql.connection.commit()
-        schedule_id = cursor.lastrowid
-        cursor.close()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if conflicts:
+            return jsonify({'error': 'Schedule conflict detected', 'conflicts': conflicts}), 400
+        
+        schedule_id = Schedule.create(
+            section_id=section_id,
+            day=data['day'],
+            start_time=data['start_time'],
+            end_time=data['end_time'],
+            room=data.get('room')
+        )
         
         return jsonify({
             'message': 'Schedule added successfully',
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from utils.database import mysql
 from utils.decorators import admin_required
+from utils.catalog_cache import catalog
 from models.subject import Subject
 from models.course import Course
 
@@ -125,6 +126,8 @@ def create_subject():
             is_core=data.get('is_core', True)
         )
         
+        catalog.bump()
+        
         return jsonify({
             'message': 'Subject created successfully',
             'subject_id': subject_id
@@ -166,6 +169,8 @@ def update_subject(subject_id):
         print(f"📝 Updating subject with fields: {list(data.keys())}")
         Subject.update(subject_id, **data)
         
+        catalog.bump()
+        
         return jsonify({'message': 'Subject updated successfully'}), 200
         
     except Exception as e:
@@ -194,6 +199,8 @@ def delete_subject(subject_id):
         
         Subject.delete(subject_id)
         
+        catalog.bump()
+        
         return jsonify({'message': 'Subject deleted successfully'}), 200
         
     except Exception as e:
@@ -245,6 +252,8 @@ def bulk_create_subjects():
             except Exception as e:
                 errors.append(f"Row {idx+1}: {str(e)}")
         
+        catalog.bump()
+        
         return jsonify({
             'message': f'Created {len(created_ids)} subjects',
             'created_ids': created_ids,
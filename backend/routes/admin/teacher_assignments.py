@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from utils.database import mysql
 from utils.decorators import admin_required
+from utils.catalog_cache import catalog
 from models.teacher_assignment import TeacherAssignment
 from models.section import Section
 
@@ -207,6 +208,8 @@ def assign_teacher():
             is_primary=data.get('is_primary', True)
         )
         
+        catalog.bump()
+        
         return jsonify({
             'message': 'Teacher assigned successfully',
             'assignment_id': assignment_id
@@ -228,6 +231,8 @@ def remove_assignment(assignment_id):
         success = TeacherAssignment.remove(assignment_id)
         
         if success:
+            catalog.bump()
+            
             return jsonify({'message': 'Teacher unassigned successfully'}), 200
         else:
             return jsonify({'error': 'Assignment not found'}), 404
@@ -284,6 +289,8 @@ def bulk_assign():
             except Exception as e:
                 errors.append(f"Row {idx+1}: {str(e)}")
         
+        catalog.bump()
+        
         return jsonify({
             'message': f'Created {len(created_ids)} assignments',
             'created_ids': created_ids,
@@ -368,6 +375,8 @@ def update_assignment(assignment_id):
         cursor.close()
         
         if affected:
+            catalog.bump()
+            
             return jsonify({'message': 'Assignment updated successfully'}), 200
         else:
             return jsonify({'error': 'Assignment not found'}), 404
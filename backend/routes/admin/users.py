@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import admin_required
+from utils.role_versions import revoke_user_tokens
 from utils.auth_helpers import generate_employee_id, generate_student_id
 from werkzeug.security import generate_password_hash
 from datetime import datetime
@@ -176,6 +177,7 @@ def delete_user(user_id):
             return jsonify({'error': 'User not found'}), 404
         
         cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+        revoke_user_tokens(user_id, cursor)
         mysql.connection.commit()
         cursor.close()
         
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import role_required
 from utils.file_handler import save_file, delete_file, get_file_size
+from models.section_counter import SectionCounter
 import os
 from datetime import datetime
 
@@ -238,12 +239,14 @@ def delete_assignment(assignment_id):
             WHERE a.id = %s AND tp.user_id = %s
         """, (assignment_id, user_id))
         
-        if not cursor.fetchone():
+        assignment = cursor.fetchone()
+        if not assignment:
             cursor.close()
             return jsonify({'error': 'Assignment not found or unauthorized'}), 404
         
         # Delete assignment (cascades to submissions)
         cursor.execute("DELETE FROM assignments WHERE id = %s", (assignment_id,))
+        SectionCounter.bump(cursor, assignment.get('section_id'), assignments=-1)
         mysql.connection.commit()
         cursor.close()
         
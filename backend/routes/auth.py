@@ -7,6 +7,7 @@ from utils.validators import validate_email, validate_college_email, validate_pa
 from utils.email import send_verification_email
 from utils.file_handler import save_file, allowed_image, validate_file_size, get_file_url
 from utils.file_handler import human_readable_size
+from utils.role_versions import revoke_user_tokens
 import random
 import string
 import re
@@ -651,6 +652,7 @@ def delete_account():
         
         cursor = mysql.connection.cursor()
         cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+        revoke_user_tokens(user_id, cursor)
         mysql.connection.commit()
         cursor.close()
         
@@ -4,40 +4,52 @@ from utils.database import mysql
 from utils.decorators import admin_required
 from models.course import Course
 from models.subject import Subject
+from utils.catalog_cache import catalog, catalog_response
 
 courses_bp = Blueprint('courses', __name__)
 
 # ============ PUBLIC ENDPOINTS ============
 
+def _courses_body(include_inactive):
+    """Courses with subject/section counts (cached per catalog version)"""
+    courses = Course.get_all(include_inactive)
+    
+    # Add stats for each course
+    cursor = mysql.connection.cursor()
+    for course in courses:
+        # Count subjects
+        cursor.execute("SELECT COUNT(*) as count FROM subjects WHERE course_id = %s", (course['id'],))
+        course['subjects_count'] = cursor.fetchone()['count']
+        
+        # Count sections
+        cursor.execute("""
+            SELECT COUNT(DISTINCT s.id) as count
+            FROM sections s
+            JOIN subjects sub ON s.subject_id = sub.id
+            WHERE sub.course_id = %s
+        """, (course['id'],))
+        course['sections_count'] = cursor.fetchone()['count']
+    
+    cursor.close()
+    
+    return {
+        'total': len(courses),
+        'courses': courses
+    }
+
+
+@catalog.warmer
+def warm_courses():
+    catalog.get(('courses', False), lambda: _courses_body(False))
+
+
 @courses_bp.route('/', methods=['GET'])
 def get_courses():
     """Get all courses - PUBLIC for registration"""
     try:
         include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
-        courses = Course.get_all(include_inactive)
-        
-        # Add stats for each course
-        cursor = mysql.connection.cursor()
-        for course in courses:
-            # Count subjects
-            cursor.execute("SELECT COUNT(*) as count FROM subjects WHERE course_id = %s", (course['id'],))
-            course['subjects_count'] = cursor.fetchone()['count']
-            
-            # Count sections
-            cursor.execute("""
-                SELECT COUNT(DISTINCT s.id) as count
-                FROM sections s
-                JOIN subjects sub ON s.subject_id = sub.id
-                WHERE sub.course_id = %s
-            """, (course['id'],))
-            course['sections_count'] = cursor.fetchone()['count']
-        
-        cursor.close()
-        
-        return jsonify({
-            'total': len(courses),
-            'courses': courses
-        }), 200
+        body, etag = catalog.get(('courses', include_inactive), lambda: _courses_body(include_inactive))
+        return catalog_response(body, etag)
         
     except Exception as e:
         print(f"Error getting courses: {e}")
@@ -119,6 +131,8 @@ def create_course():
             total_credits=data.get('total_credits', 120)
         )
         
+        catalog.bump()
+        
         return jsonify({
             'message': 'Course created successfully',
             'course_id': course_id
@@ -143,6 +157,8 @@ def update_course(course_id):
         
         Course.update(course_id, **data)
         
+        catalog.bump()
+        
         return jsonify({'message': 'Course updated successfully'}), 200
         
     except Exception as e:
@@ -167,6 +183,8 @@ def delete_course(course_id):
         
         Course.delete(course_id)
         
+        catalog.bump()
+        
         return jsonify({'message': 'Course deleted successfully'}), 200
         
     except Exception as e:
@@ -190,6 +208,8 @@ def toggle_course_status(course_id):
         Course.update(course_id, is_active=is_active)
         
         status = 'activated' if is_active else 'deactivated'
+        catalog.bump()
+        
         return jsonify({'message': f'Course {status} successfully'}), 200
         
     except Exception as e:
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import role_required
 from utils.file_handler import save_file, delete_file
+from models.section_counter import SectionCounter
 import os
 
 material_bp = Blueprint('materials', __name__)
@@ -333,6 +334,7 @@ def delete_material(material_id):
         
         # Delete from database
         cursor.execute("DELETE FROM materials WHERE id = %s", (material_id,))
+        SectionCounter.bump(cursor, material.get('section_id'), materials=-1)
         mysql.connection.commit()
         cursor.close()
         
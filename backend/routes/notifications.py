@@ -1,14 +1,39 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, make_response, Response, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from utils.database import mysql
-from utils.decorators import role_required, teacher_required, admin_required
+from utils.decorators import role_required, teacher_required, admin_required, _role_from_db
 from models.notification import Notification
+from models.notification_job import NotificationJob
+from utils.notification_hub import hub, stream_events, issue_stream_ticket, read_stream_ticket
+from utils.role_versions import role_versions
+from utils.logger import get_logger
 from datetime import datetime
 
 notification_bp = Blueprint('notifications', __name__)
+log = get_logger('notifications')
 
 # ============ SENDING NOTIFICATIONS ============
 
+def queue_fan_out(kind, target_id, sender_id, data, notification_type, priority):
+    """Enqueue a fan-out job and answer 202; workers deliver it in batches"""
+    job_id, recipients = NotificationJob.enqueue(
+        kind=kind,
+        target_id=target_id,
+        sender_id=sender_id,
+        title=data['title'],
+        message=data['message'],
+        notification_type=notification_type,
+        link=data.get('link'),
+        priority=priority
+    )
+    return jsonify({
+        'message': f'Notification queued for {recipients} students',
+        'job_id': job_id,
+        'status_url': f'/api/notifications/jobs/{job_id}',
+        'recipients': recipients
+    }), 202
+
+
 @notification_bp.route('/send-to-class/<int:class_id>', methods=['POST'], strict_slashes=False)
 @jwt_required()
 @role_required(['teacher', 'admin'])
@@ -18,11 +43,7 @@ def send_notification_to_class(class_id):
         user_id = get_jwt_identity()
         data = request.get_json()
         
-        print("="*50)
-        print(f"📡 SEND NOTIFICATION TO CLASS {class_id}")
-        print(f"👤 User ID: {user_id}")
-        print(f"📦 Request data: {data}")
-        print("="*50)
+        log.debug('notifications.send_to_class', user_id=user_id, class_id=class_id)
         
         if not data.get('title') or not data.get('message'):
             return jsonify({'error': 'Title and message are required'}), 400
@@ -36,8 +57,6 @@ def send_notification_to_class(class_id):
             cursor.close()
             return jsonify({'error': 'User not found'}), 404
         
-        print(f"👤 User: {user['name']} ({user['role']})")
-        
         # If teacher, verify they are assigned to this section
         if user['role'] == 'teacher':
             cursor.execute("""
@@ -47,25 +66,30 @@ def send_notification_to_class(class_id):
             
             if not cursor.fetchone():
                 cursor.close()
-                print(f"❌ Teacher {user_id} not assigned to section {class_id}")
+                log.info('notifications.send_to_class.forbidden', user_id=user_id, class_id=class_id)
                 return jsonify({'error': 'You are not assigned to this section'}), 403
-            else:
-                print(f"✅ Teacher verified for section {class_id}")
         
         cursor.close()
         
-        # Use the model method
-        recipients = Notification.send_to_teacher_classes(
-    teacher_user_id=user_id,
-    sender_id=user_id,
-    title=data['title'],
-    message=data['message'],
-    notification_type='class_announcement',  
-    link=data.get('link'),
-    priority=data.get('priority', 'normal')
-)
+        if NotificationJob.is_enabled(current_app.config):
+            return queue_fan_out(
+                'class', class_id, user_id, data,
+                notification_type='class_announcement',
+                priority=data.get('priority', 'normal')
+            )
+        
+        # Only this section's students, not every section the sender teaches
+        recipients = Notification.send_to_class(
+            class_id=class_id,
+            sender_id=user_id,
+            title=data['title'],
+            message=data['message'],
+            notification_type='class_announcement',
+            link=data.get('link'),
+            priority=data.get('priority', 'normal')
+        )
         
-        print(f"✅ Successfully sent to {recipients} students")
+        log.info('notifications.sent', sender_id=user_id, class_id=class_id, recipients=recipients)
         
         return jsonify({
             'message': f'Notification sent to {recipients} students',
@@ -73,9 +97,7 @@ def send_notification_to_class(class_id):
         }), 200
         
     except Exception as e:
-        print(f"❌ Error in send_notification_to_class: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.send_to_class.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -88,12 +110,7 @@ def send_notification_to_all_classes():
         user_id = get_jwt_identity()
         data = request.get_json()
         
-        print("\n" + "="*60)
-        print("📡 SEND TO ALL CLASSES CALLED")
-        print("="*60)
-        print(f"👤 user_id: {user_id}")
-        print(f"📦 data: {data}")
-        print("="*60)
+        log.debug('notifications.send_to_all_classes', user_id=user_id)
         
         if not data.get('title') or not data.get('message'):
             return jsonify({'error': 'Title and message are required'}), 400
@@ -104,12 +121,15 @@ def send_notification_to_all_classes():
         user = cursor.fetchone()
         cursor.close()
         
-        print(f"👤 user role: {user['role']}")
-        
         recipients = 0
         
-        if user['role'] == 'teacher':
-            print("📨 Calling send_to_teacher_classes...")
+        if user['role'] == 'teacher' and NotificationJob.is_enabled(current_app.config):
+            return queue_fan_out(
+                'teacher', user_id, user_id, data,
+                notification_type=data.get('type', 'teacher_announcement'),
+                priority=data.get('priority', 'normal')
+            )
+        elif user['role'] == 'teacher':
             recipients = Notification.send_to_teacher_classes(
                 teacher_user_id=user_id,
                 sender_id=user_id,
@@ -119,9 +139,7 @@ def send_notification_to_all_classes():
                 link=data.get('link'),
                 priority=data.get('priority', 'normal')
             )
-            print(f"✅ send_to_teacher_classes returned: {recipients}")
         else:  # admin
-            print("📨 Admin sending to all students...")
             recipients = Notification.send_to_all_students(
                 sender_id=user_id,
                 title=data['title'],
@@ -131,8 +149,7 @@ def send_notification_to_all_classes():
                 priority=data.get('priority', 'high')
             )
         
-        print(f"🎉 Total recipients: {recipients}")
-        print("="*60 + "\n")
+        log.info('notifications.sent', sender_id=user_id, recipients=recipients)
         
         return jsonify({
             'message': f'Notification sent to {recipients} students',
@@ -140,9 +157,7 @@ def send_notification_to_all_classes():
         }), 200
         
     except Exception as e:
-        print(f"❌ Error sending notification: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.send_to_all_classes.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -173,9 +188,7 @@ def send_notification_to_all_students():
         }), 200
         
     except Exception as e:
-        print(f"Error sending notification: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.send_to_all_students.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -191,36 +204,16 @@ def send_notification_to_all_teachers():
         if not data.get('title') or not data.get('message'):
             return jsonify({'error': 'Title and message are required'}), 400
         
-        cursor = mysql.connection.cursor()
-        
-        # Get all teachers
-        cursor.execute("""
-            SELECT u.id FROM users u
-            WHERE u.role = 'teacher'
-        """)
-        
-        teachers = cursor.fetchall()
-        cursor.close()
-        
-        if not teachers:
-            return jsonify({'message': 'No teachers found', 'recipients': 0}), 200
-        
-        # Create notifications for all teachers
-        recipients = 0
-        for teacher in teachers:
-            try:
-                Notification.create(
-                    user_id=teacher['id'],
-                    notification_type='system_announcement',
-                    title=data['title'],
-                    message=data['message'],
-                    link=data.get('link'),
-                    sender_id=user_id,
-                    priority=data.get('priority', 'normal')
-                )
-                recipients += 1
-            except Exception as e:
-                print(f"Error sending to teacher {teacher['id']}: {e}")
+        Notification.broadcast(
+            audience='teacher',
+            sender_id=user_id,
+            title=data['title'],
+            message=data['message'],
+            notification_type='system_announcement',
+            link=data.get('link'),
+            priority=data.get('priority', 'normal')
+        )
+        recipients = Notification.count_audience('teacher')
         
         return jsonify({
             'message': f'Notification sent to {recipients} teachers',
@@ -228,9 +221,7 @@ def send_notification_to_all_teachers():
         }), 200
         
     except Exception as e:
-        print(f"Error sending notification to teachers: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.send_to_all_teachers.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -246,31 +237,16 @@ def send_notification_to_all_users():
         if not data.get('title') or not data.get('message'):
             return jsonify({'error': 'Title and message are required'}), 400
         
-        cursor = mysql.connection.cursor()
-        
-        # Get all users
-        cursor.execute("SELECT id FROM users")
-        users = cursor.fetchall()
-        cursor.close()
-        
-        if not users:
-            return jsonify({'message': 'No users found', 'recipients': 0}), 200
-        
-        recipients = 0
-        for user in users:
-            try:
-                Notification.create(
-                    user_id=user['id'],
-                    notification_type='system_announcement',
-                    title=data['title'],
-                    message=data['message'],
-                    link=data.get('link'),
-                    sender_id=user_id,
-                    priority=data.get('priority', 'high')
-                )
-                recipients += 1
-            except Exception as e:
-                print(f"Error sending to user {user['id']}: {e}")
+        Notification.broadcast(
+            audience='all',
+            sender_id=user_id,
+            title=data['title'],
+            message=data['message'],
+            notification_type='system_announcement',
+            link=data.get('link'),
+            priority=data.get('priority', 'high')
+        )
+        recipients = Notification.count_audience('all')
         
         return jsonify({
             'message': f'Notification sent to {recipients} users',
@@ -278,9 +254,7 @@ def send_notification_to_all_users():
         }), 200
         
     except Exception as e:
-        print(f"Error sending notification to all users: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.send_to_all_users.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -322,9 +296,26 @@ def send_notification_to_user(target_user_id):
         }), 200
         
     except Exception as e:
-        print(f"Error sending notification to user: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.send_to_user.failed')
+        return jsonify({'error': str(e)}), 500
+
+
+@notification_bp.route('/jobs/<int:job_id>', methods=['GET'], strict_slashes=False)
+@jwt_required()
+@role_required(['teacher', 'admin'])
+def get_fan_out_job(job_id):
+    """Progress of a queued send (its sender or an admin)"""
+    try:
+        user_id = get_jwt_identity()
+        job = NotificationJob.get(job_id)
+        
+        if not job or (get_jwt().get('role') != 'admin' and job['sender_id'] != user_id):
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({'job': job}), 200
+        
+    except Exception as e:
+        log.exception('notifications.job_status.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -333,51 +324,127 @@ def send_notification_to_user(target_user_id):
 @notification_bp.route('/', methods=['GET'], strict_slashes=False)
 @jwt_required()
 def get_notifications():
-    """Get all notifications for current user"""
+    """Get notifications for current user (pass ?cursor=<next_cursor> for the next page)"""
     try:
         user_id = get_jwt_identity()
         
-        limit = request.args.get('limit', 50, type=int)
-        offset = request.args.get('offset', 0, type=int)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 100)
+        cursor_token = request.args.get('cursor')
         unread_only = request.args.get('unread_only', 'false').lower() == 'true'
         
-        notifications = Notification.get_by_user(
-            user_id=user_id,
-            limit=limit,
-            offset=offset,
-            unread_only=unread_only
-        )
+        try:
+            notifications, next_cursor = Notification.get_by_user(
+                user_id=user_id,
+                limit=limit,
+                cursor_token=cursor_token,
+                unread_only=unread_only
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         unread_count = Notification.get_unread_count(user_id)
         
         return jsonify({
             'notifications': notifications,
             'unread_count': unread_count,
-            'total': len(notifications)
+            'total': len(notifications),
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
-        print(f"Error getting notifications: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.list.failed')
         return jsonify({'error': str(e)}), 500
 
 
 @notification_bp.route('/unread-count', methods=['GET'], strict_slashes=False)
 @jwt_required()
 def get_unread_count():
-    """Get unread notifications count"""
+    """Get unread notifications count (answers 304 when the ETag still matches)"""
     try:
         user_id = get_jwt_identity()
-        count = Notification.get_unread_count(user_id)
-        return jsonify({'unread_count': count}), 200
+        
+        # One PK lookup decides whether anything changed since the client's last poll
+        etag = f"unread-{user_id}-{Notification.get_unread_version(user_id)}"
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            count = Notification.get_unread_count(user_id)
+            response = make_response(jsonify({'unread_count': count}), 200)
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
     except Exception as e:
-        print(f"Error getting unread count: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.unread_count.failed')
         return jsonify({'error': str(e)}), 500
 
 
+@notification_bp.route('/stream-ticket', methods=['POST'], strict_slashes=False)
+@jwt_required()
+@role_required(['student', 'teacher', 'admin'])
+def get_stream_ticket():
+    """Short-lived ticket for opening the SSE stream (EventSource cannot send headers)"""
+    user_id = get_jwt_identity()
+    claims = get_jwt()
+    # Tokens from before the role claim existed are resolved like role_required does
+    role = claims.get('role') or _role_from_db(user_id)
+    ticket = issue_stream_ticket(user_id, role, claims.get('iat', 0))
+    return jsonify({
+        'ticket': ticket,
+        'expires_in': current_app.config.get('NOTIFICATION_STREAM_TICKET_SECONDS', 60)
+    }), 200
+
+
+@notification_bp.route('/stream', methods=['GET'], strict_slashes=False)
+def stream_notifications():
+    """Server-Sent Events stream of new notifications and unread-count changes.
+    
+    Opened with ?ticket=... from POST /stream-ticket, so the access token never
+    appears in a URL. Reconnecting clients send Last-Event-ID and get the events
+    they missed, or a `resync` event when the gap is older than the in-memory
+    buffer. Streams of users whose role changes or who are deleted are closed
+    within ROLE_SYNC_INTERVAL seconds.
+    """
+    ticket = read_stream_ticket(request.args.get('ticket', ''))
+    if ticket is None:
+        return jsonify({'error': 'Invalid or expired stream ticket'}), 401
+    user_id, role, issued_at = ticket
+    if role_versions.is_stale(user_id, issued_at):
+        return jsonify({'error': 'Session expired. Please log in again.'}), 401
+    
+    # Each open stream holds a server thread; keep enough free for API requests
+    if hub.connection_count() >= current_app.config.get('NOTIFICATION_STREAM_MAX_PER_WORKER', 30):
+        response = jsonify({'error': 'Too many open notification streams, try again later'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    # Subscribe before replaying so nothing published in between is lost;
+    # the stream drops queued duplicates of replayed events by id
+    sub = hub.subscribe(user_id, role, issued_at)
+    try:
+        initial = {'unread_count': Notification.get_unread_count(user_id)}
+    except Exception:
+        hub.unsubscribe(sub)
+        raise
+    replay = [] if last_event_id is None else hub.replay(last_event_id, user_id, role)
+    
+    # Not wrapped in stream_with_context: the request (and its pooled DB
+    # connection) is released before the stream starts
+    response = Response(
+        stream_events(sub, replay, initial, current_app.config.get('NOTIFICATION_STREAM_HEARTBEAT', 25)),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @notification_bp.route('/class/<int:class_id>', methods=['GET'], strict_slashes=False)
 @jwt_required()
 @role_required(['teacher', 'admin'])
@@ -408,85 +475,44 @@ def get_class_notifications(class_id):
         return jsonify({'notifications': notifications}), 200
         
     except Exception as e:
-        print(f"Error getting class notifications: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.class_list.failed')
         return jsonify({'error': str(e)}), 500
 
 
 @notification_bp.route('/stats', methods=['GET'], strict_slashes=False)
 @jwt_required()
 def get_notification_stats():
-    """Get notification statistics for current user"""
+    """Get notification statistics for current user (cached rollup, see Notification.get_stats)"""
     try:
         user_id = get_jwt_identity()
         
-        cursor = mysql.connection.cursor()
-        
-        # Total count
-        cursor.execute("""
-            SELECT COUNT(*) as total FROM notifications 
-            WHERE user_id = %s
-        """, (user_id,))
-        total = cursor.fetchone()['total']
-        
-        # Unread count
-        cursor.execute("""
-            SELECT COUNT(*) as unread FROM notifications 
-            WHERE user_id = %s AND is_read = FALSE
-        """, (user_id,))
-        unread = cursor.fetchone()['unread']
-        
-        # Count by type
-        cursor.execute("""
-            SELECT type, COUNT(*) as count 
-            FROM notifications 
-            WHERE user_id = %s 
-            GROUP BY type
-        """, (user_id,))
-        by_type = cursor.fetchall()
-        
-        # Recent activity (last 7 days)
-        cursor.execute("""
-            SELECT DATE(created_at) as date, COUNT(*) as count
-            FROM notifications
-            WHERE user_id = %s AND created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-            GROUP BY DATE(created_at)
-            ORDER BY date DESC
-        """, (user_id,))
-        recent = cursor.fetchall()
-        
-        cursor.close()
-        
-        return jsonify({
-            'total': total,
-            'unread': unread,
-            'read': total - unread,
-            'by_type': by_type,
-            'recent_activity': recent
-        }), 200
+        return jsonify(Notification.get_stats(user_id)), 200
         
     except Exception as e:
-        print(f"Error getting notification stats: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.stats.failed')
         return jsonify({'error': str(e)}), 500
 
 
 # ============ MANAGING NOTIFICATIONS ============
 
-@notification_bp.route('/<int:notification_id>/read', methods=['PUT'], strict_slashes=False)
+@notification_bp.route('/<notification_id>/read', methods=['PUT'], strict_slashes=False)
 @jwt_required()
 def mark_as_read(notification_id):
-    """Mark a notification as read"""
+    """Mark a notification (or broadcast, id 'b<id>') as read"""
     try:
         user_id = get_jwt_identity()
-        Notification.mark_as_read(notification_id, user_id)
+        source, item_id = Notification.parse_id(notification_id)
+        
+        if source == 'broadcast':
+            Notification.mark_broadcasts_read([item_id], user_id)
+        elif source == 'notification':
+            Notification.mark_as_read(item_id, user_id)
+        else:
+            return jsonify({'error': 'Notification not found'}), 404
+        
         return jsonify({'message': 'Notification marked as read'}), 200
     except Exception as e:
-        print(f"Error marking notification as read: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.mark_read.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -502,33 +528,40 @@ def mark_all_as_read():
             'count': count
         }), 200
     except Exception as e:
-        print(f"Error marking all as read: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.mark_all_read.failed')
         return jsonify({'error': str(e)}), 500
 
 
-@notification_bp.route('/<int:notification_id>', methods=['DELETE'], strict_slashes=False)
+@notification_bp.route('/<notification_id>', methods=['DELETE'], strict_slashes=False)
 @jwt_required()
 def delete_notification(notification_id):
     """Delete a notification (Admin/Teacher only)"""
     try:
         user_id = get_jwt_identity()
+        source, item_id = Notification.parse_id(notification_id)
+        
+        if source is None:
+            return jsonify({'error': 'Notification not found'}), 404
+        
+        # Broadcasts are shared, so deleting one only hides it for this user
+        if source == 'broadcast':
+            if get_jwt().get('role') == 'student':
+                return jsonify({'error': 'Students cannot delete notifications'}), 403
+            Notification.dismiss_broadcasts([item_id], user_id)
+            return jsonify({'message': 'Notification deleted'}), 200
         
         # Check if user has permission to delete
-        can_delete, message = Notification.can_delete(user_id, notification_id)
+        can_delete, message = Notification.can_delete(user_id, item_id)
         
         if not can_delete:
             return jsonify({'error': message}), 403
         
         # Proceed with deletion
-        Notification.delete(notification_id, user_id)
+        Notification.delete(item_id, user_id)
         return jsonify({'message': 'Notification deleted'}), 200
         
     except Exception as e:
-        print(f"Error deleting notification: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.delete.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -561,9 +594,7 @@ def clear_all_notifications():
         }), 200
         
     except Exception as e:
-        print(f"Error clearing notifications: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.clear_all.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -581,19 +612,9 @@ def bulk_mark_read():
         if not notification_ids:
             return jsonify({'error': 'No notification IDs provided'}), 400
         
-        cursor = mysql.connection.cursor()
-        placeholders = ', '.join(['%s'] * len(notification_ids))
-        query = f"""
-            UPDATE notifications 
-            SET is_read = TRUE 
-            WHERE id IN ({placeholders}) AND user_id = %s
-        """
-        params = notification_ids + [user_id]
-        
-        cursor.execute(query, params)
-        mysql.connection.commit()
-        count = cursor.rowcount
-        cursor.close()
+        personal_ids, broadcast_ids = Notification.split_ids(notification_ids)
+        count = Notification.mark_many_as_read(personal_ids, user_id)
+        count += Notification.mark_broadcasts_read(broadcast_ids, user_id)
         
         return jsonify({
             'message': f'{count} notifications marked as read',
@@ -601,9 +622,7 @@ def bulk_mark_read():
         }), 200
         
     except Exception as e:
-        print(f"Error bulk marking notifications: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.bulk_mark_read.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -619,18 +638,9 @@ def bulk_delete():
         if not notification_ids:
             return jsonify({'error': 'No notification IDs provided'}), 400
         
-        cursor = mysql.connection.cursor()
-        placeholders = ', '.join(['%s'] * len(notification_ids))
-        query = f"""
-            DELETE FROM notifications 
-            WHERE id IN ({placeholders}) AND user_id = %s
-        """
-        params = notification_ids + [user_id]
-        
-        cursor.execute(query, params)
-        mysql.connection.commit()
-        count = cursor.rowcount
-        cursor.close()
+        personal_ids, broadcast_ids = Notification.split_ids(notification_ids)
+        count = Notification.delete_many(personal_ids, user_id)
+        count += Notification.dismiss_broadcasts(broadcast_ids, user_id)
         
         return jsonify({
             'message': f'{count} notifications deleted',
@@ -638,9 +648,7 @@ def bulk_delete():
         }), 200
         
     except Exception as e:
-        print(f"Error bulk deleting notifications: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.bulk_delete.failed')
         return jsonify({'error': str(e)}), 500
 
 
@@ -670,7 +678,5 @@ def test_notification():
         }), 200
         
     except Exception as e:
-        print(f"Error sending test notification: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('notifications.test.failed')
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import student_required
+from utils.idempotency import idempotent
 from utils.file_handler import save_file
 from datetime import datetime
 import os
@@ -265,6 +266,7 @@ def get_my_submission(assignment_id):
 @student_assignments_bp.route('/<int:assignment_id>/submit', methods=['POST'], strict_slashes=False)
 @jwt_required()
 @student_required
+@idempotent
 def submit_assignment(assignment_id):
     """Submit assignment work"""
     try:
@@ -2,7 +2,8 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import student_required
-from datetime import date
+from utils.idempotency import idempotent
+from models.enrollment import Enrollment, SectionUnavailable, AlreadyEnrolled
 
 student_enrollments_bp = Blueprint('student_enrollments', __name__)
 
@@ -49,6 +50,7 @@ def get_pending_enrollments():
 @student_enrollments_bp.route('/', methods=['POST'], strict_slashes=False)
 @jwt_required()
 @student_required
+@idempotent
 def request_enrollment():
     """Request enrollment in a section"""
     try:
@@ -58,45 +60,59 @@ def request_enrollment():
         if not data.get('section_id'):
             return jsonify({'error': 'Section ID is required'}), 400
         
-        cursor = mysql.connection.cursor()
-        
-        # Check if section exists and has space
-        cursor.execute("""
-            SELECT s.* FROM sections s
-            WHERE s.id = %s AND s.is_active = TRUE AND s.enrolled_count < s.capacity
-        """, (data['section_id'],))
-        
-        section = cursor.fetchone()
-        if not section:
-            cursor.close()
-            return jsonify({'error': 'Section not available'}), 400
-        
-        # Check if already enrolled or pending
-        cursor.execute("""
-            SELECT id, status FROM enrollments 
-            WHERE student_id = %s AND section_id = %s
-        """, (student_id, data['section_id']))
-        
-        existing = cursor.fetchone()
-        if existing:
-            cursor.close()
-            return jsonify({'error': f'Already {existing["status"]}'}), 400
+        # A full section puts the request on its waitlist instead
+        try:
+            enrollment_id, status = Enrollment.create(student_id, data['section_id'])
+        except SectionUnavailable:
+            return jsonify({'error': 'Section not available'}), 404
+        except AlreadyEnrolled as e:
+            return jsonify({'error': str(e)}), 409
         
-        # Create enrollment request
-        cursor.execute("""
-            INSERT INTO enrollments (student_id, section_id, status, enrollment_date)
-            VALUES (%s, %s, 'pending', %s)
-        """, (student_id, data['section_id'], date.today()))
-        
-        mysql.connection.commit()
-        enrollment_id = cursor.lastrowid
-        cursor.close()
+        if status == 'waitlisted':
+            return jsonify({
+                'message': 'Section is full, you have been added to the waitlist',
+                'enrollment_id': enrollment_id,
+                'status': status,
+                'waitlist_position': Enrollment.waitlist_position(enrollment_id)
+            }), 201
         
         return jsonify({
             'message': 'Enrollment request submitted',
-            'enrollment_id': enrollment_id
+            'enrollment_id': enrollment_id,
+            'status': status
         }), 201
         
     except Exception as e:
         print(f"Error requesting enrollment: {e}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@student_enrollments_bp.route('/waitlist', methods=['GET'], strict_slashes=False)
+@jwt_required()
+@student_required
+def get_waitlist():
+    """Get the student's waitlisted requests with their queue positions"""
+    try:
+        student_id = get_jwt_identity()
+        waitlist = Enrollment.get_waitlist_by_student(student_id)
+        return jsonify({'waitlist': waitlist}), 200
+        
+    except Exception as e:
+        print(f"Error getting waitlist: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@student_enrollments_bp.route('/<int:enrollment_id>', methods=['DELETE'], strict_slashes=False)
+@jwt_required()
+@student_required
+def drop_enrollment(enrollment_id):
+    """Drop an enrollment or leave a waitlist; a freed seat goes to the next in line"""
+    try:
+        student_id = get_jwt_identity()
+        Enrollment.drop(enrollment_id, student_id)
+        return jsonify({'message': 'Enrollment dropped'}), 200
+        
+    except Exception as e:
+        if str(e) == "Enrollment not found":
+            return jsonify({'error': str(e)}), 404
+        print(f"Error dropping enrollment: {e}")
+        return jsonify({'error': str(e)}), 500
@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import student_required
+from utils.section_search import section_index
+from utils.catalog_cache import catalog, json_response_with_etag
 
 student_sections_bp = Blueprint('student_sections', __name__)
 
@@ -30,35 +32,49 @@ def get_my_sections():
                 sub.credits,
                 c.id as course_id,
                 c.name as course_name,
-                c.code as course_code,
-                u.id as teacher_id,
-                u.name as teacher_name,
-                sch.day,
-                sch.start_time,
-                sch.end_time
+                c.code as course_code
             FROM enrollments e
             JOIN sections s ON e.section_id = s.id
             JOIN subjects sub ON s.subject_id = sub.id
             JOIN courses c ON sub.course_id = c.id
-            LEFT JOIN teacher_assignments ta ON s.id = ta.section_id
-            LEFT JOIN users u ON ta.teacher_id = u.id
-            LEFT JOIN schedules sch ON s.id = sch.section_id
             WHERE e.student_id = %s AND e.status = 'approved'
             ORDER BY c.name, sub.semester
         """, (student_id,))
         
-        rows = cursor.fetchall()
-        
-        # Convert timedelta objects to strings for JSON serialization
-        sections = []
-        for row in rows:
-            section_dict = dict(row)
-            # Convert time fields to strings if they exist
-            if section_dict.get('start_time'):
-                section_dict['start_time'] = str(section_dict['start_time'])
-            if section_dict.get('end_time'):
-                section_dict['end_time'] = str(section_dict['end_time'])
-            sections.append(section_dict)
+        sections = cursor.fetchall()
+        by_id = {}
+        for section in sections:
+            section['teachers'] = []
+            section['schedule'] = []
+            by_id[section['section_id']] = section
+        
+        # Teachers and schedule slots for all sections in one query each,
+        # instead of a teacher x slot cross product per section
+        if by_id:
+            placeholders = ', '.join(['%s'] * len(by_id))
+            section_ids = list(by_id)
+            
+            cursor.execute(f"""
+                SELECT ta.section_id, u.id, u.name, ta.is_primary
+                FROM teacher_assignments ta
+                JOIN users u ON ta.teacher_id = u.id
+                WHERE ta.section_id IN ({placeholders})
+                ORDER BY ta.is_primary DESC, u.name
+            """, section_ids)
+            for teacher in cursor.fetchall():
+                by_id[teacher.pop('section_id')]['teachers'].append(teacher)
+            
+            cursor.execute(f"""
+                SELECT section_id, id, day, start_time, end_time, room
+                FROM schedules
+                WHERE section_id IN ({placeholders})
+                ORDER BY FIELD(day, 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'), start_time
+            """, section_ids)
+            for slot in cursor.fetchall():
+                # TIME columns arrive as timedelta
+                slot['start_time'] = str(slot['start_time']) if slot['start_time'] is not None else None
+                slot['end_time'] = str(slot['end_time']) if slot['end_time'] is not None else None
+                by_id[slot.pop('section_id')]['schedule'].append(slot)
         
         cursor.close()
         
@@ -162,6 +178,50 @@ def get_section_details(section_id):
 
 # ============ GET AVAILABLE SECTIONS FOR ENROLLMENT ============
 
+def _active_sections():
+    """Every active section with subject, course and teacher (cached per catalog version).
+    
+    Seat counts here are only as of the load; callers overlay catalog.seats().
+    """
+    cursor = mysql.connection.cursor()
+    cursor.execute("""
+        SELECT 
+            s.id as section_id,
+            s.name as section_name,
+            s.academic_year,
+            s.semester,
+            s.capacity,
+            s.enrolled_count,
+            (s.capacity - s.enrolled_count) as available_seats,
+            s.room,
+            sub.id as subject_id,
+            sub.code as subject_code,
+            sub.name as subject_name,
+            sub.credits,
+            sub.semester as subject_semester,
+            c.id as course_id,
+            c.name as course_name,
+            c.code as course_code,
+            u.id as teacher_id,
+            u.name as teacher_name
+        FROM sections s
+        JOIN subjects sub ON s.subject_id = sub.id
+        JOIN courses c ON sub.course_id = c.id
+        LEFT JOIN teacher_assignments ta ON s.id = ta.section_id
+        LEFT JOIN users u ON ta.teacher_id = u.id
+        WHERE s.is_active = TRUE
+        ORDER BY c.name, sub.semester, s.name
+    """)
+    sections = cursor.fetchall()
+    cursor.close()
+    return sections
+
+
+@catalog.warmer
+def warm_active_sections():
+    catalog.data(('active_sections',), _active_sections)
+
+
 @student_sections_bp.route('/available', methods=['GET'], strict_slashes=False)
 @jwt_required()
 @student_required
@@ -178,67 +238,35 @@ def get_available_sections():
         # Get sections the student is already enrolled in or has pending requests
         cursor.execute("""
             SELECT section_id FROM enrollments 
-            WHERE student_id = %s AND status IN ('approved', 'pending')
+            WHERE student_id = %s AND status IN ('approved', 'pending', 'waitlisted')
         """, (student_id,))
-        enrolled_sections = [row['section_id'] for row in cursor.fetchall()]
-        
-        # Build query for available sections
-        query = """
-            SELECT 
-                s.id as section_id,
-                s.name as section_name,
-                s.academic_year,
-                s.semester,
-                s.capacity,
-                s.enrolled_count,
-                (s.capacity - s.enrolled_count) as available_seats,
-                s.room,
-                sub.id as subject_id,
-                sub.code as subject_code,
-                sub.name as subject_name,
-                sub.credits,
-                sub.semester as subject_semester,
-                c.id as course_id,
-                c.name as course_name,
-                c.code as course_code,
-                u.id as teacher_id,
-                u.name as teacher_name
-            FROM sections s
-            JOIN subjects sub ON s.subject_id = sub.id
-            JOIN courses c ON sub.course_id = c.id
-            LEFT JOIN teacher_assignments ta ON s.id = ta.section_id
-            LEFT JOIN users u ON ta.teacher_id = u.id
-            WHERE s.is_active = TRUE 
-                AND s.enrolled_count < s.capacity
-        """
-        params = []
-        
-        # Exclude sections the student is already enrolled in or has pending
-        if enrolled_sections:
-            placeholders = ','.join(['%s'] * len(enrolled_sections))
-            query += f" AND s.id NOT IN ({placeholders})"
-            params.extend(enrolled_sections)
-        
-        if academic_year:
-            query += " AND s.academic_year = %s"
-            params.append(academic_year)
-        if semester:
-            query += " AND s.semester = %s"
-            params.append(semester)
-        if course_id:
-            query += " AND c.id = %s"
-            params.append(course_id)
-            
-        query += " ORDER BY c.name, sub.semester, s.name"
-        
-        cursor.execute(query, params)
-        sections = cursor.fetchall()
+        enrolled_sections = {row['section_id'] for row in cursor.fetchall()}
         cursor.close()
         
-        return jsonify({
+        # Catalog rows come from the cache; live seat counts are overlaid on copies
+        seats = catalog.seats()
+        sections = []
+        for row in catalog.data(('active_sections',), _active_sections):
+            capacity, enrolled_count = seats.get(row['section_id'], (0, 0))
+            if enrolled_count >= capacity or row['section_id'] in enrolled_sections:
+                continue
+            if academic_year and row['academic_year'] != academic_year:
+                continue
+            if semester and row['semester'] != semester:
+                continue
+            if course_id and row['course_id'] != course_id:
+                continue
+            sections.append(dict(
+                row,
+                capacity=capacity,
+                enrolled_count=enrolled_count,
+                available_seats=capacity - enrolled_count
+            ))
+        
+        return json_response_with_etag({
             'total': len(sections),
             'sections': sections
-        }), 200
+        })
         
     except Exception as e:
         print(f"Error getting available sections: {e}")
@@ -345,57 +373,56 @@ def search_sections():
         # Get sections the student is already enrolled in
         cursor.execute("""
             SELECT section_id FROM enrollments 
-            WHERE student_id = %s AND status IN ('approved', 'pending')
+            WHERE student_id = %s AND status IN ('approved', 'pending', 'waitlisted')
         """, (student_id,))
         enrolled_sections = [row['section_id'] for row in cursor.fetchall()]
         
-        search_term = f"%{keyword}%"
-        query = """
-            SELECT 
-                s.id as section_id,
-                s.name as section_name,
-                s.academic_year,
-                s.semester,
-                s.capacity,
-                s.enrolled_count,
-                (s.capacity - s.enrolled_count) as available_seats,
-                s.room,
-                sub.id as subject_id,
-                sub.code as subject_code,
-                sub.name as subject_name,
-                sub.credits,
-                sub.semester as subject_semester,
-                c.id as course_id,
-                c.name as course_name,
-                c.code as course_code,
-                u.id as teacher_id,
-                u.name as teacher_name
-            FROM sections s
-            JOIN subjects sub ON s.subject_id = sub.id
-            JOIN courses c ON sub.course_id = c.id
-            LEFT JOIN teacher_assignments ta ON s.id = ta.section_id
-            LEFT JOIN users u ON ta.teacher_id = u.id
-            WHERE s.is_active = TRUE 
-                AND s.enrolled_count < s.capacity
-                AND (
-                    sub.name LIKE %s 
-                    OR sub.code LIKE %s 
-                    OR c.name LIKE %s 
-                    OR c.code LIKE %s
-                    OR u.name LIKE %s
-                )
-        """
-        params = [search_term, search_term, search_term, search_term, search_term]
-        
-        if enrolled_sections:
-            placeholders = ','.join(['%s'] * len(enrolled_sections))
-            query += f" AND s.id NOT IN ({placeholders})"
-            params.extend(enrolled_sections)
-            
-        query += " ORDER BY c.name, sub.semester, s.name LIMIT 20"
+        # Ranked ids from the in-process index; seats and enrollments are
+        # live, so they are filtered in SQL a page of candidates at a time
+        ranked = section_index.search(keyword)
+        rank = {section_id: i for i, section_id in enumerate(ranked)}
+        excluded = set(enrolled_sections)
+        candidates = [section_id for section_id in ranked if section_id not in excluded]
         
-        cursor.execute(query, params)
-        sections = cursor.fetchall()
+        sections = []
+        page_size = 100
+        for i in range(0, len(candidates), page_size):
+            page = candidates[i:i + page_size]
+            placeholders = ','.join(['%s'] * len(page))
+            cursor.execute(f"""
+                SELECT 
+                    s.id as section_id,
+                    s.name as section_name,
+                    s.academic_year,
+                    s.semester,
+                    s.capacity,
+                    s.enrolled_count,
+                    (s.capacity - s.enrolled_count) as available_seats,
+                    s.room,
+                    sub.id as subject_id,
+                    sub.code as subject_code,
+                    sub.name as subject_name,
+                    sub.credits,
+                    sub.semester as subject_semester,
+                    c.id as course_id,
+                    c.name as course_name,
+                    c.code as course_code,
+                    u.id as teacher_id,
+                    u.name as teacher_name
+                FROM sections s
+                JOIN subjects sub ON s.subject_id = sub.id
+                JOIN courses c ON sub.course_id = c.id
+                LEFT JOIN teacher_assignments ta ON s.id = ta.section_id
+                LEFT JOIN users u ON ta.teacher_id = u.id
+                WHERE s.id IN ({placeholders})
+                    AND s.is_active = TRUE 
+                    AND s.enrolled_count < s.capacity
+            """, page)
+            sections += sorted(cursor.fetchall(), key=lambda row: rank[row['section_id']])
+            if len(sections) >= 20:
+                break
+        
+        sections = sections[:20]
         cursor.close()
         
         return jsonify({
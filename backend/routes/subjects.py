@@ -4,11 +4,30 @@ from utils.database import mysql
 from utils.decorators import admin_required
 from models.subject import Subject
 from models.course import Course
+from utils.catalog_cache import catalog, catalog_response
 
 subjects_bp = Blueprint('subjects', __name__)
 
 # ============ PUBLIC ENDPOINTS ============
 
+def _subjects_body(include_inactive, course_id):
+    if course_id:
+        subjects = Subject.get_by_course(course_id, include_inactive)
+    else:
+        subjects = Subject.get_all(include_inactive)
+    
+    return {
+        'total': len(subjects),
+        'subjects': subjects
+    }
+
+
+@catalog.warmer
+def warm_subjects():
+    catalog.get(('subjects', False, None), lambda: _subjects_body(False, None))
+    catalog.get(('subjects_for_selection',), lambda: {'subjects': Subject.get_for_selection()})
+
+
 @subjects_bp.route('/', methods=['GET'])
 def get_all_subjects():
     """Get all subjects - PUBLIC for registration"""
@@ -16,15 +35,11 @@ def get_all_subjects():
         include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
         course_id = request.args.get('course_id', type=int)
         
-        if course_id:
-            subjects = Subject.get_by_course(course_id, include_inactive)
-        else:
-            subjects = Subject.get_all(include_inactive)
-        
-        return jsonify({
-            'total': len(subjects),
-            'subjects': subjects
-        }), 200
+        body, etag = catalog.get(
+            ('subjects', include_inactive, course_id),
+            lambda: _subjects_body(include_inactive, course_id)
+        )
+        return catalog_response(body, etag)
         
     except Exception as e:
         print(f"Error getting subjects: {e}")
@@ -35,8 +50,8 @@ def get_all_subjects():
 def get_subjects_for_selection():
     """Get subjects formatted for dropdown - PUBLIC"""
     try:
-        subjects = Subject.get_for_selection()
-        return jsonify({'subjects': subjects}), 200
+        body, etag = catalog.get(('subjects_for_selection',), lambda: {'subjects': Subject.get_for_selection()})
+        return catalog_response(body, etag)
     except Exception as e:
         print(f"Error getting subjects: {e}")
         return jsonify({'error': str(e)}), 500
@@ -122,6 +137,8 @@ def create_subject():
             is_core=data.get('is_core', True)
         )
         
+        catalog.bump()
+        
         return jsonify({
             'message': 'Subject created successfully',
             'subject_id': subject_id
@@ -146,6 +163,8 @@ def update_subject(subject_id):
         
         Subject.update(subject_id, **data)
         
+        catalog.bump()
+        
         return jsonify({'message': 'Subject updated successfully'}), 200
         
     except Exception as e:
@@ -173,6 +192,8 @@ def delete_subject(subject_id):
         
         Subject.delete(subject_id)
         
+        catalog.bump()
+        
         return jsonify({'message': 'Subject deleted successfully'}), 200
         
     except Exception as e:
@@ -216,6 +237,8 @@ def bulk_create_subjects():
             except Exception as e:
                 errors.append(f"Row {idx+1}: {str(e)}")
         
+        catalog.bump()
+        
         return jsonify({
             'message': f'Created {len(created_ids)} subjects',
             'created_ids': created_ids,
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import teacher_required
 from utils.file_handler import save_file
+from models.section_counter import SectionCounter
 import os
 
 teacher_assignments_bp = Blueprint('teacher_assignments', __name__)
@@ -187,9 +188,10 @@ def create_assignment():
             data.get('max_file_size', 10485760),
             data.get('allowed_file_types', '.pdf,.doc,.docx,.zip,.jpg,.png')
         ))
+        assignment_id = cursor.lastrowid
+        SectionCounter.bump(cursor, data['section_id'], assignments=1)
         
         mysql.connection.commit()
-        assignment_id = cursor.lastrowid
         cursor.close()
         
         return jsonify({
@@ -361,6 +363,7 @@ def delete_assignment(assignment_id):
         
         # Delete assignment (cascades to submissions and attachments)
         cursor.execute("DELETE FROM assignments WHERE id = %s", (assignment_id,))
+        SectionCounter.bump(cursor, assignment['section_id'], assignments=-1)
         mysql.connection.commit()
         cursor.close()
         
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import teacher_required
+from models.enrollment import Enrollment
 
 teacher_enrollments_bp = Blueprint('teacher_enrollments', __name__)
 
@@ -68,52 +69,15 @@ def approve_enrollment(enrollment_id):
     try:
         teacher_id = get_jwt_identity()
         
-        cursor = mysql.connection.cursor()
-        
-        # Verify teacher owns the section and get details
-        cursor.execute("""
-            SELECT 
-                e.*,
-                s.capacity,
-                s.enrolled_count,
-                s.id as section_id
-            FROM enrollments e
-            JOIN sections s ON e.section_id = s.id
-            JOIN teacher_assignments ta ON s.id = ta.section_id
-            WHERE e.id = %s AND ta.teacher_id = %s
-        """, (enrollment_id, teacher_id))
+        result = Enrollment.approve(enrollment_id, teacher_id, teacher_id=teacher_id)
         
-        enrollment = cursor.fetchone()
-        
-        if not enrollment:
-            cursor.close()
+        if result == 'not_found':
             return jsonify({'error': 'Enrollment not found or unauthorized'}), 404
-        
-        if enrollment['status'] != 'pending':
-            cursor.close()
+        if result == 'not_pending':
             return jsonify({'error': 'Enrollment is not pending'}), 400
-        
-        if enrollment['enrolled_count'] >= enrollment['capacity']:
-            cursor.close()
+        if result == 'full':
             return jsonify({'error': 'Section is full'}), 400
         
-        # Approve enrollment
-        cursor.execute("""
-            UPDATE enrollments 
-            SET status = 'approved', approved_by = %s, approved_date = CURDATE()
-            WHERE id = %s
-        """, (teacher_id, enrollment_id))
-        
-        # Update section enrolled count
-        cursor.execute("""
-            UPDATE sections 
-            SET enrolled_count = enrolled_count + 1 
-            WHERE id = %s
-        """, (enrollment['section_id'],))
-        
-        mysql.connection.commit()
-        cursor.close()
-        
         # TODO: Send notification to student
         
         return jsonify({'message': 'Enrollment approved successfully'}), 200
@@ -157,11 +121,17 @@ def reject_enrollment(enrollment_id):
         cursor.execute("""
             UPDATE enrollments 
             SET status = 'rejected', approved_by = %s, approved_date = CURDATE()
-            WHERE id = %s
+            WHERE id = %s AND status = 'pending'
         """, (teacher_id, enrollment_id))
         
+        # The seat this request held goes to the waitlist
+        promoted = []
+        if cursor.rowcount:
+            promoted = Enrollment.promote_waitlist(cursor, enrollment['section_id'])
+        
         mysql.connection.commit()
         cursor.close()
+        Enrollment.notify_promoted(promoted, enrollment['section_id'])
         
         # TODO: Send notification to student
         
@@ -237,61 +207,15 @@ def bulk_approve_enrollments():
     try:
         teacher_id = get_jwt_identity()
         data = request.get_json()
-        enrollment_ids = data.get('enrollment_ids', [])
+        enrollment_ids = Enrollment.parse_ids(data.get('enrollment_ids', []))
         
+        if enrollment_ids is None:
+            return jsonify({'error': 'enrollment_ids must be a list of enrollment IDs'}), 400
         if not enrollment_ids:
             return jsonify({'error': 'No enrollment IDs provided'}), 400
         
-        cursor = mysql.connection.cursor()
-        success_count = 0
-        failed_ids = []
-        
-        for enrollment_id in enrollment_ids:
-            try:
-                # Verify teacher owns the section
-                cursor.execute("""
-                    SELECT 
-                        e.*,
-                        s.capacity,
-                        s.enrolled_count,
-                        s.id as section_id
-                    FROM enrollments e
-                    JOIN sections s ON e.section_id = s.id
-                    JOIN teacher_assignments ta ON s.id = ta.section_id
-                    WHERE e.id = %s AND ta.teacher_id = %s
-                """, (enrollment_id, teacher_id))
-                
-                enrollment = cursor.fetchone()
-                
-                if not enrollment or enrollment['status'] != 'pending' or enrollment['enrolled_count'] >= enrollment['capacity']:
-                    failed_ids.append(enrollment_id)
-                    continue
-                
-                cursor.execute("""
-                    UPDATE enrollments 
-                    SET status = 'approved', approved_by = %s, approved_date = CURDATE()
-                    WHERE id = %s
-                """, (teacher_id, enrollment_id))
-                
-                cursor.execute("""
-                    UPDATE sections 
-                    SET enrolled_count = enrolled_count + 1 
-                    WHERE id = %s
-                """, (enrollment['section_id'],))
-                
-                success_count += 1
-                
-            except Exception:
-                failed_ids.append(enrollment_id)
-        
-        mysql.connection.commit()
-        cursor.close()
-        
-        return jsonify({
-            'message': f'Approved {success_count} enrollments',
-            'success_count': success_count,
-            'failed_ids': failed_ids
-        }), 200
+        result = Enrollment.bulk_approve(enrollment_ids, teacher_id, teacher_id=teacher_id)
+        return jsonify(Enrollment.bulk_approve_summary(result)), 200
         
     except Exception as e:
         print(f"Error bulk approving enrollments: {e}")
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import teacher_required
 from utils.file_handler import save_file, delete_file
+from models.section_counter import SectionCounter
 import os
 
 teacher_materials_bp = Blueprint('teacher_materials', __name__)
@@ -103,9 +104,10 @@ def upload_material():
             title, description, material_type, url, file_path,
             section_id, teacher_id, week, topic
         ))
+        material_id = cursor.lastrowid
+        SectionCounter.bump(cursor, section_id, materials=1)
         
         mysql.connection.commit()
-        material_id = cursor.lastrowid
         cursor.close()
         
         return jsonify({
@@ -145,6 +147,7 @@ def delete_material(material_id):
             delete_file(material['file_path'])
         
         cursor.execute("DELETE FROM materials WHERE id = %s", (material_id,))
+        SectionCounter.bump(cursor, material['section_id'], materials=-1)
         mysql.connection.commit()
         cursor.close()
         
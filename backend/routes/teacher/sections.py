@@ -34,14 +34,15 @@ def get_my_sections():
                 c.id as course_id,
                 c.name as course_name,
                 c.code as course_code,
-                (SELECT COUNT(*) FROM enrollments e WHERE e.section_id = s.id AND e.status = 'approved') as student_count,
-                (SELECT COUNT(*) FROM assignments a WHERE a.section_id = s.id) as assignment_count,
-                (SELECT COUNT(*) FROM materials m WHERE m.section_id = s.id) as material_count,
-                (SELECT COUNT(*) FROM zoom_meetings zm WHERE zm.section_id = s.id AND zm.meeting_date >= CURDATE()) as upcoming_meetings
+                s.enrolled_count as student_count,
+                COALESCE(sc.assignment_count, 0) as assignment_count,
+                COALESCE(sc.material_count, 0) as material_count,
+                COALESCE(sc.upcoming_meetings, 0) as upcoming_meetings
             FROM teacher_assignments ta
             JOIN sections s ON ta.section_id = s.id
             JOIN subjects sub ON s.subject_id = sub.id
             JOIN courses c ON sub.course_id = c.id
+            LEFT JOIN section_counters sc ON sc.section_id = s.id
             WHERE ta.teacher_id = %s
         """
         params = [teacher_id]
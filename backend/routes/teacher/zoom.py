@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import mysql
 from utils.decorators import teacher_required
+from models.section_counter import SectionCounter
 from datetime import datetime
 
 teacher_zoom_bp = Blueprint('teacher_zoom', __name__)
@@ -54,9 +55,10 @@ def create_meeting():
             data.get('meeting_id'),
             data.get('password')
         ))
+        meeting_id = cursor.lastrowid
+        SectionCounter.bump_meeting(cursor, data['section_id'], data['meeting_date'], 1)
         
         mysql.connection.commit()
-        meeting_id = cursor.lastrowid
         cursor.close()
         
         return jsonify({
@@ -186,11 +188,13 @@ def update_meeting(meeting_id):
         
         # Verify teacher owns the meeting
         cursor.execute("""
-            SELECT id FROM zoom_meetings 
+            SELECT id, section_id, meeting_date FROM zoom_meetings 
             WHERE id = %s AND teacher_id = %s
+            FOR UPDATE
         """, (meeting_id, teacher_id))
         
-        if not cursor.fetchone():
+        meeting = cursor.fetchone()
+        if not meeting:
             cursor.close()
             return jsonify({'error': 'Meeting not found or unauthorized'}), 404
         
@@ -210,6 +214,9 @@ def update_meeting(meeting_id):
             query = f"UPDATE zoom_meetings SET {', '.join(update_fields)} WHERE id = %s"
             values.append(meeting_id)
             cursor.execute(query, tuple(values))
+            if 'meeting_date' in data:
+                SectionCounter.bump_meeting(cursor, meeting['section_id'], meeting['meeting_date'], -1)
+                SectionCounter.bump_meeting(cursor, meeting['section_id'], data['meeting_date'], 1)
             mysql.connection.commit()
         
         cursor.close()
@@ -274,12 +281,19 @@ def delete_meeting(meeting_id):
         
         cursor = mysql.connection.cursor()
         cursor.execute("""
-            DELETE FROM zoom_meetings 
+            SELECT section_id, meeting_date FROM zoom_meetings 
             WHERE id = %s AND teacher_id = %s
+            FOR UPDATE
         """, (meeting_id, teacher_id))
+        meeting = cursor.fetchone()
+        
+        affected = 0
+        if meeting:
+            cursor.execute("DELETE FROM zoom_meetings WHERE id = %s", (meeting_id,))
+            affected = cursor.rowcount
+            SectionCounter.bump_meeting(cursor, meeting['section_id'], meeting['meeting_date'], -1)
         
         mysql.connection.commit()
-        affected = cursor.rowcount
         cursor.close()
         
         if affected:
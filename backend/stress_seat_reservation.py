@@ -0,0 +1,123 @@
+"""Concurrency stress test for seat reservation.
+
+Seats a throwaway section with CAPACITY seats and STUDENTS pending requests,
+then lets THREADS workers approve them at the same time, mixing single
+approvals and overlapping bulk approvals. Afterwards it checks that the section
+never went over capacity and that enrolled_count matches the approved rows,
+then deletes everything it created. Run against a development database only:
+
+    python stress_seat_reservation.py [capacity students threads rounds]
+"""
+import random
+import sys
+import threading
+import uuid
+
+from app import app
+from utils.database import mysql
+from models.enrollment import Enrollment
+
+args = [int(n) for n in sys.argv[1:]]
+CAPACITY, STUDENTS, THREADS, ROUNDS = (args + [20, 120, 8, 5][len(args):])[:4]
+
+
+def seed(cursor, tag):
+    cursor.execute("""
+        INSERT INTO courses (name, code, description)
+        VALUES (%s, %s, 'seat stress test')
+    """, (f'Stress {tag}', f'S{tag[:8]}'))
+    course_id = cursor.lastrowid
+    cursor.execute("""
+        INSERT INTO subjects (course_id, code, name)
+        VALUES (%s, %s, 'Stress Subject')
+    """, (course_id, f'SS{tag[:6]}'))
+    subject_id = cursor.lastrowid
+    cursor.execute("""
+        INSERT INTO sections (subject_id, name, academic_year, semester, capacity)
+        VALUES (%s, 'Z', 'stress', 'stress', %s)
+    """, (subject_id, CAPACITY))
+    section_id = cursor.lastrowid
+
+    cursor.executemany("""
+        INSERT INTO users (email, password, name, role, email_verified)
+        VALUES (%s, 'x', 'Stress Student', 'student', TRUE)
+    """, [(f'stress-{tag}-{i}@stress.invalid',) for i in range(STUDENTS)])
+    cursor.execute("SELECT id FROM users WHERE email LIKE %s", (f'stress-{tag}-%',))
+    student_ids = [row['id'] for row in cursor.fetchall()]
+
+    cursor.executemany("""
+        INSERT INTO enrollments (student_id, section_id, status)
+        VALUES (%s, %s, 'pending')
+    """, [(sid, section_id) for sid in student_ids])
+    cursor.execute("SELECT id FROM enrollments WHERE section_id = %s", (section_id,))
+    enrollment_ids = [row['id'] for row in cursor.fetchall()]
+    mysql.connection.commit()
+    return course_id, section_id, enrollment_ids
+
+
+def worker(enrollment_ids, outcomes, errors):
+    """Each thread has its own app context, hence its own pooled connection"""
+    with app.app_context():
+        rng = random.Random()
+        try:
+            for _ in range(ROUNDS):
+                if rng.random() < 0.5:
+                    for enrollment_id in rng.sample(enrollment_ids, 10):
+                        outcomes.append(Enrollment.approve(enrollment_id, None))
+                else:
+                    result = Enrollment.bulk_approve(rng.sample(enrollment_ids, 25), None)
+                    outcomes.extend(['approved'] * len(result['approved']))
+                    outcomes.extend(['full'] * len(result['full']))
+        except Exception as e:
+            errors.append(e)
+
+
+def check(cursor, section_id):
+    cursor.execute("SELECT capacity, enrolled_count FROM sections WHERE id = %s", (section_id,))
+    section = cursor.fetchone()
+    cursor.execute("""
+        SELECT COUNT(*) as approved FROM enrollments
+        WHERE section_id = %s AND status = 'approved'
+    """, (section_id,))
+    approved = cursor.fetchone()['approved']
+    return section['capacity'], section['enrolled_count'], approved
+
+
+def cleanup(cursor, course_id, tag):
+    cursor.execute("DELETE FROM users WHERE email LIKE %s", (f'stress-{tag}-%',))
+    cursor.execute("DELETE FROM courses WHERE id = %s", (course_id,))
+    mysql.connection.commit()
+
+
+with app.app_context():
+    print("=" * 60)
+    print("🔒 SEAT RESERVATION STRESS TEST")
+    print("=" * 60)
+    print(f"capacity={CAPACITY} students={STUDENTS} threads={THREADS} rounds={ROUNDS}")
+
+    tag = uuid.uuid4().hex[:12]
+    cursor = mysql.connection.cursor()
+    course_id, section_id, enrollment_ids = seed(cursor, tag)
+    try:
+        outcomes, errors = [], []
+        threads = [
+            threading.Thread(target=worker, args=(enrollment_ids, outcomes, errors))
+            for _ in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        capacity, enrolled_count, approved = check(cursor, section_id)
+        print(f"approvals won: {outcomes.count('approved')}, refused as full: {outcomes.count('full')}")
+        print(f"enrolled_count={enrolled_count} approved rows={approved} capacity={capacity}")
+
+        assert not errors, errors
+        assert enrolled_count <= capacity, "section over capacity"
+        assert enrolled_count == approved, "enrolled_count drifted from approved rows"
+        assert outcomes.count('approved') == approved, "an approval was reported twice or lost"
+        print("✅ No section exceeded capacity")
+    finally:
+        cleanup(cursor, course_id, tag)
+        cursor.close()
@@ -0,0 +1,182 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+from utils.database import mysql
+from utils.logger import get_logger
+
+log = get_logger('catalog')
+
+
+class CatalogCache:
+    """In-process cache of serialized catalog responses, keyed by catalog version.
+
+    Admin writes to courses, subjects, sections and teacher assignments call
+    bump(), which increments the single row of `catalog_versions`. Each worker
+    reads that row at most once per CATALOG_VERSION_CHECK_SECONDS and drops its
+    entries when the number moves, so writes on one worker reach the others
+    within that window. Entries also expire after CATALOG_CACHE_MAX_AGE_SECONDS
+    to bound staleness from writes that do not bump (e.g. a teacher renaming
+    themselves). Bodies are stored as JSON bytes with a content-hash ETag, so a
+    hit is a dict lookup and a revalidation is a 304. Keys include request
+    parameters of public endpoints, so at most CATALOG_CACHE_MAX_ENTRIES are
+    kept, least recently used first out.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._entries_lock = threading.Lock()
+        self._version = None
+        self._checked_at = None
+        self._sync_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._warmers = []
+        self._seats = (None, 0.0)
+
+    # ============ VERSION ============
+
+    def _read_version(self):
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("SELECT version FROM catalog_versions WHERE id = 1")
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return row['version'] if row else 0
+
+    def _maybe_sync(self):
+        interval = current_app.config.get('CATALOG_VERSION_CHECK_SECONDS', 2)
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < interval:
+            return
+        # Only one thread checks; the rest keep serving the current entries
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = now
+            version = self._read_version()
+            if version != self._version:
+                self._entries = OrderedDict()
+                self._version = version
+        except Exception as e:
+            log.warning('catalog.version_check_failed', error=str(e))
+        finally:
+            self._sync_lock.release()
+
+    def bump(self):
+        """Invalidate every worker's catalog cache; call after a catalog write commits"""
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO catalog_versions (id, version) VALUES (1, 1)
+                ON DUPLICATE KEY UPDATE version = version + 1
+            """)
+            mysql.connection.commit()
+        finally:
+            cursor.close()
+        # This worker sees its own write immediately
+        self._entries = OrderedDict()
+        self._checked_at = None
+
+    # ============ ENTRIES ============
+
+    def _lookup(self, key, max_age):
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= max_age:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key, entry):
+        max_entries = current_app.config.get('CATALOG_CACHE_MAX_ENTRIES', 1000)
+        with self._entries_lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key, loader):
+        """(body bytes, etag) for `key`, calling loader() -> dict on a miss"""
+        self._maybe_sync()
+        max_age = current_app.config.get('CATALOG_CACHE_MAX_AGE_SECONDS', 300)
+        entry = self._lookup(key, max_age)
+        if entry:
+            return entry[1], entry[2]
+
+        with self._load_lock:
+            entry = self._lookup(key, max_age)
+            if entry:
+                return entry[1], entry[2]
+            body = current_app.json.dumps(loader()).encode()
+            etag = hashlib.md5(body).hexdigest()[:20]
+            self._store(key, (time.monotonic(), body, etag))
+            return body, etag
+
+    def data(self, key, loader):
+        """Cached value itself, for endpoints that post-process it per request"""
+        self._maybe_sync()
+        max_age = current_app.config.get('CATALOG_CACHE_MAX_AGE_SECONDS', 300)
+        entry = self._lookup(key, max_age)
+        if entry:
+            return entry[1]
+        with self._load_lock:
+            entry = self._lookup(key, max_age)
+            if entry:
+                return entry[1]
+            value = loader()
+            self._store(key, (time.monotonic(), value, None))
+            return value
+
+    def seats(self):
+        """{section_id: (capacity, enrolled_count)} for active sections, refreshed every CATALOG_SEATS_TTL_SECONDS"""
+        ttl = current_app.config.get('CATALOG_SEATS_TTL_SECONDS', 1)
+        seats, loaded_at = self._seats
+        if seats is not None and time.monotonic() - loaded_at < ttl:
+            return seats
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("SELECT id, capacity, enrolled_count FROM sections WHERE is_active = TRUE")
+            seats = {row['id']: (row['capacity'], row['enrolled_count']) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+        self._seats = (seats, time.monotonic())
+        return seats
+
+    # ============ WARM-UP ============
+
+    def warmer(self, func):
+        """Register a function that fills common entries (called by warm())"""
+        self._warmers.append(func)
+        return func
+
+    def warm(self, app):
+        """Fill the registered entries at startup so the first readers hit the cache"""
+        with app.app_context():
+            for func in self._warmers:
+                try:
+                    func()
+                except Exception as e:
+                    log.warning('catalog.warm_failed', warmer=func.__name__, error=str(e))
+                    continue
+
+
+catalog = CatalogCache()
+
+
+def catalog_response(body, etag):
+    """JSON response carrying the ETag; 304 when the client already has it"""
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+def json_response_with_etag(data):
+    """For per-request bodies: ETag from the content so unchanged results revalidate as 304"""
+    body = current_app.json.dumps(data).encode()
+    return catalog_response(body, hashlib.md5(body).hexdigest()[:20])
@@ -1,4 +1,318 @@
-from flask_mysqldb import MySQL
+import os
+import threading
+import time
+from collections import deque
+
+import MySQLdb
+from MySQLdb import cursors
+from flask import g, has_app_context
+
+from utils.query_stats import instrument
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes free before the checkout timeout"""
+
+
+# ============ CONNECTION POOL ============
+
+class ConnectionPool:
+    """Thread-safe pool of MySQLdb connections with idle eviction and checkout metrics"""
+
+    def __init__(self, connect_kwargs, min_size=2, max_size=10, timeout=10,
+                 idle_timeout=300, ping_interval=30):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.connect_kwargs = connect_kwargs
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+
+        # Idle connections as (conn, returned_at). Checkout pops from the right (LIFO)
+        # so hot connections are reused and cold ones age out from the left.
+        self._idle = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_total_ms': 0.0,
+            'wait_time_max_ms': 0.0,
+            'timeouts': 0,
+            'created': 0,
+            'closed': 0,
+            'evicted': 0,
+            'ping_failures': 0,
+        }
+
+    def _connect(self):
+        conn = MySQLdb.connect(**self.connect_kwargs)
+        with self._cond:
+            self._stats['created'] += 1
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats['closed'] += 1
+
+    def _forget(self):
+        """Give back a slot reserved for a connection that could not be opened"""
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _evict_idle_locked(self):
+        """Pop connections idle longer than idle_timeout, keeping min_size open"""
+        expired = []
+        if self.idle_timeout is None:
+            return expired
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size:
+            conn, returned_at = self._idle[0]
+            if now - returned_at < self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._stats['evicted'] += 1
+            expired.append(conn)
+        return expired
+
+    def fill(self):
+        """Open connections until the pool holds min_size"""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                self._forget()
+                raise
+            with self._cond:
+                self._idle.appendleft((conn, time.monotonic()))
+                self._cond.notify()
+
+    def acquire(self):
+        """Check out a live connection, waiting up to `timeout` seconds for one to free up"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        conn = None
+        returned_at = None
+        expired = []
+
+        with self._cond:
+            while True:
+                expired.extend(self._evict_idle_locked())
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool max_size={self.max_size})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+        for stale in expired:
+            self._close(stale)
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif self.ping_interval is not None and time.monotonic() - returned_at >= self.ping_interval:
+                conn = self._revive(conn)
+        except Exception:
+            self._forget()
+            raise
+
+        wait_ms = (time.monotonic() - started) * 1000
+        with self._cond:
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+            self._stats['wait_time_total_ms'] += wait_ms
+            self._stats['wait_time_max_ms'] = max(self._stats['wait_time_max_ms'], wait_ms)
+        return conn
+
+    def _revive(self, conn):
+        """Ping an idle connection and transparently replace it if the server dropped it"""
+        try:
+            conn.ping()
+            return conn
+        except MySQLdb.Error:
+            with self._cond:
+                self._stats['ping_failures'] += 1
+            self._close(conn)
+            return self._connect()
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, rolling back any open transaction"""
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard:
+            self._close(conn)
+            self._forget()
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            expired = self._evict_idle_locked()
+            self._cond.notify()
+        for stale in expired:
+            self._close(stale)
+
+    def close_all(self):
+        """Close every idle connection (in-use connections are closed on release)"""
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self):
+        """Snapshot of pool gauges and checkout counters"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            })
+        checkouts = stats['checkouts']
+        stats['wait_time_avg_ms'] = round(stats['wait_time_total_ms'] / checkouts, 3) if checkouts else 0.0
+        stats['wait_time_total_ms'] = round(stats['wait_time_total_ms'], 3)
+        stats['wait_time_max_ms'] = round(stats['wait_time_max_ms'], 3)
+        return stats
+
+
+# ============ FLASK EXTENSION ============
+
+class MySQL:
+    """Pooled replacement for flask_mysqldb.MySQL.
+
+    Keeps the `mysql.connection.cursor()` surface: each app context checks out one
+    connection on first use and hands it back to the pool at teardown.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MYSQL_HOST', 'localhost')
+        app.config.setdefault('MYSQL_USER', None)
+        app.config.setdefault('MYSQL_PASSWORD', None)
+        app.config.setdefault('MYSQL_DB', None)
+        app.config.setdefault('MYSQL_PORT', 3306)
+        app.config.setdefault('MYSQL_UNIX_SOCKET', None)
+        app.config.setdefault('MYSQL_CONNECT_TIMEOUT', 10)
+        app.config.setdefault('MYSQL_CHARSET', 'utf8')
+        app.config.setdefault('MYSQL_CURSORCLASS', None)
+        app.config.setdefault('MYSQL_AUTOCOMMIT', False)
+        app.config.setdefault('MYSQL_POOL_MIN_SIZE', 2)
+        app.config.setdefault('MYSQL_POOL_MAX_SIZE', 10)
+        app.config.setdefault('MYSQL_POOL_TIMEOUT', 10)
+        app.config.setdefault('MYSQL_POOL_IDLE_TIMEOUT', 300)
+        app.config.setdefault('MYSQL_POOL_PING_INTERVAL', 30)
+
+        self.app = app
+        app.teardown_appcontext(self.teardown)
+
+    def _connect_kwargs(self):
+        config = self.app.config
+        kwargs = {
+            'host': config['MYSQL_HOST'],
+            'port': config['MYSQL_PORT'],
+            'connect_timeout': config['MYSQL_CONNECT_TIMEOUT'],
+            'charset': config['MYSQL_CHARSET'],
+            'use_unicode': True,
+            'autocommit': config['MYSQL_AUTOCOMMIT'],
+        }
+        if config['MYSQL_USER']:
+            kwargs['user'] = config['MYSQL_USER']
+        if config['MYSQL_PASSWORD']:
+            kwargs['passwd'] = config['MYSQL_PASSWORD']
+        if config['MYSQL_DB']:
+            kwargs['db'] = config['MYSQL_DB']
+        if config['MYSQL_UNIX_SOCKET']:
+            kwargs['unix_socket'] = config['MYSQL_UNIX_SOCKET']
+        if config['MYSQL_CURSORCLASS']:
+            kwargs['cursorclass'] = getattr(cursors, config['MYSQL_CURSORCLASS'])
+        return kwargs
+
+    @property
+    def pool(self):
+        """Per-process pool, created lazily so forked workers never share sockets"""
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            with self._lock:
+                if self._pool is None or self._pool_pid != pid:
+                    config = self.app.config
+                    pool = ConnectionPool(
+                        self._connect_kwargs(),
+                        min_size=config['MYSQL_POOL_MIN_SIZE'],
+                        max_size=config['MYSQL_POOL_MAX_SIZE'],
+                        timeout=config['MYSQL_POOL_TIMEOUT'],
+                        idle_timeout=config['MYSQL_POOL_IDLE_TIMEOUT'],
+                        ping_interval=config['MYSQL_POOL_PING_INTERVAL'],
+                    )
+                    pool.fill()
+                    self._pool = pool
+                    self._pool_pid = pid
+        return self._pool
+
+    @property
+    def connection(self):
+        """Connection bound to the current app context"""
+        if not has_app_context():
+            return None
+        conn = g.get('_mysql_handle')
+        if conn is None:
+            raw = self.pool.acquire()
+            g._mysql_conn = raw
+            conn = raw
+            if self.app.config.get('SQL_INSTRUMENTATION'):
+                conn = instrument(raw, self.app.config)
+            g._mysql_handle = conn
+        return conn
+
+    def teardown(self, exception):
+        g.pop('_mysql_handle', None)
+        conn = g.pop('_mysql_conn', None)
+        if conn is not None:
+            self.pool.release(conn)
+
+    def pool_stats(self):
+        """Pool metrics for this process, or None before the first checkout"""
+        if self._pool is None or self._pool_pid != os.getpid():
+            return None
+        return self._pool.stats()
+
 
 # MySQL extension instance
 mysql = MySQL()
@@ -22,4 +336,4 @@ def test_connection(app):
 def init_db(app):
     """Initialize database with app"""
     mysql.init_app(app)
-    print("✅ MySQL initialized")
\ No newline at end of file
+    print(f"✅ MySQL initialized (pool {app.config['MYSQL_POOL_MIN_SIZE']}-{app.config['MYSQL_POOL_MAX_SIZE']} connections)")
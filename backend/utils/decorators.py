@@ -1,7 +1,16 @@
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
+from flask_jwt_extended import get_jwt_identity, get_jwt
 from utils.database import mysql
+from utils.role_versions import role_versions
+
+def _role_from_db(user_id):
+    """Fallback for tokens issued before the role claim existed"""
+    cursor = mysql.connection.cursor()
+    cursor.execute("SELECT role FROM users WHERE id = %s", (user_id,))
+    user = cursor.fetchone()
+    cursor.close()
+    return user['role'] if user else None
 
 def role_required(allowed_roles):
     """Decorator to restrict access based on user role"""
@@ -15,17 +24,20 @@ def role_required(allowed_roles):
                 if not current_user_id:
                     return jsonify({'error': 'Authentication required'}), 401
                 
-                # Get user role from database
-                cursor = mysql.connection.cursor()
-                cursor.execute("SELECT role FROM users WHERE id = %s", (current_user_id,))
-                user = cursor.fetchone()
-                cursor.close()
+                # Role comes from the token claim set at login/refresh
+                claims = get_jwt()
+                role = claims.get('role')
                 
-                if not user:
-                    return jsonify({'error': 'User not found'}), 404
+                if role is None:
+                    role = _role_from_db(current_user_id)
+                    if role is None:
+                        return jsonify({'error': 'User not found'}), 404
+                elif role_versions.is_stale(current_user_id, claims.get('iat', 0)):
+                    # Role changed or account deleted after this token was issued
+                    return jsonify({'error': 'Session expired. Please log in again.'}), 401
                 
                 # Check if user role is allowed
-                if user['role'] not in allowed_roles:
+                if role not in allowed_roles:
                     return jsonify({'error': 'Access denied. Insufficient permissions.'}), 403
                 
                 return f(*args, **kwargs)
@@ -3,6 +3,10 @@ import uuid
 from werkzeug.utils import secure_filename
 from flask import current_app
 from datetime import datetime
+from utils.logger import get_logger
+from utils.metrics import record_upload
+
+log = get_logger('uploads')
 
 # Default allowed extensions
 ALLOWED_EXTENSIONS = {
@@ -50,12 +54,9 @@ def save_file(file, subfolder='', allowed_extensions=None):
         if not file or not file.filename:
             return None
         
-        print(f"📁 Saving file: {file.filename}")
-        print(f"📂 Subfolder: {subfolder}")
-        
         # Check file extension
         if not allowed_file(file.filename, allowed_extensions):
-            print(f"❌ File type not allowed: {file.filename}")
+            log.info('upload.rejected', filename=file.filename, subfolder=subfolder)
             raise ValueError(f"File type not allowed")
         
         # Secure filename and add unique ID
@@ -71,7 +72,6 @@ def save_file(file, subfolder='', allowed_extensions=None):
         # Save file
         file_path = os.path.join(upload_path, unique_filename)
         file.save(file_path)
-        print(f"✅ File saved to: {file_path}")
         
         # Return DICTIONARY with file info (NOT a string!)
         relative_path = os.path.join(subfolder, today, unique_filename).replace('\\', '/')
@@ -83,13 +83,12 @@ def save_file(file, subfolder='', allowed_extensions=None):
             'file_type': ext[1:].lower() if ext else 'unknown'
         }
         
-        print(f"📦 File info: {file_info}")
+        record_upload(subfolder, file_info['file_size'])
+        log.debug('upload.saved', path=relative_path, size=file_info['file_size'])
         return file_info
         
     except Exception as e:
-        print(f"❌ Error saving file: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception('upload.failed', filename=file.filename if file else None)
         raise e
 
 def delete_file(file_path):
@@ -98,10 +97,10 @@ def delete_file(file_path):
         full_path = os.path.join(current_app.config['UPLOAD_FOLDER'], file_path)
         if os.path.exists(full_path):
             os.remove(full_path)
-            print(f"✅ File deleted: {full_path}")
+            log.debug('upload.deleted', path=file_path)
             return True
     except Exception as e:
-        print(f"❌ Error deleting file: {e}")
+        log.warning('upload.delete_failed', path=file_path, error=str(e))
     return False
 
 def get_file_url(file_path):
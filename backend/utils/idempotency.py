@@ -0,0 +1,174 @@
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from utils.database import mysql
+from utils.logger import get_logger
+
+log = get_logger('idempotency')
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+POLL_SECONDS = 0.2
+
+
+class IdempotencyStore:
+    """Responses keyed by (user, endpoint, Idempotency-Key) in `idempotency_keys`.
+
+    The row is claimed with INSERT ... ON DUPLICATE KEY UPDATE before the view
+    runs, so a duplicate on any worker finds it and waits for the first
+    request's response instead of running the view again. A claim holds a lease
+    of IDEMPOTENCY_LEASE_SECONDS: if its worker dies, the next retry takes the
+    row over. Rows expire after IDEMPOTENCY_TTL_SECONDS and are purged by a
+    periodic job.
+    """
+
+    @staticmethod
+    def claim(key, fingerprint, ttl, lease):
+        """Return (row, owner token or None); the caller runs the request when it gets a token.
+
+        `locked_by` is assigned first and the other columns are only overwritten
+        when it now holds our token, i.e. when the row is new, expired, or was
+        left pending by a request whose lease ran out. Waiting duplicates call
+        it again every POLL_SECONDS.
+        """
+        token = uuid.uuid4().hex
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO idempotency_keys
+                    (key_hash, fingerprint, state, locked_by, locked_until, expires_at)
+                VALUES (%s, %s, 'pending', %s, NOW() + INTERVAL %s SECOND, NOW() + INTERVAL %s SECOND)
+                ON DUPLICATE KEY UPDATE
+                    locked_by = IF(expires_at <= NOW() OR (state = 'pending' AND locked_until <= NOW()),
+                                   VALUES(locked_by), locked_by),
+                    fingerprint = IF(locked_by = VALUES(locked_by), VALUES(fingerprint), fingerprint),
+                    state = IF(locked_by = VALUES(locked_by), 'pending', state),
+                    status_code = IF(locked_by = VALUES(locked_by), NULL, status_code),
+                    body = IF(locked_by = VALUES(locked_by), NULL, body),
+                    mimetype = IF(locked_by = VALUES(locked_by), NULL, mimetype),
+                    locked_until = IF(locked_by = VALUES(locked_by), VALUES(locked_until), locked_until),
+                    expires_at = IF(locked_by = VALUES(locked_by), VALUES(expires_at), expires_at)
+            """, (key, fingerprint, token, lease, ttl))
+            mysql.connection.commit()
+            cursor.execute("""
+                SELECT fingerprint, state, status_code, body, mimetype, locked_by
+                FROM idempotency_keys
+                WHERE key_hash = %s
+            """, (key,))
+            row = cursor.fetchone()
+            # End the read so the next poll sees the leader's commit
+            mysql.connection.commit()
+        finally:
+            cursor.close()
+        return row, (token if row and row['locked_by'] == token else None)
+
+    @staticmethod
+    def complete(key, token, response):
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("""
+                UPDATE idempotency_keys
+                SET state = 'done', status_code = %s, body = %s, mimetype = %s, locked_until = NULL
+                WHERE key_hash = %s AND locked_by = %s
+            """, (response.status_code, response.get_data(), response.mimetype, key, token))
+            mysql.connection.commit()
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def release(key, token):
+        """Forget a failed attempt so the client's retry runs again"""
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("DELETE FROM idempotency_keys WHERE key_hash = %s AND locked_by = %s", (key, token))
+            mysql.connection.commit()
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def purge(limit=10000):
+        """Delete expired keys (periodic job)"""
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("DELETE FROM idempotency_keys WHERE expires_at < NOW() LIMIT %s", (limit,))
+            mysql.connection.commit()
+        finally:
+            cursor.close()
+
+
+store = IdempotencyStore()
+
+
+def _digest(*parts):
+    return hashlib.sha256('\0'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _fingerprint():
+    """Method, path and a digest of the body, so a reused key with other content is refused"""
+    digest = hashlib.sha256()
+    if request.mimetype == 'multipart/form-data':
+        # Form fields plus each upload's bytes, read in chunks and rewound for the view
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"{name}={value}\0".encode())
+        for name, upload in sorted(request.files.items(multi=True), key=lambda item: (item[0], item[1].filename or '')):
+            digest.update(f"{name}:{upload.filename}\0".encode())
+            for chunk in iter(lambda: upload.stream.read(65536), b''):
+                digest.update(chunk)
+            upload.stream.seek(0)
+    else:
+        digest.update(request.get_data(cache=True))
+    return (request.method, request.path, digest.hexdigest())
+
+
+def idempotent(f):
+    """Replay the stored response for a repeated Idempotency-Key.
+
+    Requests without the header are unaffected. Apply below @jwt_required so
+    keys are scoped to the caller. 5xx responses and exceptions are not stored.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        client_key = request.headers.get(HEADER)
+        if not client_key or not current_app.config.get('IDEMPOTENCY_ENABLED', True):
+            return f(*args, **kwargs)
+        if len(client_key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+        config = current_app.config
+        key = _digest(get_jwt_identity(), request.endpoint, client_key)
+        fingerprint = _digest(*_fingerprint())
+        ttl = config.get('IDEMPOTENCY_TTL_SECONDS', 86400)
+        lease = config.get('IDEMPOTENCY_LEASE_SECONDS', 60)
+        deadline = time.monotonic() + config.get('IDEMPOTENCY_WAIT_SECONDS', 30)
+
+        # A waiter whose leader failed retries the claim and may become the leader
+        row, token = store.claim(key, fingerprint, ttl, lease)
+        while token is None:
+            if row and row['fingerprint'] != fingerprint:
+                return jsonify({'error': f'{HEADER} was already used for a different request'}), 422
+            if row and row['state'] == 'done':
+                log.debug('idempotency.replayed', endpoint=request.endpoint)
+                response = current_app.response_class(row['body'], status=row['status_code'], mimetype=row['mimetype'])
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response
+            if time.monotonic() >= deadline:
+                return jsonify({'error': 'A request with this Idempotency-Key is still in progress'}), 409
+            time.sleep(POLL_SECONDS)
+            row, token = store.claim(key, fingerprint, ttl, lease)
+
+        try:
+            response = current_app.make_response(f(*args, **kwargs))
+        except Exception:
+            store.release(key, token)
+            raise
+        if response.status_code >= 500:
+            store.release(key, token)
+        else:
+            store.complete(key, token, response)
+        return response
+
+    return decorated_function
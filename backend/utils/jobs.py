@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+from utils.database import mysql
+from utils.logger import get_logger
+
+log = get_logger('jobs')
+
+# name -> (interval seconds, callable)
+_jobs = {}
+_started_pid = None
+_start_lock = threading.Lock()
+
+
+def register_periodic_job(name, interval, func):
+    """Run func() inside an app context every `interval` seconds (0 or None disables)"""
+    if interval and interval > 0:
+        _jobs[name] = (interval, func)
+
+
+@contextmanager
+def single_runner(name):
+    """Hold a server-wide named lock (GET_LOCK) for the block.
+
+    Periodic jobs start in every worker process; wrapping a run in this makes
+    one of them do the work while the others skip it. Yields True when this
+    connection got the lock. MySQL releases it if the process dies.
+    """
+    lock_name = f"{current_app.config.get('MYSQL_DB') or 'app'}.job.{name}"
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0) as acquired", (lock_name,))
+        acquired = cursor.fetchone()['acquired'] == 1
+    finally:
+        cursor.close()
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cursor = mysql.connection.cursor()
+            try:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (lock_name,))
+            finally:
+                cursor.close()
+
+
+def _run_forever(app, name, interval, func):
+    while True:
+        time.sleep(interval)
+        try:
+            with app.app_context():
+                func()
+        except Exception:
+            log.exception('jobs.failed', job=name)
+
+
+def _start_jobs(app):
+    """Start one daemon thread per job in this process"""
+    global _started_pid
+    pid = os.getpid()
+    if _started_pid == pid:
+        return
+    with _start_lock:
+        if _started_pid == pid:
+            return
+        _started_pid = pid
+        for name, (interval, func) in _jobs.items():
+            thread = threading.Thread(
+                target=_run_forever,
+                args=(app, name, interval, func),
+                name=f"job-{name}",
+                daemon=True
+            )
+            thread.start()
+
+
+def init_jobs(app):
+    """Start registered jobs lazily on the first request of each worker process.
+
+    Starting from a request (rather than create_app) means pre-forking servers
+    run the jobs in every worker instead of only in the master that imported the app.
+    """
+    app.config.setdefault('BACKGROUND_JOBS_ENABLED', True)
+    if not app.config['BACKGROUND_JOBS_ENABLED']:
+        return
+
+    @app.before_request
+    def ensure_jobs_started():
+        _start_jobs(app)
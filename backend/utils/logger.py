@@ -0,0 +1,151 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+ROOT_LOGGER = 'college_app'
+
+# Handlers that do real I/O run on listener threads, never on a request thread
+_listeners = []
+
+
+class StructuredFormatter(logging.Formatter):
+    """`time level logger event key=value ...` or one JSON object per line"""
+
+    def __init__(self, as_json=False):
+        super().__init__()
+        self.as_json = as_json
+
+    def format(self, record):
+        fields = getattr(record, 'fields', None) or {}
+        timestamp = datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds')
+        if self.as_json:
+            entry = {'ts': timestamp, 'level': record.levelname, 'logger': record.name, 'event': record.getMessage()}
+            entry.update(fields)
+            if record.exc_text:
+                entry['exc'] = record.exc_text
+            return json.dumps(entry, default=str)
+
+        line = f"{timestamp} {record.levelname:<7} {record.name} {record.getMessage()}"
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value!r}" if isinstance(value, str) and ' ' in value else f"{key}={value}"
+                                   for key, value in fields.items())
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+
+class _PreparedQueueHandler(QueueHandler):
+    """Resolves message args and tracebacks on the caller's thread, keeps `fields` intact"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class EventLogger:
+    """Logger for named events with keyword fields.
+
+    Fields are only formatted when the level is enabled, so a disabled
+    `log.debug('row', **row)` costs one level check. `sample=0.01` keeps
+    roughly 1% of a high-volume event.
+    """
+
+    def __init__(self, name):
+        self._logger = logging.getLogger(name)
+
+    def _log(self, level, event, fields, sample=None, exc_info=None):
+        if not self._logger.isEnabledFor(level):
+            return
+        if sample is not None and random.random() >= sample:
+            return
+        if sample is not None:
+            fields['sample'] = sample
+        self._logger.log(level, event, extra={'fields': fields}, exc_info=exc_info, stacklevel=3)
+
+    def enabled(self, level=logging.DEBUG):
+        return self._logger.isEnabledFor(level)
+
+    def debug(self, event, sample=None, **fields):
+        self._log(logging.DEBUG, event, fields, sample)
+
+    def info(self, event, sample=None, **fields):
+        self._log(logging.INFO, event, fields, sample)
+
+    def warning(self, event, sample=None, **fields):
+        self._log(logging.WARNING, event, fields, sample)
+
+    def error(self, event, **fields):
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        """Error with the current traceback attached"""
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+
+def get_logger(name):
+    """EventLogger under the app's logger tree, e.g. get_logger('notifications')"""
+    if not name.startswith(ROOT_LOGGER):
+        name = f"{ROOT_LOGGER}.{name}"
+    return EventLogger(name)
+
+
+def add_async_handler(logger, *handlers):
+    """Attach handlers to `logger` behind a queue so emitting never blocks on I/O.
+
+    Returns the QueueHandler, which can be attached to further loggers that
+    should share the same destinations.
+    """
+    log_queue = queue.SimpleQueue()
+    queue_handler = _PreparedQueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return queue_handler
+
+
+@atexit.register
+def _flush_listeners():
+    for listener in _listeners:
+        listener.stop()
+
+
+def init_logging(app):
+    """Route the app's loggers to stdout and LOG_FILE via a background QueueListener"""
+    app.config.setdefault('LOG_LEVEL', 'INFO')
+    app.config.setdefault('LOG_FORMAT', 'text')
+
+    root = logging.getLogger(ROOT_LOGGER)
+    if root.handlers:
+        return
+    root.setLevel(getattr(logging, str(app.config['LOG_LEVEL']).upper(), logging.INFO))
+    root.propagate = False
+
+    formatter = StructuredFormatter(as_json=app.config['LOG_FORMAT'] == 'json')
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(formatter)
+    handlers = [console]
+
+    if app.config.get('LOG_FILE'):
+        file_handler = RotatingFileHandler(
+            app.config['LOG_FILE'],
+            maxBytes=app.config.get('LOG_MAX_BYTES', 10 * 1024 * 1024),
+            backupCount=app.config.get('LOG_BACKUP_COUNT', 5)
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    queue_handler = add_async_handler(root, *handlers)
+    # Flask's own logger (unhandled exceptions) shares the same destinations
+    app.logger.addHandler(queue_handler)
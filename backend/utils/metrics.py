@@ -0,0 +1,168 @@
+import hmac
+import os
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+
+# With PROMETHEUS_MULTIPROC_DIR set, every worker writes its samples to files
+# in that directory and /metrics sums them, so any worker can answer a scrape.
+# Clear the directory when the server (not a worker) starts.
+MULTIPROCESS = bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests handled',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent handling a request',
+    ['blueprint', 'endpoint', 'method'], buckets=LATENCY_BUCKETS
+)
+IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'Requests currently being handled',
+    multiprocess_mode='livesum'
+)
+
+# Pool figures are per process; 'livesum' adds up the live workers
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', 'Pooled MySQL connections by state',
+    ['state'], multiprocess_mode='livesum'
+)
+DB_POOL_MAX = Gauge(
+    'db_pool_max_connections', 'Configured pool ceiling (summed over workers)',
+    multiprocess_mode='livesum'
+)
+DB_POOL_CHECKOUTS = Gauge(
+    'db_pool_checkouts', 'Connections handed out since the worker started',
+    multiprocess_mode='livesum'
+)
+DB_POOL_WAITS = Gauge(
+    'db_pool_waits', 'Checkouts that had to wait for a free connection',
+    multiprocess_mode='livesum'
+)
+DB_POOL_TIMEOUTS = Gauge(
+    'db_pool_timeouts', 'Checkouts that gave up waiting (503s)',
+    multiprocess_mode='livesum'
+)
+DB_POOL_WAIT_SECONDS = Gauge(
+    'db_pool_wait_seconds', 'Total time spent waiting for a connection',
+    multiprocess_mode='livesum'
+)
+
+UPLOADS = Counter('uploads_total', 'Files saved', ['folder'])
+UPLOAD_BYTES = Counter('upload_bytes_total', 'Bytes of uploaded files saved', ['folder'])
+
+
+def record_upload(folder, size):
+    """Called by save_file for every stored upload"""
+    folder = (folder or 'root').split('/')[0]
+    UPLOADS.labels(folder).inc()
+    UPLOAD_BYTES.labels(folder).inc(size or 0)
+
+
+# Drift found by the enrolled_count reconciliation job (utils/reconcile.py)
+ENROLLMENT_DRIFT_SECTIONS = Counter(
+    'enrollment_count_drift_sections_total', 'Sections whose enrolled_count was repaired', ['mode']
+)
+ENROLLMENT_DRIFT_SEATS = Counter(
+    'enrollment_count_drift_seats_total', 'Summed |enrolled_count - approved| repaired', ['mode']
+)
+ENROLLMENT_CHECKED = Counter(
+    'enrollment_count_checked_sections_total', 'Sections compared by the reconciliation job', ['mode']
+)
+
+
+def record_enrollment_drift(mode, stats):
+    """Called after each reconciliation run ('full' or 'incremental')"""
+    ENROLLMENT_CHECKED.labels(mode).inc(stats['checked'])
+    ENROLLMENT_DRIFT_SECTIONS.labels(mode).inc(stats['drifted'])
+    ENROLLMENT_DRIFT_SEATS.labels(mode).inc(stats['seats'])
+
+def _update_pool_gauges(pool_stats):
+    if not pool_stats:
+        return
+    DB_POOL_CONNECTIONS.labels('in_use').set(pool_stats['in_use'])
+    DB_POOL_CONNECTIONS.labels('idle').set(pool_stats['idle'])
+    DB_POOL_MAX.set(pool_stats['max_size'])
+    DB_POOL_CHECKOUTS.set(pool_stats['checkouts'])
+    DB_POOL_WAITS.set(pool_stats['waits'])
+    DB_POOL_TIMEOUTS.set(pool_stats['timeouts'])
+    DB_POOL_WAIT_SECONDS.set(pool_stats['wait_time_total_ms'] / 1000)
+
+
+def _scrape_allowed(config):
+    """Scrapers come from METRICS_ALLOWED_IPS or send `Authorization: Bearer <METRICS_TOKEN>`"""
+    token = config.get('METRICS_TOKEN')
+    if token:
+        header = request.headers.get('Authorization', '')
+        if header.startswith('Bearer ') and hmac.compare_digest(header[7:].encode(), token.encode()):
+            return True
+    return request.remote_addr in config.get('METRICS_ALLOWED_IPS', ())
+
+
+def init_metrics(app, pool_stats):
+    """Time every request and serve the Prometheus text format at /metrics.
+
+    Labels use the URL rule (e.g. /api/notifications/<notification_id>) rather
+    than the raw path, so label cardinality stays bounded. /metrics itself
+    answers 404 to anyone but the configured scrapers.
+    """
+    app.config.setdefault('METRICS_ENABLED', True)
+    app.config.setdefault('METRICS_TOKEN', None)
+    app.config.setdefault('METRICS_ALLOWED_IPS', ('127.0.0.1', '::1'))
+    if not app.config['METRICS_ENABLED']:
+        return
+
+    @app.before_request
+    def start_request_timer():
+        g._metrics_started = time.perf_counter()
+        IN_PROGRESS.inc()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return response
+        IN_PROGRESS.dec()
+
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        blueprint = request.blueprint or 'app'
+        LATENCY.labels(blueprint, rule, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(blueprint, rule, request.method, str(response.status_code)).inc()
+        return response
+
+    @app.teardown_request
+    def finish_request_timer(exc):
+        # after_request is skipped for unhandled exceptions; count those as 500s
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return
+        IN_PROGRESS.dec()
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        blueprint = request.blueprint or 'app'
+        LATENCY.labels(blueprint, rule, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(blueprint, rule, request.method, '500').inc()
+
+    @app.route('/metrics')
+    def metrics():
+        if not _scrape_allowed(app.config):
+            return Response('Not Found', status=404, mimetype='text/plain')
+        _update_pool_gauges(pool_stats())
+        if MULTIPROCESS:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+        return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
+    # Pool gauges also refresh as requests finish, so every worker's file stays current
+    @app.teardown_appcontext
+    def refresh_pool_gauges(exc):
+        try:
+            _update_pool_gauges(pool_stats())
+        except Exception:
+            pass
@@ -0,0 +1,289 @@
+import itertools
+import json
+import queue
+import threading
+from collections import defaultdict, deque
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from utils.database import mysql
+from utils.role_versions import role_versions
+
+
+class Subscriber:
+    """One open SSE connection"""
+
+    __slots__ = ('user_id', 'role', 'issued_at', 'queue', 'closed')
+
+    def __init__(self, user_id, role, issued_at=0, max_queue=100):
+        self.user_id = user_id
+        self.role = role
+        self.issued_at = issued_at      # iat of the access token the stream was opened with
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.closed = False
+
+
+class NotificationHub:
+    """In-process pub/sub for live notifications.
+
+    Subscribers are indexed by user and by role, so a publish touches only the
+    connections it addresses. Idle subscribers are a queue and a blocked
+    generator each, but with threaded workers each open stream holds a server
+    thread, so the stream route caps them per process
+    (NOTIFICATION_STREAM_MAX_PER_WORKER); see backend/gunicorn.conf.py.
+    Recent events are kept in a ring buffer so a reconnecting client can resume
+    from its Last-Event-ID.
+    """
+
+    def __init__(self, history=1000):
+        self._by_user = defaultdict(set)
+        self._by_role = defaultdict(set)
+        self._history = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self.relay = None
+
+    # ============ SUBSCRIPTIONS ============
+
+    def subscribe(self, user_id, role, issued_at=0):
+        sub = Subscriber(user_id, role, issued_at)
+        with self._lock:
+            self._by_user[user_id].add(sub)
+            self._by_role[role].add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._by_user[sub.user_id].discard(sub)
+            if not self._by_user[sub.user_id]:
+                del self._by_user[sub.user_id]
+            self._by_role[sub.role].discard(sub)
+            if not self._by_role[sub.role]:
+                del self._by_role[sub.role]
+
+    def close(self, sub):
+        """End a subscriber's stream; the wake-up message unblocks its generator"""
+        sub.closed = True
+        self.unsubscribe(sub)
+        try:
+            sub.queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def close_revoked(self):
+        """End streams opened with a token revoked since (role change or deleted user)"""
+        with self._lock:
+            subs = [sub for subs in self._by_user.values() for sub in subs]
+        for sub in subs:
+            if role_versions.is_stale(sub.user_id, sub.issued_at):
+                self.close(sub)
+
+    def has_subscribers(self):
+        return bool(self._by_user)
+
+    def wants_events(self):
+        """Whether publishing would reach anyone (always, with a cross-worker relay)"""
+        return self.relay is not None or self.has_subscribers()
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subs) for subs in self._by_user.values())
+
+    # ============ PUBLISHING ============
+
+    def publish(self, event, data, user_ids=None, audience=None):
+        """Send an event to specific users or to an audience ('all' or a role).
+
+        With a relay configured the event goes through the database so every
+        worker process delivers it; otherwise it is dispatched locally.
+        """
+        if self.relay is not None:
+            self.relay.publish(event, data, user_ids, audience)
+        elif self.has_subscribers():
+            self.dispatch(next(self._sequence), event, data, user_ids, audience)
+
+    def dispatch(self, event_id, event, data, user_ids=None, audience=None):
+        """Deliver to local subscribers and remember the event for replay"""
+        message = {
+            'id': event_id,
+            'event': event,
+            'data': data,
+            'user_ids': set(user_ids) if user_ids is not None else None,
+            'audience': audience,
+        }
+        with self._lock:
+            self._history.append(message)
+            targets = self._targets(message)
+
+        for sub in targets:
+            try:
+                sub.queue.put_nowait(message)
+            except queue.Full:
+                # Slow client: end its stream so EventSource reconnects and replays from Last-Event-ID
+                self.close(sub)
+
+    def _targets(self, message):
+        if message['user_ids'] is not None:
+            return [sub for uid in message['user_ids'] for sub in self._by_user.get(uid, ())]
+        if message['audience'] == 'all':
+            return [sub for subs in self._by_user.values() for sub in subs]
+        return list(self._by_role.get(message['audience'], ()))
+
+    # ============ REPLAY ============
+
+    @staticmethod
+    def addressed_to(message, user_id, role):
+        if message['user_ids'] is not None:
+            return user_id in message['user_ids']
+        return message['audience'] in ('all', role)
+
+    def replay(self, last_event_id, user_id, role):
+        """Events after last_event_id for this user, or None if the buffer no longer reaches back that far"""
+        with self._lock:
+            history = list(self._history)
+        if history and history[0]['id'] > last_event_id + 1:
+            return None
+        return [m for m in history if m['id'] > last_event_id and self.addressed_to(m, user_id, role)]
+
+
+class DatabaseRelay:
+    """Cross-worker relay: events are written to `notification_events` and each
+    worker polls for new rows and dispatches them to its own subscribers."""
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.last_id = None
+
+    def publish(self, event, data, user_ids=None, audience=None):
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO notification_events (event, payload, user_ids, audience, created_at)
+                VALUES (%s, %s, %s, %s, NOW())
+            """, (
+                event,
+                json.dumps(data, default=str),
+                json.dumps(sorted(user_ids)) if user_ids is not None else None,
+                audience
+            ))
+            mysql.connection.commit()
+        finally:
+            cursor.close()
+
+    def poll(self):
+        """Dispatch rows newer than the last one seen (one indexed range scan)"""
+        cursor = mysql.connection.cursor()
+        try:
+            if self.last_id is None:
+                # Start from the current head; older events are served from replay
+                cursor.execute("SELECT COALESCE(MAX(id), 0) as id FROM notification_events")
+                self.last_id = cursor.fetchone()['id']
+                return
+            cursor.execute("""
+                SELECT id, event, payload, user_ids, audience
+                FROM notification_events
+                WHERE id > %s
+                ORDER BY id
+                LIMIT 1000
+            """, (self.last_id,))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        for row in rows:
+            self.last_id = row['id']
+            user_ids = json.loads(row['user_ids']) if row['user_ids'] else None
+            self.hub.dispatch(row['id'], row['event'], json.loads(row['payload']), user_ids, row['audience'])
+
+    def purge(self, max_age_seconds=3600):
+        """Drop relayed events older than the replay window"""
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("""
+                DELETE FROM notification_events
+                WHERE created_at < NOW() - INTERVAL %s SECOND
+                LIMIT 10000
+            """, (max_age_seconds,))
+            mysql.connection.commit()
+        finally:
+            cursor.close()
+
+
+hub = NotificationHub()
+
+
+def init_hub(app):
+    """Enable the database relay when NOTIFICATION_RELAY = 'db'"""
+    from utils.jobs import register_periodic_job
+
+    app.config.setdefault('NOTIFICATION_RELAY', None)
+    app.config.setdefault('NOTIFICATION_RELAY_POLL_SECONDS', 1)
+    register_periodic_job('notification-stream-revoke', app.config.get('ROLE_SYNC_INTERVAL', 5), hub.close_revoked)
+    if app.config['NOTIFICATION_RELAY'] == 'db':
+        hub.relay = DatabaseRelay(hub)
+        register_periodic_job('notification-relay', app.config['NOTIFICATION_RELAY_POLL_SECONDS'], hub.relay.poll)
+        register_periodic_job('notification-relay-purge', 600, hub.relay.purge)
+
+
+# ============ STREAM TICKETS ============
+
+def _ticket_serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='notification-stream')
+
+
+def issue_stream_ticket(user_id, role, issued_at):
+    """Signed, short-lived ticket that opens one SSE stream.
+
+    EventSource cannot send headers, so the stream is authenticated by a query
+    parameter. A ticket instead of the access token keeps bearer tokens out of
+    access logs; it grants nothing but the stream and expires after
+    NOTIFICATION_STREAM_TICKET_SECONDS.
+    """
+    return _ticket_serializer().dumps({'uid': user_id, 'role': role, 'iat': issued_at})
+
+
+def read_stream_ticket(ticket):
+    """(user_id, role, issued_at) of a valid ticket, or None if it is forged or expired"""
+    try:
+        data = _ticket_serializer().loads(
+            ticket, max_age=current_app.config.get('NOTIFICATION_STREAM_TICKET_SECONDS', 60)
+        )
+    except BadSignature:
+        return None
+    return data['uid'], data['role'], data['iat']
+
+
+def format_sse(message):
+    """Serialize a hub message in text/event-stream framing"""
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message['data'], default=str)}\n\n"
+
+
+def stream_events(sub, replay, initial, heartbeat=25):
+    """Generator body for the SSE response; must not touch the DB or `g`"""
+    try:
+        yield "retry: 5000\n\n"
+        last_sent = 0
+        if replay is None:
+            # Too far behind: tell the client to refetch its feed
+            yield f"event: resync\ndata: {json.dumps(initial, default=str)}\n\n"
+        else:
+            for message in replay:
+                last_sent = message['id']
+                yield format_sse(message)
+            yield f"event: unread\ndata: {json.dumps(initial, default=str)}\n\n"
+
+        while not sub.closed:
+            try:
+                message = sub.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            if sub.closed:
+                # Dropped by dispatch() or revoked; queued events are replayed on reconnect
+                return
+            if message['id'] <= last_sent:
+                continue
+            yield format_sse(message)
+    finally:
+        hub.unsubscribe(sub)
@@ -0,0 +1,163 @@
+import logging
+import re
+import time
+from collections import Counter
+from logging.handlers import RotatingFileHandler
+
+from flask import g, has_request_context, request
+from utils.logger import add_async_handler
+
+slow_query_logger = logging.getLogger('college_app.sql')
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(sql):
+    """Normalize a statement so the same query with different parameters maps to one shape"""
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    shape = sql.replace('%s', '?')
+    shape = _STRING_LITERAL.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('(...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryStats:
+    """Statement count, DB time and repeated shapes for one request"""
+
+    def __init__(self, slow_ms=None):
+        self.slow_ms = slow_ms
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_shape = None
+        self.shapes = Counter()
+
+    def record(self, sql, elapsed_ms, rows=1):
+        shape = statement_shape(sql)
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[shape] += rows
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_shape = shape
+        if self.slow_ms is not None and elapsed_ms >= self.slow_ms:
+            endpoint = request.endpoint if has_request_context() else None
+            slow_query_logger.warning(
+                "slow query %.1fms endpoint=%s sql=%s", elapsed_ms, endpoint, shape
+            )
+
+    def repeated(self, threshold):
+        """Shapes executed more than `threshold` times, most frequent first"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+    def server_timing(self):
+        parts = [f'db;dur={self.total_ms:.2f};desc="{self.count} queries"']
+        if self.count:
+            parts.append(f'db-slowest;dur={self.slowest_ms:.2f}')
+        return ', '.join(parts)
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times execute/executemany into the request's QueryStats"""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(query, args)
+        finally:
+            self._stats.record(query, (time.perf_counter() - started) * 1000)
+
+    def executemany(self, query, args):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(query, args)
+        finally:
+            # One round trip for the batch, but keep the row count out of the N+1 tally
+            self._stats.record(query, (time.perf_counter() - started) * 1000, rows=1)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors report into the current QueryStats"""
+
+    def __init__(self, conn, stats):
+        self._conn = conn
+        self._stats = stats
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self._stats)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def instrument(conn, config):
+    """Wrap a raw connection and start collecting stats on `g`"""
+    stats = g.get('_query_stats')
+    if stats is None:
+        stats = QueryStats(slow_ms=config.get('SQL_SLOW_QUERY_MS'))
+        g._query_stats = stats
+    return InstrumentedConnection(conn, stats)
+
+
+def current_stats():
+    """QueryStats for the current request, or None if it never touched the DB"""
+    return g.get('_query_stats')
+
+
+def init_query_stats(app):
+    """Attach the slow-query log and the Server-Timing / N+1 after_request hook"""
+    app.config.setdefault('SQL_INSTRUMENTATION', True)
+    app.config.setdefault('SQL_SLOW_QUERY_MS', 200)
+    app.config.setdefault('SQL_SLOW_QUERY_LOG', 'slow_queries.log')
+    app.config.setdefault('SQL_REPEAT_THRESHOLD', 10)
+
+    if not app.config['SQL_INSTRUMENTATION']:
+        return
+
+    log_file = app.config['SQL_SLOW_QUERY_LOG']
+    if log_file and not slow_query_logger.handlers:
+        handler = RotatingFileHandler(
+            log_file,
+            maxBytes=app.config.get('LOG_MAX_BYTES', 10 * 1024 * 1024),
+            backupCount=app.config.get('LOG_BACKUP_COUNT', 5)
+        )
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        add_async_handler(slow_query_logger, handler)
+        slow_query_logger.setLevel(logging.INFO)
+
+    @app.after_request
+    def add_server_timing(response):
+        stats = current_stats()
+        if stats is None:
+            return response
+
+        response.headers.add('Server-Timing', stats.server_timing())
+        response.headers['Timing-Allow-Origin'] = '*'
+
+        threshold = app.config['SQL_REPEAT_THRESHOLD']
+        for shape, n in stats.repeated(threshold):
+            slow_query_logger.warning(
+                "repeated statement x%d endpoint=%s sql=%s", n, request.endpoint, shape
+            )
+        return response
@@ -0,0 +1,62 @@
+import threading
+
+from flask import current_app
+from utils.database import mysql
+from utils.jobs import single_runner
+from utils.logger import get_logger
+from utils.metrics import record_enrollment_drift
+from models.section import Section
+
+log = get_logger('enrollments.reconcile')
+
+# Per-process watermark: DB time at the start of the last successful run
+_state = {'since': None, 'runs': 0}
+_run_lock = threading.Lock()
+
+
+def _db_now():
+    cursor = mysql.connection.cursor()
+    cursor.execute("SELECT NOW() as now")
+    now = cursor.fetchone()['now']
+    cursor.close()
+    return now
+
+
+def reconcile_enrollment_counts(full=False):
+    """Repair sections.enrolled_count drift and record it as a metric.
+
+    Runs incrementally (sections touched since the previous run) except for the
+    first run in a process, every ENROLLMENT_RECONCILE_FULL_EVERY-th run, or
+    with full=True; a full pass also catches deletes that left no timestamp
+    behind, such as enrollments removed by a cascading user delete.
+    Returns the run's stats, or None if a run is already in progress in this
+    or another worker process.
+    """
+    config = current_app.config
+    batch_size = config.get('ENROLLMENT_RECONCILE_BATCH_SIZE', 500)
+    full_every = config.get('ENROLLMENT_RECONCILE_FULL_EVERY', 12)
+
+    if not _run_lock.acquire(blocking=False):
+        return None
+    try:
+        with single_runner('enrollment-counts') as acquired:
+            if not acquired:
+                return None
+            since = _state['since']
+            if full or since is None or (full_every and _state['runs'] % full_every == 0):
+                since = None
+            mode = 'full' if since is None else 'incremental'
+
+            started_at = _db_now()
+            stats = Section.reconcile_enrollment_counts(since=since, batch_size=batch_size)
+            _state['since'] = started_at
+            _state['runs'] += 1
+    finally:
+        _run_lock.release()
+
+    record_enrollment_drift(mode, stats)
+    if stats['drifted']:
+        log.warning('enrollments.count_drift_repaired', mode=mode, **stats)
+    else:
+        log.debug('enrollments.count_checked', mode=mode, **stats)
+    return dict(stats, mode=mode)
@@ -0,0 +1,172 @@
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from utils.database import mysql
+from utils.jobs import single_runner
+from utils.logger import get_logger
+
+log = get_logger('notifications.retention')
+
+# Live progress of the current (or last) purge in this process
+_status = {}
+_status_lock = threading.Lock()
+_run_lock = threading.Lock()
+
+NOTIFICATION_COLUMNS = """
+    id, user_id, type, title, message, link, is_read,
+    sender_id, class_id, priority, created_at, expires_at
+"""
+
+
+def purge_status():
+    """Progress metrics of the running or most recent purge"""
+    with _status_lock:
+        return dict(_status)
+
+
+def _update_status(**values):
+    with _status_lock:
+        _status.update(values)
+
+
+def _id_range(cursor, table):
+    cursor.execute(f"SELECT MIN(id) as low, MAX(id) as high FROM {table}")
+    row = cursor.fetchone()
+    return row['low'], row['high']
+
+
+def _purge_table(cursor, table, condition, params, chunk_size, pause, dry_run, counter, archive=False, on_progress=None):
+    """Apply one retention rule to `table` in primary-key windows of `chunk_size` ids.
+
+    Each window is its own short transaction, so locks are held only on the rows
+    of that window and never across the whole table.
+    """
+    low, high = _id_range(cursor, table)
+    if low is None:
+        return 0
+
+    total = 0
+    for start in range(low, high + 1, chunk_size):
+        window = f"id >= %s AND id < %s AND ({condition})"
+        window_params = [start, start + chunk_size] + list(params)
+
+        if dry_run:
+            cursor.execute(f"SELECT COUNT(*) as count FROM {table} WHERE {window}", window_params)
+            affected = cursor.fetchone()['count']
+        else:
+            if archive:
+                cursor.execute(f"""
+                    INSERT IGNORE INTO notifications_archive ({NOTIFICATION_COLUMNS}, archived_at)
+                    SELECT {NOTIFICATION_COLUMNS}, NOW()
+                    FROM notifications
+                    WHERE {window}
+                """, window_params)
+            cursor.execute(f"DELETE FROM {table} WHERE {window}", window_params)
+            affected = cursor.rowcount
+            mysql.connection.commit()
+
+        total += affected
+        with _status_lock:
+            _status['chunks'] += 1
+            _status[counter] += affected
+            _status['position'] = f"{table}:{start + chunk_size - 1}/{high}"
+            snapshot = dict(_status)
+        if on_progress:
+            on_progress(snapshot)
+        if pause and affected and not dry_run:
+            time.sleep(pause)
+    return total
+
+
+def purge_notifications(dry_run=False, read_days=None, archive_read=None, chunk_size=None, on_progress=None):
+    """Delete expired notifications/broadcasts and archive (or delete) old read notifications.
+
+    Settings default to the NOTIFICATION_RETENTION_* / NOTIFICATION_PURGE_* config.
+    With dry_run the same windows are counted instead of modified. Returns the
+    final metrics, or None if another purge is already running in this or
+    another worker process.
+    """
+    config = current_app.config
+    read_days = config.get('NOTIFICATION_RETENTION_READ_DAYS', 90) if read_days is None else read_days
+    archive_read = config.get('NOTIFICATION_ARCHIVE_READ', True) if archive_read is None else archive_read
+    chunk_size = chunk_size or config.get('NOTIFICATION_PURGE_CHUNK_SIZE', 5000)
+    pause = config.get('NOTIFICATION_PURGE_PAUSE_MS', 20) / 1000
+
+    if not _run_lock.acquire(blocking=False):
+        return None
+    try:
+        with single_runner('notification-purge') as acquired:
+            if not acquired:
+                return None
+            return _run_purge(dry_run, read_days, archive_read, chunk_size, pause, on_progress)
+    finally:
+        _run_lock.release()
+
+
+def _run_purge(dry_run, read_days, archive_read, chunk_size, pause, on_progress):
+    """One purge pass; the caller holds both run locks"""
+    started = time.perf_counter()
+    with _status_lock:
+        _status.clear()
+        _status.update({
+            'running': True,
+            'dry_run': dry_run,
+            'started_at': datetime.now().isoformat(),
+            'finished_at': None,
+            'duration_ms': None,
+            'chunks': 0,
+            'expired_notifications': 0,
+            'expired_broadcasts': 0,
+            'read_archived': 0,
+            'read_deleted': 0,
+            'position': None,
+            'error': None,
+        })
+
+    cursor = mysql.connection.cursor()
+    try:
+        # Expired rows are already hidden from every feed and count
+        _purge_table(
+            cursor, 'notifications', "expires_at IS NOT NULL AND expires_at < NOW()", [],
+            chunk_size, pause, dry_run, 'expired_notifications', on_progress=on_progress
+        )
+        _purge_table(
+            cursor, 'notification_broadcasts', "expires_at IS NOT NULL AND expires_at < NOW()", [],
+            chunk_size, pause, dry_run, 'expired_broadcasts', on_progress=on_progress
+        )
+
+        if read_days:
+            _purge_table(
+                cursor, 'notifications', "is_read = TRUE AND created_at < NOW() - INTERVAL %s DAY", [read_days],
+                chunk_size, pause, dry_run, 'read_archived' if archive_read else 'read_deleted',
+                archive=archive_read, on_progress=on_progress
+            )
+    except Exception as e:
+        mysql.connection.rollback()
+        _update_status(error=str(e))
+        raise
+    finally:
+        cursor.close()
+        _update_status(
+            running=False,
+            finished_at=datetime.now().isoformat(),
+            duration_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
+
+    return purge_status()
+
+
+def scheduled_purge():
+    """Periodic job entry point"""
+    stats = purge_notifications()
+    if stats:
+        log.info(
+            'notifications.purged',
+            expired=stats['expired_notifications'],
+            expired_broadcasts=stats['expired_broadcasts'],
+            archived=stats['read_archived'],
+            deleted=stats['read_deleted'],
+            duration_ms=stats['duration_ms']
+        )
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from flask import current_app
+from utils.database import mysql
+from utils.logger import get_logger
+
+log = get_logger('auth')
+
+
+class RoleVersionMap:
+    """In-process map of users whose role changed or who were deleted recently.
+
+    Access tokens carry the role claim, so authorization needs no DB lookup. A
+    token issued before the user's last change is rejected. The map is refreshed
+    from `user_role_versions` at most once per ROLE_SYNC_INTERVAL seconds per
+    process, so changes made by other workers apply within that window.
+    """
+
+    def __init__(self):
+        self._changed = {}
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    def _token_lifetime(self):
+        expires = current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES')
+        return expires.total_seconds() if expires else 3600
+
+    def _sync(self):
+        """Reload changes newer than the access-token lifetime (older tokens are expired anyway)"""
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT user_id, UNIX_TIMESTAMP(changed_at) as changed_at
+                FROM user_role_versions
+                WHERE changed_at > NOW() - INTERVAL %s SECOND
+            """, (int(self._token_lifetime()),))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        changed = {int(row['user_id']): float(row['changed_at']) for row in rows}
+        # Keep local bumps that the DB query may not see yet (uncommitted / replica lag)
+        for user_id, changed_at in self._changed.items():
+            if changed_at > changed.get(user_id, 0):
+                changed[user_id] = changed_at
+        horizon = time.time() - self._token_lifetime()
+        self._changed = {uid: ts for uid, ts in changed.items() if ts > horizon}
+
+    def _maybe_sync(self):
+        interval = current_app.config.get('ROLE_SYNC_INTERVAL', 5)
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < interval:
+            return
+        # Only one thread refreshes; the rest keep using the current map
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._synced_at = now
+            self._sync()
+        except Exception as e:
+            log.warning('auth.role_sync_failed', error=str(e))
+        finally:
+            self._lock.release()
+
+    def is_stale(self, user_id, issued_at):
+        """True if the token was issued before the user's role changed or the user was deleted"""
+        self._maybe_sync()
+        changed_at = self._changed.get(int(user_id))
+        return changed_at is not None and issued_at < int(changed_at)
+
+    def bump(self, user_id, cursor):
+        """Record a role change or deletion; runs inside the caller's transaction"""
+        cursor.execute("""
+            INSERT INTO user_role_versions (user_id, version, changed_at)
+            VALUES (%s, 1, NOW())
+            ON DUPLICATE KEY UPDATE version = version + 1, changed_at = NOW()
+        """, (user_id,))
+        self._changed[int(user_id)] = time.time()
+
+
+role_versions = RoleVersionMap()
+
+
+def revoke_user_tokens(user_id, cursor):
+    """Invalidate access tokens issued to a user before now (call before committing)"""
+    role_versions.bump(user_id, cursor)
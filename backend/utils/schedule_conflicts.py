@@ -0,0 +1,340 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from flask import current_app
+from utils.database import mysql
+
+DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def to_minutes(value):
+    """Minutes since midnight from 'HH:MM', 'HH:MM:SS', a TIME column (timedelta) or a time"""
+    if isinstance(value, timedelta):
+        return int(value.total_seconds() // 60)
+    if hasattr(value, 'hour'):
+        return value.hour * 60 + value.minute
+    parts = str(value).strip().split(':')
+    if len(parts) < 2:
+        raise ValueError(f"Invalid time: {value}")
+    hours, minutes = int(parts[0]), int(parts[1])
+    if not (0 <= hours <= 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time: {value}")
+    return hours * 60 + minutes
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+
+
+def normalize_room(room):
+    return ' '.join(str(room).split()).upper() if room else None
+
+
+class DayIntervals:
+    """Intervals of one resource on one day, sorted by start.
+
+    An interval [s, e) can only overlap [a, b) if s < b and s > a - longest,
+    where `longest` is the longest interval stored, so an overlap query is two
+    bisections plus a scan of the few intervals between them.
+    """
+
+    __slots__ = ('starts', 'items', 'longest')
+
+    def __init__(self):
+        self.starts = []
+        self.items = []
+        self.longest = 0
+
+    def add(self, start, end, slot_id):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.items.insert(i, (start, end, slot_id))
+        self.longest = max(self.longest, end - start)
+
+    def remove(self, start, slot_id):
+        i = bisect_left(self.starts, start)
+        while i < len(self.items) and self.starts[i] == start:
+            if self.items[i][2] == slot_id:
+                del self.starts[i]
+                del self.items[i]
+                return
+            i += 1
+
+    def overlapping(self, start, end):
+        low = bisect_right(self.starts, start - self.longest)
+        high = bisect_left(self.starts, end)
+        return [item for item in self.items[low:high] if item[1] > start]
+
+
+class ScheduleIndex:
+    """All schedule slots of one term, indexed per day by section, room and teacher.
+
+    Answers which existing slots a proposed slot would clash with:
+    - section: the same section already meets then
+    - room: the room (slot room, else the section's room) is taken
+    - teacher: a teacher of the section teaches another section then
+    - student: another section sharing approved students meets then
+
+    Slots are added and removed in memory, so a batch can be validated against
+    itself as well as the database (see add/remove).
+    """
+
+    def __init__(self, section_rooms, teachers, students):
+        self.section_rooms = section_rooms            # section_id -> default room
+        self.teachers = teachers                      # section_id -> set(teacher_id)
+        self.students = students                      # section_id -> set(student_id)
+        self._student_sections = None                 # student_id -> set(section_id), built on demand
+        self._co_sections = {}                        # section_id -> {other_section_id: shared students}
+        self.slots = {}                               # slot_id -> (section_id, day, start, end, room)
+        self._by = {}                                 # (kind, key, day) -> DayIntervals
+        self._next_temp_id = -1
+
+    # ============ LOADING ============
+
+    @classmethod
+    def load(cls, academic_year, semester):
+        """Build the index for a term with four queries"""
+        cursor = mysql.connection.cursor()
+        try:
+            term = (academic_year, semester)
+            cursor.execute("""
+                SELECT id, room FROM sections
+                WHERE academic_year = %s AND semester = %s
+            """, term)
+            section_rooms = {row['id']: normalize_room(row['room']) for row in cursor.fetchall()}
+
+            cursor.execute("""
+                SELECT ta.section_id, ta.teacher_id
+                FROM teacher_assignments ta
+                JOIN sections s ON ta.section_id = s.id
+                WHERE s.academic_year = %s AND s.semester = %s
+            """, term)
+            teachers = {}
+            for row in cursor.fetchall():
+                teachers.setdefault(row['section_id'], set()).add(row['teacher_id'])
+
+            cursor.execute("""
+                SELECT e.section_id, e.student_id
+                FROM enrollments e
+                JOIN sections s ON e.section_id = s.id
+                WHERE s.academic_year = %s AND s.semester = %s AND e.status = 'approved'
+            """, term)
+            students = {}
+            for row in cursor.fetchall():
+                students.setdefault(row['section_id'], set()).add(row['student_id'])
+
+            cursor.execute("""
+                SELECT sch.id, sch.section_id, sch.day, sch.start_time, sch.end_time, sch.room
+                FROM schedules sch
+                JOIN sections s ON sch.section_id = s.id
+                WHERE s.academic_year = %s AND s.semester = %s
+            """, term)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        index = cls(section_rooms, teachers, students)
+        for row in rows:
+            index.add(
+                row['section_id'], row['day'], to_minutes(row['start_time']),
+                to_minutes(row['end_time']), row['room'], slot_id=row['id']
+            )
+        return index
+
+    # ============ MUTATION ============
+
+    def room_for(self, section_id, room=None):
+        return normalize_room(room) or self.section_rooms.get(section_id)
+
+    def _keys(self, section_id, room):
+        keys = [('section', section_id)]
+        if room:
+            keys.append(('room', room))
+        keys += [('teacher', teacher_id) for teacher_id in self.teachers.get(section_id, ())]
+        return keys
+
+    def add(self, section_id, day, start, end, room=None, slot_id=None):
+        """Index a slot; returns its id (negative for slots not yet in the database)"""
+        if slot_id is None:
+            slot_id = self._next_temp_id
+            self._next_temp_id -= 1
+        room = self.room_for(section_id, room)
+        self.slots[slot_id] = (section_id, day, start, end, room)
+        for kind, key in self._keys(section_id, room):
+            self._by.setdefault((kind, key, day), DayIntervals()).add(start, end, slot_id)
+        return slot_id
+
+    def remove(self, slot_id):
+        slot = self.slots.pop(slot_id, None)
+        if not slot:
+            return
+        section_id, day, start, _, room = slot
+        for kind, key in self._keys(section_id, room):
+            intervals = self._by.get((kind, key, day))
+            if intervals:
+                intervals.remove(start, slot_id)
+
+    # ============ QUERIES ============
+
+    def co_sections(self, section_id):
+        """{other_section_id: number of shared approved students}"""
+        if section_id not in self._co_sections:
+            if self._student_sections is None:
+                self._student_sections = {}
+                for sid, members in self.students.items():
+                    for student_id in members:
+                        self._student_sections.setdefault(student_id, set()).add(sid)
+            shared = {}
+            for student_id in self.students.get(section_id, ()):
+                for other in self._student_sections.get(student_id, ()):
+                    if other != section_id:
+                        shared[other] = shared.get(other, 0) + 1
+            self._co_sections[section_id] = shared
+        return self._co_sections[section_id]
+
+    def _conflict(self, kind, slot_id, **extra):
+        section_id, day, start, end, room = self.slots[slot_id]
+        conflict = {
+            'type': kind,
+            'schedule_id': slot_id if slot_id > 0 else None,
+            'section_id': section_id,
+            'day': day,
+            'start_time': format_minutes(start),
+            'end_time': format_minutes(end),
+            'room': room,
+        }
+        conflict.update(extra)
+        return conflict
+
+    def conflicts(self, section_id, day, start, end, room=None, exclude_id=None):
+        """Every clash a slot for `section_id` on `day` from `start` to `end` (minutes) would cause"""
+        found = []
+        room = self.room_for(section_id, room)
+
+        def scan(kind, key, **extra):
+            intervals = self._by.get((kind, key, day))
+            if not intervals:
+                return
+            for _, _, slot_id in intervals.overlapping(start, end):
+                if slot_id == exclude_id:
+                    continue
+                if kind != 'section' and self.slots[slot_id][0] == section_id:
+                    continue
+                found.append(self._conflict(kind, slot_id, **extra))
+
+        scan('section', section_id)
+        if room:
+            scan('room', room)
+        for teacher_id in self.teachers.get(section_id, ()):
+            scan('teacher', teacher_id, teacher_id=teacher_id)
+        for other, shared in self.co_sections(section_id).items():
+            intervals = self._by.get(('section', other, day))
+            if intervals:
+                for _, _, slot_id in intervals.overlapping(start, end):
+                    if slot_id != exclude_id:
+                        found.append(self._conflict('student', slot_id, students=shared))
+        return found
+
+
+# ============ PER-TERM CACHE ============
+
+_cache = {}                   # term -> [stamp, loaded_at, checked_at, index]
+_section_terms = {}           # section_id -> term, filled from loaded indexes
+_cache_lock = threading.Lock()
+
+
+def _schedules_stamp(cursor):
+    cursor.execute("SELECT COUNT(*) as count, MAX(id) as max_id, MAX(updated_at) as updated FROM schedules")
+    return tuple(cursor.fetchone().values())
+
+
+def term_of(section_id):
+    """(academic_year, semester) of a section; from the cache when a loaded index covers it"""
+    with _cache_lock:
+        term = _section_terms.get(section_id)
+    if term:
+        return term
+    cursor = mysql.connection.cursor()
+    cursor.execute("SELECT academic_year, semester FROM sections WHERE id = %s", (section_id,))
+    section = cursor.fetchone()
+    cursor.close()
+    if not section:
+        return None
+    term = (section['academic_year'], section['semester'])
+    with _cache_lock:
+        _section_terms[section_id] = term
+    return term
+
+
+def _load(term):
+    index = ScheduleIndex.load(*term)
+    with _cache_lock:
+        # Sections moved to another term since the last load drop out of the mapping
+        for section_id in [sid for sid, t in _section_terms.items() if t == term]:
+            del _section_terms[section_id]
+        for section_id in index.section_rooms:
+            _section_terms[section_id] = term
+    return index
+
+
+def index_for_term(academic_year, semester, fresh=False):
+    """Cached ScheduleIndex for a term.
+
+    Like CatalogCache._maybe_sync, the cache is trusted without a query for
+    SCHEDULE_INDEX_CHECK_SECONDS after it was last validated, so a burst of
+    checks costs no round trips. After that one aggregate query over schedules
+    decides whether to reload; writes made by this process invalidate at once,
+    writes in other workers show within the check interval. Entries are also
+    reloaded after SCHEDULE_INDEX_MAX_AGE_SECONDS, which bounds how stale
+    teacher and enrollment data can be. `fresh=True` always reloads; callers
+    that mutate the returned index must pass it.
+    """
+    term = (academic_year, semester)
+    if fresh:
+        return _load(term)
+
+    config = current_app.config
+    now = time.monotonic()
+    entry = _cache.get(term)
+    if entry and now - entry[1] < config.get('SCHEDULE_INDEX_MAX_AGE_SECONDS', 60):
+        if now - entry[2] < config.get('SCHEDULE_INDEX_CHECK_SECONDS', 1):
+            return entry[3]
+
+    cursor = mysql.connection.cursor()
+    try:
+        stamp = _schedules_stamp(cursor)
+    finally:
+        cursor.close()
+    if entry and entry[0] == stamp and now - entry[1] < config.get('SCHEDULE_INDEX_MAX_AGE_SECONDS', 60):
+        entry[2] = now
+        return entry[3]
+
+    index = _load(term)
+    with _cache_lock:
+        _cache[term] = [stamp, now, now, index]
+    return index
+
+
+def index_for_section(section_id):
+    """Cached index of the section's term, or None if the section does not exist"""
+    term = term_of(section_id)
+    if not term:
+        return None
+    index = index_for_term(*term)
+    if section_id not in index.section_rooms:
+        # The cached term may be stale (section moved by another worker): look it up again
+        with _cache_lock:
+            _section_terms.pop(section_id, None)
+        fresh_term = term_of(section_id)
+        if fresh_term != term:
+            return index_for_term(*fresh_term) if fresh_term else None
+    return index
+
+
+def invalidate():
+    """Drop cached indexes after a schedule or section write in this process"""
+    with _cache_lock:
+        _cache.clear()
+        _section_terms.clear()
@@ -0,0 +1,185 @@
+import re
+import threading
+import time
+
+from flask import current_app
+from utils.database import mysql
+from utils.logger import get_logger
+
+log = get_logger('search')
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Field weights: a code hit outranks a name hit, which outranks a teacher hit
+FIELD_WEIGHTS = {
+    'subject_code': 3.0,
+    'course_code': 2.5,
+    'subject_name': 2.0,
+    'course_name': 1.5,
+    'teacher_names': 1.0,
+}
+# How well a query term matched a word in the field
+EXACT, PREFIX, INFIX = 1.0, 0.6, 0.25
+
+
+def _tokens(text):
+    return _TOKEN.findall((text or '').lower())
+
+
+def _grams(word):
+    """Bigrams and trigrams of a word; a query term's grams must all be present"""
+    return {word[i:i + n] for n in (2, 3) for i in range(len(word) - n + 1)}
+
+
+def _query_grams(term):
+    if len(term) <= 3:
+        return {term}
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class SectionSearchIndex:
+    """In-process n-gram index over section, subject, course and teacher names.
+
+    Postings map each 2- and 3-gram of every word to the sections containing it,
+    so a lookup touches only the candidates for the query's grams instead of
+    scanning the catalog. Candidates are then scored per field (exact word,
+    prefix or infix match, weighted by field) and every query term must match.
+
+    The index is rebuilt when the catalog version changes: the `catalog_versions`
+    row that admin catalog writes bump (see CatalogCache), plus the newest
+    teacher updated_at for renames. Seat-count updates touch neither, so
+    registration traffic does not trigger rebuilds. The version is checked at
+    most once per SECTION_SEARCH_REFRESH_SECONDS, so edits made by other
+    workers apply within that window.
+    """
+
+    def __init__(self):
+        self._index = ({}, {})          # (docs, postings), replaced as one object
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    # ============ BUILD ============
+
+    @staticmethod
+    def catalog_version(cursor):
+        cursor.execute("""
+            SELECT
+                (SELECT version FROM catalog_versions WHERE id = 1) as catalog,
+                (SELECT MAX(updated_at) FROM users WHERE role = 'teacher') as teachers_at
+        """)
+        return tuple(cursor.fetchone().values())
+
+    def _build(self, cursor):
+        cursor.execute("""
+            SELECT
+                s.id,
+                sub.code as subject_code,
+                sub.name as subject_name,
+                c.code as course_code,
+                c.name as course_name,
+                GROUP_CONCAT(u.name SEPARATOR ' ') as teacher_names
+            FROM sections s
+            JOIN subjects sub ON s.subject_id = sub.id
+            JOIN courses c ON sub.course_id = c.id
+            LEFT JOIN teacher_assignments ta ON s.id = ta.section_id
+            LEFT JOIN users u ON ta.teacher_id = u.id
+            WHERE s.is_active = TRUE
+            GROUP BY s.id
+        """)
+        docs, postings = {}, {}
+        for row in cursor.fetchall():
+            fields = {field: _tokens(row[field]) for field in FIELD_WEIGHTS}
+            docs[row['id']] = fields
+            for words in fields.values():
+                for word in words:
+                    for gram in _grams(word) or {word}:
+                        postings.setdefault(gram, set()).add(row['id'])
+        # One assignment, so a concurrent search reads the old or the new pair, never a mix
+        self._index = (docs, postings)
+
+    def refresh(self, force=False):
+        """Rebuild if the catalog changed; one thread rebuilds while others keep searching"""
+        interval = current_app.config.get('SECTION_SEARCH_REFRESH_SECONDS', 5)
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < interval:
+            return
+        # The first search in a process must wait for the build; later ones never do
+        if not self._lock.acquire(blocking=self._version is None):
+            return
+        try:
+            self._checked_at = now
+            cursor = mysql.connection.cursor()
+            try:
+                version = self.catalog_version(cursor)
+                if force or version != self._version:
+                    started = time.perf_counter()
+                    self._build(cursor)
+                    self._version = version
+                    log.info(
+                        'search.index_rebuilt',
+                        sections=len(self._index[0]),
+                        grams=len(self._index[1]),
+                        duration_ms=round((time.perf_counter() - started) * 1000, 1)
+                    )
+            finally:
+                cursor.close()
+        finally:
+            self._lock.release()
+
+    # ============ QUERY ============
+
+    @staticmethod
+    def _term_score(term, words):
+        best = 0.0
+        for word in words:
+            if word == term:
+                return EXACT
+            if word.startswith(term):
+                best = max(best, PREFIX)
+            elif term in word:
+                best = max(best, INFIX)
+        return best
+
+    def search(self, keyword):
+        """Section ids matching every term of `keyword`, best match first"""
+        self.refresh()
+        terms = list(dict.fromkeys(_tokens(keyword)))
+        if not terms:
+            return []
+        docs, postings = self._index
+
+        candidates = None
+        for term in terms:
+            matches = None
+            for gram in _query_grams(term):
+                ids = postings.get(gram, set())
+                matches = ids if matches is None else matches & ids
+                if not matches:
+                    return []
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+
+        ranked = []
+        for section_id in candidates:
+            fields = docs[section_id]
+            total = 0.0
+            for term in terms:
+                score = max(
+                    weight * self._term_score(term, fields[field])
+                    for field, weight in FIELD_WEIGHTS.items()
+                )
+                if not score:
+                    break
+                total += score
+            else:
+                ranked.append((-total, section_id))
+        ranked.sort()
+        return [section_id for _, section_id in ranked]
+
+    def __len__(self):
+        return len(self._index[0])
+
+
+section_index = SectionSearchIndex()
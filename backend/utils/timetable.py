@@ -0,0 +1,398 @@
+import multiprocessing
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from utils.database import mysql
+from utils.logger import get_logger
+from utils.schedule_conflicts import DAYS, format_minutes, index_for_term, normalize_room, to_minutes
+
+log = get_logger('timetable')
+
+# Occupied rooms weighed per slot when repair has to evict a meeting
+ROOM_CANDIDATES = 12
+# Steps a meeting may not move back to the slot and room it was ejected from
+TABU_TENURE = 15
+SAME_DAY_PENALTY = 10
+MAX_RESTARTS = 64
+
+
+# ============ PROBLEM ============
+
+def parse_slots(slots=None, days=None, times=None):
+    """[(day, start, end)] in minutes from explicit slots or from days x 'HH:MM-HH:MM' times.
+
+    Malformed input of any shape raises ValueError, so callers can answer 400.
+    """
+    if slots:
+        if not isinstance(slots, list):
+            raise ValueError("slots must be a list of {day, start_time, end_time}")
+        parsed = []
+        for idx, slot in enumerate(slots):
+            if not isinstance(slot, dict):
+                raise ValueError(f"slots[{idx}] must be an object with day, start_time and end_time")
+            if not all(isinstance(slot.get(field), str) for field in ('day', 'start_time', 'end_time')):
+                raise ValueError(f"slots[{idx}] needs day, start_time and end_time as strings")
+            parsed.append((slot['day'], to_minutes(slot['start_time']), to_minutes(slot['end_time'])))
+    else:
+        if not isinstance(days, list) or not all(isinstance(day, str) for day in days):
+            raise ValueError("days must be a list of day names")
+        if not isinstance(times, list) or not all(isinstance(window, str) for window in times):
+            raise ValueError("times must be a list of 'HH:MM-HH:MM' strings")
+        parsed = []
+        for day in days:
+            for window in times:
+                parts = window.split('-')
+                if len(parts) != 2:
+                    raise ValueError(f"Invalid time window: {window}")
+                parsed.append((day, to_minutes(parts[0]), to_minutes(parts[1])))
+    for day, start, end in parsed:
+        if day not in DAYS:
+            raise ValueError(f"Invalid day: {day}")
+        if end <= start:
+            raise ValueError("Slot end time must be after start time")
+    return sorted(set(parsed), key=lambda slot: (DAYS.index(slot[0]), slot[1], slot[2]))
+
+
+def load_problem(academic_year, semester, rooms, slots, meetings_per_week):
+    """Everything the solver needs for a term, as plain picklable data.
+
+    Active sections of the term that have no schedule yet are placed; existing
+    schedule rows stay where they are and block their room, teachers, section
+    and co-enrolled sections for every slot they overlap.
+    """
+    index = index_for_term(academic_year, semester, fresh=True)
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT id, name, capacity, enrolled_count, room
+            FROM sections
+            WHERE academic_year = %s AND semester = %s AND is_active = TRUE
+            ORDER BY id
+        """, (academic_year, semester))
+        section_rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    scheduled = {slot[0] for slot in index.slots.values()}
+    room_list = [
+        {'key': normalize_room(r['name']), 'name': r['name'].strip(), 'capacity': r.get('capacity')}
+        for r in rooms if r.get('name')
+    ]
+    known_rooms = {room['key'] for room in room_list}
+    sections = []
+    for row in section_rows:
+        if row['id'] in scheduled:
+            continue
+        fixed_room = None
+        if row['room'] and normalize_room(row['room']) not in known_rooms:
+            # A room named on the section but missing from the request: used as-is, capacity unknown
+            fixed_room = row['room'].strip()
+        sections.append({
+            'id': row['id'],
+            'name': row['name'],
+            'size': max(row['capacity'] or 0, row['enrolled_count'] or 0),
+            'room': normalize_room(row['room']),
+            'fixed_room': fixed_room,
+            'teachers': sorted(index.teachers.get(row['id'], ())),
+            'co_sections': sorted(index.co_sections(row['id'])),
+            'meetings': meetings_per_week,
+        })
+
+    blocked = set()
+    for section_id, day, start, end, room in index.slots.values():
+        keys = [('section', section_id)] + [('teacher', t) for t in index.teachers.get(section_id, ())]
+        if room:
+            keys.append(('room', room))
+        for i, (slot_day, slot_start, slot_end) in enumerate(slots):
+            if slot_day == day and slot_start < end and start < slot_end:
+                blocked.update((kind, key, i) for kind, key in keys)
+
+    return {'sections': sections, 'rooms': room_list, 'slots': slots, 'blocked': sorted(blocked, key=repr)}
+
+
+# ============ SOLVER ============
+
+class _Solver:
+    """Greedy placement followed by min-conflicts repair with ejection.
+
+    Each section needs `meetings` (slot, room) placements. A placement is
+    infeasible if its section, room or a teacher already has an overlapping
+    slot, or a section sharing students meets in one. Greedy placement takes
+    the hardest sections first (fewest fitting rooms, most teachers and shared
+    students) and the cheapest free position (few meetings on the same day,
+    snug room). Meetings that do not fit are then repaired one at a time: the
+    position with the fewest conflicting meetings is taken and those meetings
+    are ejected back into the queue, with a tabu list against cycling. The
+    best assignment seen is kept.
+    """
+
+    def __init__(self, problem, seed):
+        self.rng = random.Random(seed)
+        self.slots = problem['slots']
+        self.sections = problem['sections']
+        self.overlaps = [
+            [j for j, (d2, s2, e2) in enumerate(self.slots) if d2 == d and s2 < e and s < e2]
+            for d, s, e in self.slots
+        ]
+        self.occ = {key: -1 for key in map(tuple, problem['blocked'])}
+        rooms = sorted(problem['rooms'], key=lambda r: (r['capacity'] is None, r['capacity'] or 0))
+        by_key = {room['key']: room for room in rooms}
+        room_options = [(room['key'], room['name'], room['capacity']) for room in rooms]
+
+        self.meetings = []            # meeting -> section index
+        self.room_options = []        # section index -> [(room_key, room_name, capacity)], smallest first
+        for si, section in enumerate(self.sections):
+            if section['fixed_room']:
+                options = [(section['room'], section['fixed_room'], None)]
+            elif section['room'] in by_key:
+                room = by_key[section['room']]
+                options = [(room['key'], room['name'], room['capacity'])]
+            elif rooms:
+                options = [
+                    option for option in room_options
+                    if option[2] is None or option[2] >= section['size']
+                ]
+            else:
+                options = [(None, None, None)]
+            self.room_options.append(options)
+            self.meetings += [si] * (section['meetings'] if options else 0)
+        self.placed = [None] * len(self.meetings)
+        self.days = {}                # (section index, day) -> meetings placed that day
+
+    # ---- bookkeeping ----
+
+    def _keys(self, si):
+        section = self.sections[si]
+        return [('section', section['id'])] + [('teacher', t) for t in section['teachers']]
+
+    def _holders(self, keys, slot, found):
+        """Add meetings holding any key in a slot overlapping `slot`; False if a fixed schedule does"""
+        for kind, key in keys:
+            for j in self.overlaps[slot]:
+                other = self.occ.get((kind, key, j))
+                if other == -1:
+                    return False
+                if other is not None:
+                    found.add(other)
+        return True
+
+    def _slot_clashes(self, si, slot):
+        """Meetings clashing with section si in `slot` whatever the room, or None if blocked"""
+        found = set()
+        co_keys = [('section', other) for other in self.sections[si]['co_sections']]
+        if not self._holders(self._keys(si), slot, found) or not self._holders(co_keys, slot, found):
+            return None
+        return found
+
+    def _room_clashes(self, room_key, slot):
+        found = set()
+        if room_key and not self._holders([('room', room_key)], slot, found):
+            return None
+        return found
+
+    def _place(self, m, slot, option):
+        self.placed[m] = (slot, option)
+        si = self.meetings[m]
+        day_key = (si, self.slots[slot][0])
+        self.days[day_key] = self.days.get(day_key, 0) + 1
+        for kind, key in self._keys(si) + ([('room', option[0])] if option[0] else []):
+            self.occ[(kind, key, slot)] = m
+
+    def _unplace(self, m):
+        slot, option = self.placed[m]
+        si = self.meetings[m]
+        for kind, key in self._keys(si) + ([('room', option[0])] if option[0] else []):
+            self.occ.pop((kind, key, slot), None)
+        self.placed[m] = None
+        self.days[(si, self.slots[slot][0])] -= 1
+
+    def _cost(self, m, slot, option):
+        si = self.meetings[m]
+        same_day = self.days.get((si, self.slots[slot][0]), 0)
+        capacity = option[2]
+        waste = (capacity - self.sections[si]['size']) / capacity if capacity else 0
+        return same_day * SAME_DAY_PENALTY + waste + self.rng.random() * 0.5
+
+    def _free_room(self, si, slot):
+        """Smallest fitting room free in `slot`, or None"""
+        for option in self.room_options[si]:
+            if self._room_clashes(option[0], slot) == set():
+                return option
+        return None
+
+    # ---- phases ----
+
+    def greedy(self, deadline):
+        # Hardest sections first; a section's meetings stay together so the day penalty sees its siblings
+        by_section = {}
+        for m, si in enumerate(self.meetings):
+            by_section.setdefault(si, []).append(m)
+        sections = sorted(
+            by_section,
+            key=lambda si: (
+                len(self.room_options[si]),
+                -len(self.sections[si]['teachers']) - len(self.sections[si]['co_sections']),
+                self.rng.random(),
+            )
+        )
+        for si in sections:
+            if time.time() >= deadline:
+                break
+            for m in by_section[si]:
+                best = None
+                for slot in range(len(self.slots)):
+                    if self._slot_clashes(si, slot) != set():
+                        continue
+                    option = self._free_room(si, slot)
+                    if option:
+                        cost = self._cost(m, slot, option)
+                        if best is None or cost < best[0]:
+                            best = (cost, slot, option)
+                if best:
+                    self._place(m, best[1], best[2])
+
+    def repair(self, deadline, max_steps):
+        queue = deque(m for m, p in enumerate(self.placed) if p is None)
+        self.rng.shuffle(queue)
+        tabu = {}
+        best = (len(queue), list(self.placed))
+        step = 0
+        while queue and step < max_steps and time.time() < deadline:
+            step += 1
+            m = queue.pop()
+            si = self.meetings[m]
+            choice = None
+            for slot in range(len(self.slots)):
+                slot_clashes = self._slot_clashes(si, slot)
+                if slot_clashes is None:
+                    continue
+                # A free room costs nothing more; otherwise weigh a sample of occupied ones
+                option = self._free_room(si, slot)
+                options = [option] if option else self.rng.sample(
+                    self.room_options[si], min(ROOM_CANDIDATES, len(self.room_options[si]))
+                )
+                for option in options:
+                    if tabu.get((m, slot, option[0]), 0) > step:
+                        continue
+                    room_clashes = self._room_clashes(option[0], slot)
+                    if room_clashes is None:
+                        continue
+                    clashes = slot_clashes | room_clashes
+                    score = (len(clashes), self._cost(m, slot, option))
+                    if choice is None or score < choice[0]:
+                        choice = (score, slot, option, clashes)
+            if choice is None:
+                continue
+            _, slot, option, clashes = choice
+            for other in clashes:
+                tabu[(other, self.placed[other][0], self.placed[other][1][0])] = step + TABU_TENURE
+                self._unplace(other)
+                queue.appendleft(other)
+            self._place(m, slot, option)
+            if len(queue) < best[0]:
+                best = (len(queue), list(self.placed))
+        # Only the placements are read from here on; occ/days are not rebuilt
+        self.placed = best[1]
+
+    def result(self, seed):
+        rows, unplaced, same_day, fills = [], {}, 0, []
+        days_seen = {}
+        for m, placement in enumerate(self.placed):
+            section = self.sections[self.meetings[m]]
+            if placement is None:
+                unplaced[section['id']] = unplaced.get(section['id'], 0) + 1
+                continue
+            slot, (_, room_name, capacity) = placement
+            day, start, end = self.slots[slot]
+            days = days_seen.setdefault(section['id'], set())
+            same_day += day in days
+            days.add(day)
+            if capacity:
+                fills.append(min(section['size'] / capacity, 1.0))
+            rows.append({
+                'section_id': section['id'], 'day': day, 'room': room_name,
+                'start_time': format_minutes(start), 'end_time': format_minutes(end),
+            })
+        no_room = []
+        for si, section in enumerate(self.sections):
+            if not self.room_options[si]:
+                unplaced[section['id']] = section['meetings']
+                no_room.append(section['id'])
+        return {
+            'seed': seed,
+            'rows': rows,
+            'unplaced': unplaced,
+            'no_room': no_room,
+            'same_day': same_day,
+            'fill': sum(fills) / len(fills) if fills else None,
+            'cost': (sum(unplaced.values()), same_day, -(sum(fills) / len(fills) if fills else 0)),
+        }
+
+
+def solve(problem, seed, deadline, max_steps):
+    """One restart, stopping at the shared wall-clock deadline; top-level so pool workers can run it"""
+    solver = _Solver(problem, seed)
+    solver.greedy(deadline)
+    solver.repair(deadline, max_steps)
+    return solver.result(seed)
+
+
+def quality(problem, best):
+    """0-100: share of meetings placed, scaled by day spread and room fill.
+
+    score = 100 * placed/total * (0.8 + 0.1 * spread + 0.1 * fill), where spread
+    is the share of placed meetings not repeating a section's day and fill is
+    the mean section size over room capacity (1 when capacities are unknown).
+    """
+    total = sum(section['meetings'] for section in problem['sections'])
+    placed = len(best['rows'])
+    if not total:
+        return {'score': 100.0, 'placed_meetings': 0, 'total_meetings': 0, 'same_day_meetings': 0, 'room_fill': None}
+    spread = 1 - best['same_day'] / placed if placed else 0
+    fill = best['fill'] if best['fill'] is not None else 1.0
+    return {
+        'score': round(100 * placed / total * (0.8 + 0.1 * spread + 0.1 * fill), 1),
+        'placed_meetings': placed,
+        'total_meetings': total,
+        'same_day_meetings': best['same_day'],
+        'room_fill': round(best['fill'], 3) if best['fill'] is not None else None,
+    }
+
+
+def generate(problem, restarts=None, workers=None):
+    """Best of several independent restarts, run in a process pool when workers > 1.
+
+    All restarts share one deadline, TIMETABLE_TIME_LIMIT_SECONDS from the call
+    (pool start-up included), so the request stays well inside the worker
+    timeout however tight the term is; restarts still queued at the deadline
+    return at once and lose to the finished ones.
+    """
+    config = current_app.config
+    restarts = min(max(1, restarts or config.get('TIMETABLE_RESTARTS', 4)), MAX_RESTARTS)
+    workers = min(restarts, workers if workers is not None else config.get('TIMETABLE_WORKERS', 4))
+    deadline = time.time() + config.get('TIMETABLE_TIME_LIMIT_SECONDS', 5)
+    max_steps = config.get('TIMETABLE_MAX_REPAIR_STEPS', 50000)
+    seeds = [random.randrange(2 ** 31) for _ in range(restarts)]
+
+    started = time.perf_counter()
+    if workers > 1 and problem['sections']:
+        # spawn: the web process has threads (pool, jobs) that fork would copy mid-lock
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = list(pool.map(solve, [problem] * restarts, seeds, [deadline] * restarts, [max_steps] * restarts))
+    else:
+        results = [solve(problem, seed, deadline, max_steps) for seed in seeds]
+
+    best = min(results, key=lambda r: r['cost'])
+    log.info(
+        'timetable.generated',
+        sections=len(problem['sections']),
+        restarts=restarts,
+        workers=workers,
+        unplaced=sum(best['unplaced'].values()),
+        duration_ms=round((time.perf_counter() - started) * 1000, 1)
+    )
+    return best
@@ -30,9 +30,7 @@ const NotificationBell = () => {
     if (isAuthenticated) {
       console.log('✅ User is authenticated, fetching notifications...');
       fetchNotifications();
-      // Poll for new notifications every 30 seconds
-      const interval = setInterval(fetchUnreadCount, 30000);
-      return () => clearInterval(interval);
+      return subscribeToStream();
     } else {
       console.log('❌ User not authenticated');
     }
@@ -84,6 +82,105 @@ const NotificationBell = () => {
     }
   };
 
+  // Live updates over Server-Sent Events; falls back to polling every 30 seconds
+  // while the stream is down. EventSource cannot send headers, so each connect
+  // first fetches a short-lived stream ticket through the api client (which
+  // refreshes an expired access token) and opens the stream with it, resuming
+  // from the last event. The access token itself never goes in the URL.
+  const subscribeToStream = () => {
+    let interval = null;
+    let source = null;
+    let reconnectTimer = null;
+    let retryDelay = 5000;
+    let lastEventId = null;
+    let closed = false;
+
+    const startPolling = () => {
+      if (!interval) interval = setInterval(fetchUnreadCount, 30000);
+    };
+    const stopPolling = () => {
+      clearInterval(interval);
+      interval = null;
+    };
+
+    if (typeof EventSource === 'undefined') {
+      startPolling();
+      return stopPolling;
+    }
+
+    const track = (handler) => (event) => {
+      if (event.lastEventId) lastEventId = event.lastEventId;
+      handler(event);
+    };
+
+    const scheduleReconnect = () => {
+      startPolling();
+      if (closed || reconnectTimer) return;
+      reconnectTimer = setTimeout(() => {
+        reconnectTimer = null;
+        connect();
+      }, retryDelay);
+      retryDelay = Math.min(retryDelay * 2, 60000);
+    };
+
+    const connect = async () => {
+      if (closed || !localStorage.getItem('access_token')) {
+        startPolling();
+        return;
+      }
+      let ticket;
+      try {
+        const response = await api.post('/notifications/stream-ticket');
+        ticket = response.data.ticket;
+      } catch (error) {
+        console.error('❌ Failed to get stream ticket:', error);
+        scheduleReconnect();
+        return;
+      }
+      if (closed) return;
+      const resume = lastEventId ? `&lastEventId=${encodeURIComponent(lastEventId)}` : '';
+      source = new EventSource(
+        `${api.defaults.baseURL}/notifications/stream?ticket=${encodeURIComponent(ticket)}${resume}`
+      );
+      source.onopen = () => {
+        retryDelay = 5000;
+        stopPolling();
+      };
+      source.onerror = () => {
+        source.close();
+        scheduleReconnect();
+      };
+      source.addEventListener('notification', track((event) => {
+        const notification = JSON.parse(event.data);
+        console.log('📨 Live notification:', notification);
+        setUnreadCount(prev => prev + (notification.unread_delta || 0));
+        fetchNotifications();
+      }));
+      // Other tabs/devices changed read state: reconcile with the server count
+      source.addEventListener('unread', track((event) => {
+        const data = JSON.parse(event.data);
+        if (data.unread_count !== undefined && data.delta === undefined && !data.refresh) {
+          setUnreadCount(data.unread_count);
+        } else {
+          fetchUnreadCount();
+        }
+      }));
+      source.addEventListener('resync', track((event) => {
+        setUnreadCount(JSON.parse(event.data).unread_count || 0);
+        fetchNotifications();
+      }));
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
+      if (source) source.close();
+      stopPolling();
+    };
+  };
+
   const fetchUnreadCount = async () => {
     try {
       console.log('🔢 Fetching unread count...');
@@ -163,7 +163,12 @@ const SendNotificationModal = ({ isOpen, onClose, sectionId, sectionName }) => {
       recipients = response.data.recipients || 1;
       console.log('✅ Notification sent to', recipients, 'recipients');
       
-      toast.success(`✅ Notification sent to ${recipients} recipient(s)`);
+      if (response.status === 202) {
+        // Large sends are delivered in the background (see GET /notifications/jobs/:id)
+        toast.success(`✅ Notification queued for ${recipients} recipient(s)`);
+      } else {
+        toast.success(`✅ Notification sent to ${recipients} recipient(s)`);
+      }
       resetForm();
       onClose();
     } catch (error) {
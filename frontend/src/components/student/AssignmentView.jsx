@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import api from '../../services/api';
 import Loader from '../common/Loader';
@@ -15,6 +15,12 @@ const AssignmentView = () => {
   const [textEntry, setTextEntry] = useState('');
   const [loading, setLoading] = useState(true);
   const [submitting, setSubmitting] = useState(false);
+  // Reused by retries of the same submission; a new one once the content changes or it succeeds
+  const submitKey = useRef(null);
+
+  useEffect(() => {
+    submitKey.current = null;
+  }, [files, textEntry]);
 
   useEffect(() => {
     if (assignmentId) {
@@ -73,6 +79,9 @@ const AssignmentView = () => {
       return;
     }
 
+    if (!submitKey.current) {
+      submitKey.current = crypto.randomUUID();
+    }
     setSubmitting(true);
     const formData = new FormData();
     formData.append('text_entry', textEntry);
@@ -81,9 +90,14 @@ const AssignmentView = () => {
     });
 
     try {
+      // A retried upload of the same content replays the first response
       await api.post(`/student/assignments/${assignmentId}/submit`, formData, {
-        headers: { 'Content-Type': 'multipart/form-data' }
+        headers: {
+          'Content-Type': 'multipart/form-data',
+          'Idempotency-Key': submitKey.current
+        }
       });
+      submitKey.current = null;
       toast.success('Assignment submitted successfully!');
       fetchAssignmentData();
       setFiles([]);
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import api from '../../services/api';
 import { useAuth } from '../../context/AuthContext';
 import { 
@@ -19,6 +19,9 @@ const AvailableSections = () => {
   const [selectedSemester, setSelectedSemester] = useState('');
   const [searchTerm, setSearchTerm] = useState('');
   const [pendingRequests, setPendingRequests] = useState([]);
+  // One Idempotency-Key per section until its request succeeds, so a double
+  // click or a retry is answered with the first request's response
+  const enrollKeys = useRef({});
 
   const semesters = ['Fall 2024', 'Spring 2025', 'Fall 2025', 'Spring 2026'];
 
@@ -85,9 +88,19 @@ const AvailableSections = () => {
   };
 
   const requestEnrollment = async (sectionId) => {
+    if (!enrollKeys.current[sectionId]) {
+      enrollKeys.current[sectionId] = crypto.randomUUID();
+    }
     try {
-      await api.post('/student/enrollments', { section_id: sectionId });
-      toast.success('Enrollment request sent! Waiting for approval.');
+      const response = await api.post('/student/enrollments', { section_id: sectionId }, {
+        headers: { 'Idempotency-Key': enrollKeys.current[sectionId] }
+      });
+      delete enrollKeys.current[sectionId];
+      if (response.data.status === 'waitlisted') {
+        toast.success(`Section is full. You are #${response.data.waitlist_position} on the waitlist.`);
+      } else {
+        toast.success('Enrollment request sent! Waiting for approval.');
+      }
       fetchPendingRequests();
       fetchData(); // Refresh available seats
     } catch (error) {
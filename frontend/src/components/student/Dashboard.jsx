@@ -166,12 +166,12 @@ const StudentDashboard = () => {
                     <p className="text-sm text-gray-600">{section.course_name} • Section {section.section_name}</p>
                   </div>
                   <span className="bg-green-100 text-green-700 text-xs px-2 py-1 rounded-full">
-                    {section.schedule?.day || 'Schedule TBA'}
+                    {section.schedule?.length ? section.schedule.map(slot => slot.day.substring(0, 3)).join(', ') : 'Schedule TBA'}
                   </span>
                 </div>
                 <div className="mt-3 flex items-center text-sm text-gray-500">
                   <FiUser className="mr-1" />
-                  <span>{section.teacher_name}</span>
+                  <span>{section.teachers?.map(t => t.name).join(', ') || 'TBA'}</span>
                   {section.room && (
                     <>
                       <FiMapPin className="ml-3 mr-1" />
@@ -90,7 +90,7 @@ const StudentSections = () => {
                   
                   <div className="flex items-center text-sm text-gray-600">
                     <FiUser className="mr-2 flex-shrink-0" />
-                    <span className="truncate">{section.teacher_name || 'TBA'}</span>
+                    <span className="truncate">{section.teachers?.map(t => t.name).join(', ') || 'TBA'}</span>
                   </div>
 
                   <div className="flex items-center text-sm text-gray-600">
@@ -105,15 +105,15 @@ const StudentSections = () => {
                     </div>
                   )}
 
-                  {section.day && (
-                    <div className="flex items-center text-sm text-gray-600">
+                  {section.schedule?.map((slot) => (
+                    <div key={slot.id} className="flex items-center text-sm text-gray-600">
                       <FiClock className="mr-2 flex-shrink-0" />
                       <span>
-                        {section.day} {section.start_time ? section.start_time.substring(0,5) : ''}
-                        {section.end_time ? ` - ${section.end_time.substring(0,5)}` : ''}
+                        {slot.day} {slot.start_time ? slot.start_time.substring(0,5) : ''}
+                        {slot.end_time ? ` - ${slot.end_time.substring(0,5)}` : ''}
                       </span>
                     </div>
-                  )}
+                  ))}
 
                   {/* View Details Link */}
                   <div className="pt-2 flex justify-end">